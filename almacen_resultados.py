@@ -0,0 +1,394 @@
+# ============================================================
+# almacen_resultados.py
+# Almacén de resultados en SQLite: pruebas de generadores y réplicas
+# ============================================================
+
+import csv
+import inspect
+import json
+import re
+import sqlite3
+from datetime import datetime
+
+from mapas_calor import MapasCalor
+from simulacion import CONTADORES_VEHICULO, Simulacion
+
+# Versión del esquema (PRAGMA user_version). 1: esquema inicial; 2: parámetros de
+# los generadores y semillas como TEXT y columna tiempo_servicio en vehiculos
+VERSION_ESQUEMA = 2
+
+# Columnas que en la versión 1 eran INTEGER y pasan a TEXT
+_COLUMNAS_TEXTO = {
+    "pruebas_generadores": ("a", "c", "m", "x0"),
+    "replicas": ("semilla_vehiculos", "semilla_reportes")
+}
+
+# Parámetros de escenario guardados como columnas indexadas (el resto queda en el JSON)
+CLAVES_ESCENARIO = ("lambda_incidentes", "num_vehiculos", "velocidad_vehiculos", "duracion_simulacion", "intervalo")
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS pruebas_generadores (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    generador TEXT NOT NULL,
+    a TEXT NOT NULL,
+    c TEXT NOT NULL,
+    m TEXT NOT NULL,
+    x0 TEXT NOT NULL,
+    chi_cuadrado REAL,
+    distancia_promedio REAL,
+    distancia_esperada REAL,
+    diferencia REAL,
+    estado TEXT
+);
+CREATE TABLE IF NOT EXISTS frecuencias (
+    prueba_id INTEGER NOT NULL REFERENCES pruebas_generadores(id),
+    intervalo INTEGER NOT NULL,
+    frecuencia INTEGER NOT NULL,
+    PRIMARY KEY (prueba_id, intervalo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pruebas_adicionales (
+    prueba_id INTEGER NOT NULL REFERENCES pruebas_generadores(id),
+    nombre TEXT NOT NULL,
+    valor REAL,
+    PRIMARY KEY (prueba_id, nombre)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_pruebas_parametros ON pruebas_generadores (a, c, m);
+
+CREATE TABLE IF NOT EXISTS escenarios (
+    id INTEGER PRIMARY KEY,
+    parametros TEXT NOT NULL UNIQUE,
+    {", ".join(f"{c} NUMERIC NOT NULL" for c in CLAVES_ESCENARIO)}
+);
+CREATE INDEX IF NOT EXISTS idx_escenarios_claves ON escenarios ({", ".join(CLAVES_ESCENARIO)});
+
+CREATE TABLE IF NOT EXISTS replicas (
+    id INTEGER PRIMARY KEY,
+    escenario_id INTEGER NOT NULL REFERENCES escenarios(id),
+    replica INTEGER NOT NULL,
+    semilla_vehiculos TEXT,
+    semilla_reportes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_replicas_escenario ON replicas (escenario_id, replica);
+
+CREATE TABLE IF NOT EXISTS metricas (
+    replica_id INTEGER NOT NULL REFERENCES replicas(id),
+    nombre TEXT NOT NULL,
+    valor REAL,
+    PRIMARY KEY (replica_id, nombre)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_metricas_nombre ON metricas (nombre);
+
+CREATE TABLE IF NOT EXISTS vehiculos (
+    replica_id INTEGER NOT NULL REFERENCES replicas(id),
+    vehiculo TEXT NOT NULL,
+    {", ".join(f"{c} REAL" for c in CONTADORES_VEHICULO)},
+    PRIMARY KEY (replica_id, vehiculo)
+) WITHOUT ROWID;
+"""
+
+
+def _texto(entero):
+    """Entero como texto (los módulos de hasta 2^64 no caben en un INTEGER de SQLite)."""
+    return None if entero is None else str(entero)
+
+
+def _valores_por_defecto():
+    """Valores por defecto de los parámetros de Simulacion, para completar los escenarios."""
+    firma = inspect.signature(Simulacion.__init__)
+    return {nombre: p.default for nombre, p in firma.parameters.items() if p.default is not inspect.Parameter.empty}
+
+
+class AlmacenResultados:
+    """
+    Base de datos SQLite con los resultados de pruebas de generadores y de réplicas
+    de simulación, pensada para barridos de cientos de miles de filas.
+
+    La base usa modo WAL (los lectores no bloquean al escritor) y las inserciones se
+    acumulan en memoria y se escriben en una sola transacción cada tam_lote filas.
+    Los escenarios se guardan una sola vez (identificados por sus parámetros) con
+    índices sobre λ, flota, velocidad, duración e intervalo; las métricas y los
+    contadores por vehículo van en tablas propias para poder agregarlos con SQL.
+    Cada lote se escribe en una transacción BEGIN IMMEDIATE, por lo que varios
+    procesos pueden escribir en la misma base, y las bases creadas con una versión
+    anterior del esquema se migran al abrirlas (ver VERSION_ESQUEMA).
+
+    Parámetros:
+        ruta (str): Archivo de la base de datos.
+        tam_lote (int): Réplicas o pruebas acumuladas antes de escribir una transacción.
+
+    Se usa como administrador de contexto: al salir confirma lo pendiente y cierra.
+    """
+
+    def __init__(self, ruta="resultados.db", tam_lote=1000):
+        self.ruta = ruta
+        self.tam_lote = tam_lote
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(_ESQUEMA)
+        self._migrar()
+
+        self._defectos = _valores_por_defecto()
+        self._escenarios = {}
+        self._pruebas_pendientes = []
+        self._replicas_pendientes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+    # ---------- Escritura ----------
+
+    def agregar_prueba(self, nombre_generador, parametros, chi_cuadrado, frecuencias_observadas,
+                       promedio, esperado, diferencia, estado, pruebas_adicionales=None):
+        """Agrega una prueba de generador (mismos argumentos que registro_resultados.guardar_resultados)."""
+        self._pruebas_pendientes.append((
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), nombre_generador,
+             *(_texto(parametros[p]) for p in ("a", "c", "m", "x0")),
+             chi_cuadrado, promedio, esperado, diferencia, estado),
+            [int(f) for f in frecuencias_observadas],
+            dict(pruebas_adicionales or {})
+        ))
+        if len(self._pruebas_pendientes) >= self.tam_lote:
+            self._escribir_pruebas()
+
+    def agregar_replica(self, escenario, resultado):
+        """
+        Agrega el resultado de una réplica (el diccionario de replicas.ejecutar_replica)
+        del escenario dado (argumentos de Simulacion).
+        """
+        self._replicas_pendientes.append((self.escenario_id(escenario), resultado))
+        if len(self._replicas_pendientes) >= self.tam_lote:
+            self._escribir_replicas()
+
+    def agregar_replicas(self, escenario, resultados):
+        """Agrega varias réplicas de un mismo escenario."""
+        for resultado in resultados:
+            self.agregar_replica(escenario, resultado)
+
+    def escenario_id(self, escenario):
+        """Identificador del escenario en la base; lo crea si no existe."""
+        completo = {**self._defectos, **(escenario or {})}
+        completo.pop("generadores", None)
+        completo.pop("sumidero", None)
+        if hasattr(completo.get("red_vial"), "tam_celda"):
+            completo["red_vial"] = completo["red_vial"].tam_celda
+        if completo.get("zonas") not in (None, False, True) and not isinstance(completo["zonas"], (str, dict)):
+            completo["zonas"] = completo["zonas"].origen or completo["zonas"].definicion
+        if isinstance(completo.get("mapas_calor"), MapasCalor):
+            completo["mapas_calor"] = completo["mapas_calor"].tam_celda
+        if completo.get("posiciones_iniciales"):
+            completo["posiciones_iniciales"] = [list(p) for p in completo["posiciones_iniciales"]]
+            completo["num_vehiculos"] = len(completo["posiciones_iniciales"])
+        clave = json.dumps(completo, sort_keys=True)
+
+        if clave not in self._escenarios:
+            fila = self.conexion.execute("SELECT id FROM escenarios WHERE parametros = ?", (clave,)).fetchone()
+            if fila is None:
+                # OR IGNORE: otro proceso pudo crear el mismo escenario entre ambas consultas
+                with self.conexion:
+                    self.conexion.execute(
+                        f"INSERT OR IGNORE INTO escenarios (parametros, {', '.join(CLAVES_ESCENARIO)}) "
+                        f"VALUES (?, {', '.join('?' for _ in CLAVES_ESCENARIO)})",
+                        (clave, *(completo[c] for c in CLAVES_ESCENARIO))
+                    )
+                fila = self.conexion.execute("SELECT id FROM escenarios WHERE parametros = ?", (clave,)).fetchone()
+            self._escenarios[clave] = fila[0]
+        return self._escenarios[clave]
+
+    def confirmar(self):
+        """Escribe en la base todo lo pendiente."""
+        self._escribir_pruebas()
+        self._escribir_replicas()
+
+    def cerrar(self):
+        """Confirma lo pendiente y cierra la conexión (aunque la escritura falle)."""
+        try:
+            self.confirmar()
+        finally:
+            self.conexion.close()
+
+    def _migrar(self):
+        """
+        Lleva una base creada con una versión anterior del esquema a VERSION_ESQUEMA:
+        agrega las columnas de contadores que falten en vehiculos y reconstruye las
+        tablas cuyas columnas pasaron de INTEGER a TEXT, conservando sus filas.
+        """
+        if self.conexion.execute("PRAGMA user_version").fetchone()[0] >= VERSION_ESQUEMA:
+            return
+        with self.conexion:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            columnas = self._columnas("vehiculos")
+            for contador in CONTADORES_VEHICULO:
+                if contador not in columnas:
+                    self.conexion.execute(f"ALTER TABLE vehiculos ADD COLUMN {contador} REAL")
+
+            for tabla, texto in _COLUMNAS_TEXTO.items():
+                columnas = self._columnas(tabla)
+                if all(columnas[c] == "TEXT" for c in texto):
+                    continue
+                definicion = re.search(rf"CREATE TABLE IF NOT EXISTS {tabla} \((.*?)\);", _ESQUEMA, re.S).group(1)
+                self.conexion.execute(f"CREATE TABLE {tabla}_nueva ({definicion})")
+                self.conexion.execute(
+                    f"INSERT INTO {tabla}_nueva SELECT "
+                    f"{', '.join(f'CAST({c} AS TEXT)' if c in texto else c for c in columnas)} FROM {tabla}"
+                )
+                self.conexion.execute(f"DROP TABLE {tabla}")
+                self.conexion.execute(f"ALTER TABLE {tabla}_nueva RENAME TO {tabla}")
+            self.conexion.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        # Los índices de las tablas reconstruidas se eliminaron con ellas
+        self.conexion.executescript(_ESQUEMA)
+
+    def _columnas(self, tabla):
+        """Columnas de una tabla de la base, en orden, con su tipo declarado."""
+        return {fila[1]: fila[2] for fila in self.conexion.execute(f"PRAGMA table_info({tabla})")}
+
+    def _siguiente_id(self, tabla):
+        # Se llama dentro de una transacción BEGIN IMMEDIATE: ningún otro escritor puede
+        # insertar entre esta consulta y las inserciones con los identificadores asignados
+        return self.conexion.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabla}").fetchone()[0]
+
+    def _escribir_pruebas(self):
+        if not self._pruebas_pendientes:
+            return
+        try:
+            self._insertar_pruebas()
+        finally:
+            # Un lote rechazado no se reintenta: volvería a fallar al confirmar y al cerrar
+            self._pruebas_pendientes = []
+
+    def _insertar_pruebas(self):
+        with self.conexion:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            primero = self._siguiente_id("pruebas_generadores")
+            ids = range(primero, primero + len(self._pruebas_pendientes))
+            self.conexion.executemany(
+                "INSERT INTO pruebas_generadores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, *fila) for i, (fila, _, _) in zip(ids, self._pruebas_pendientes))
+            )
+            self.conexion.executemany(
+                "INSERT INTO frecuencias VALUES (?, ?, ?)",
+                ((i, j, f) for i, (_, frecuencias, _) in zip(ids, self._pruebas_pendientes)
+                 for j, f in enumerate(frecuencias))
+            )
+            self.conexion.executemany(
+                "INSERT INTO pruebas_adicionales VALUES (?, ?, ?)",
+                ((i, nombre, valor) for i, (_, _, adicionales) in zip(ids, self._pruebas_pendientes)
+                 for nombre, valor in adicionales.items())
+            )
+
+    def _escribir_replicas(self):
+        if not self._replicas_pendientes:
+            return
+        try:
+            self._insertar_replicas()
+        finally:
+            self._replicas_pendientes = []
+
+    def _insertar_replicas(self):
+        with self.conexion:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            primero = self._siguiente_id("replicas")
+            ids = range(primero, primero + len(self._replicas_pendientes))
+            self.conexion.executemany(
+                "INSERT INTO replicas VALUES (?, ?, ?, ?, ?)",
+                ((i, escenario, r["replica"],
+                  *(_texto(r.get("semillas", {}).get(nombre)) for nombre in ("vehiculos", "reportes")))
+                 for i, (escenario, r) in zip(ids, self._replicas_pendientes))
+            )
+            self.conexion.executemany(
+                "INSERT INTO metricas VALUES (?, ?, ?)",
+                ((i, nombre, valor) for i, (_, r) in zip(ids, self._replicas_pendientes)
+                 for nombre, valor in r["metricas"].items())
+            )
+            self.conexion.executemany(
+                f"INSERT INTO vehiculos VALUES (?, ?, {', '.join('?' for _ in CONTADORES_VEHICULO)})",
+                ((i, nombre, *(contadores[c] for c in CONTADORES_VEHICULO))
+                 for i, (_, r) in zip(ids, self._replicas_pendientes)
+                 for nombre, contadores in r["vehiculos"].items())
+            )
+
+    # ---------- Consultas ----------
+
+    def consultar(self, sql, parametros=()):
+        """Ejecuta una consulta SQL (tras confirmar lo pendiente) y retorna sus filas."""
+        self.confirmar()
+        return self.conexion.execute(sql, parametros).fetchall()
+
+    def resumen_metrica(self, nombre, **filtros):
+        """
+        Media, mínimo, máximo y número de réplicas de una métrica por escenario.
+        Los filtros son igualdades sobre CLAVES_ESCENARIO (por ejemplo num_vehiculos=3).
+
+        Retorna: lista de diccionarios con las claves de escenario y n, media, minimo, maximo
+        """
+        desconocidos = set(filtros) - set(CLAVES_ESCENARIO)
+        if desconocidos:
+            raise ValueError(f"Filtros no válidos: {sorted(desconocidos)}")
+        condiciones = "".join(f" AND e.{c} = ?" for c in filtros)
+        filas = self.consultar(
+            f"SELECT {', '.join('e.' + c for c in CLAVES_ESCENARIO)}, "
+            f"COUNT(*), AVG(x.valor), MIN(x.valor), MAX(x.valor) "
+            f"FROM metricas x JOIN replicas r ON r.id = x.replica_id JOIN escenarios e ON e.id = r.escenario_id "
+            f"WHERE x.nombre = ?{condiciones} GROUP BY e.id ORDER BY e.id",
+            (nombre, *filtros.values())
+        )
+        return [dict(zip(CLAVES_ESCENARIO + ("n", "media", "minimo", "maximo"), fila)) for fila in filas]
+
+    # ---------- Exportación a CSV ----------
+
+    def exportar_replicas_csv(self, archivo="resultados_replicas.csv"):
+        """
+        Exporta una fila por réplica: claves del escenario, réplica, semillas, cada
+        métrica y la suma de cada contador de la flota (columnas "flota_<contador>").
+
+        Retorna: número de filas escritas
+        """
+        self.confirmar()
+        nombres = [f[0] for f in self.conexion.execute("SELECT DISTINCT nombre FROM metricas ORDER BY nombre")]
+        columnas_metricas = ", ".join(
+            f"(SELECT valor FROM metricas WHERE replica_id = r.id AND nombre = ?) AS \"{n}\"" for n in nombres
+        )
+        consulta = (
+            f"SELECT r.escenario_id, {', '.join('e.' + c for c in CLAVES_ESCENARIO)}, r.replica, "
+            f"r.semilla_vehiculos, r.semilla_reportes"
+            f"{', ' + columnas_metricas if nombres else ''}, "
+            f"{', '.join(f'(SELECT SUM({c}) FROM vehiculos WHERE replica_id = r.id)' for c in CONTADORES_VEHICULO)} "
+            f"FROM replicas r JOIN escenarios e ON e.id = r.escenario_id ORDER BY r.id"
+        )
+        encabezados = (["escenario", *CLAVES_ESCENARIO, "replica", "semilla_vehiculos", "semilla_reportes"]
+                       + nombres + [f"flota_{c}" for c in CONTADORES_VEHICULO])
+        return self._escribir_csv(archivo, encabezados, self.conexion.execute(consulta, nombres))
+
+    def exportar_pruebas_csv(self, archivo="resultados_generadores.csv"):
+        """
+        Exporta las pruebas de generadores con el formato de guardar_resultados
+        (frecuencias como lista en una celda).
+
+        Retorna: número de filas escritas
+        """
+        self.confirmar()
+        consulta = (
+            "SELECT p.fecha, p.generador, p.a, p.c, p.m, p.x0, p.chi_cuadrado, "
+            "(SELECT '[' || GROUP_CONCAT(frecuencia, ', ') || ']' "
+            " FROM (SELECT frecuencia FROM frecuencias WHERE prueba_id = p.id ORDER BY intervalo)), "
+            "p.distancia_promedio, p.distancia_esperada, p.diferencia, p.estado "
+            "FROM pruebas_generadores p ORDER BY p.id"
+        )
+        encabezados = ["Fecha", "Generador", "a", "c", "m", "x0", "Chi²", "Frecuencias Observadas",
+                       "Distancia Promedio", "Distancia Esperada", "Diferencia", "Estado"]
+        return self._escribir_csv(archivo, encabezados, self.conexion.execute(consulta))
+
+    @staticmethod
+    def _escribir_csv(archivo, encabezados, filas):
+        total = 0
+        with open(archivo, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(encabezados)
+            for fila in filas:
+                writer.writerow(fila)
+                total += 1
+        return total
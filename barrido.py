@@ -0,0 +1,177 @@
+# ============================================================
+# barrido.py
+# Barrido de parámetros: tasa de incidentes, flota, velocidad y duración
+# ============================================================
+
+import csv
+import itertools
+import numbers
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from replicas import ejecutar_replica, validar_replicas
+
+# Columnas de la tabla de resultados (una fila por celda × réplica)
+COLUMNAS = [
+    "escenario",
+    "lambda_incidentes",
+    "num_vehiculos",
+    "velocidad_vehiculos",
+    "duracion_simulacion",
+    "replica",
+    "incidentes_totales",
+    "incidentes_exitosos",
+    "incidentes_fallidos",
+    "usuarios_no_encontrados",
+    "sin_vehiculos",
+    "distancia_total"
+]
+
+
+def construir_rejilla(lambdas, flotas, velocidades, duraciones, intervalo=1.0):
+    """
+    Construye la lista de escenarios del producto cartesiano de los parámetros.
+
+    Parámetros:
+        lambdas (list): Tasas de incidentes λ.
+        flotas (list): Tamaños de flota (enteros, también de NumPy) o listas de posiciones iniciales [(x, y), ...].
+        velocidades (list): Velocidades de los vehículos.
+        duraciones (list): Duraciones de la simulación.
+        intervalo (float): Salto de tiempo por ciclo, común a todos los escenarios.
+
+    Retorna: lista de diccionarios de argumentos para Simulacion
+    """
+    rejilla = []
+    for lmbda, flota, velocidad, duracion in itertools.product(lambdas, flotas, velocidades, duraciones):
+        escenario = {
+            "duracion_simulacion": duracion,
+            "intervalo": intervalo,
+            "lambda_incidentes": lmbda,
+            "velocidad_vehiculos": velocidad
+        }
+        if isinstance(flota, numbers.Integral):
+            # int() también acepta enteros de NumPy (por ejemplo, de np.arange)
+            escenario["num_vehiculos"] = int(flota)
+        else:
+            escenario["posiciones_iniciales"] = [tuple(p) for p in flota]
+        rejilla.append(escenario)
+    return rejilla
+
+
+def _costo_estimado(escenario):
+    """Costo relativo de un escenario: ticks × (incidentes por tick + vehículos en patrulla)."""
+    ticks = escenario["duracion_simulacion"] / escenario.get("intervalo", 1.0)
+    flota = len(escenario.get("posiciones_iniciales") or ()) or escenario.get("num_vehiculos", 3)
+    return ticks * (escenario["lambda_incidentes"] * escenario.get("intervalo", 1.0) + flota)
+
+
+def _fila(indice_escenario, escenario, resultado):
+    """Convierte el resultado de una réplica en una fila de la tabla de resultados."""
+    metricas = resultado["metricas"]
+    vehiculos = resultado["vehiculos"].values()
+    no_encontrados = sum(v["incidentes_fallidos"] for v in vehiculos)
+
+    return {
+        "escenario": indice_escenario,
+        "lambda_incidentes": escenario["lambda_incidentes"],
+        "num_vehiculos": len(resultado["vehiculos"]),
+        "velocidad_vehiculos": escenario["velocidad_vehiculos"],
+        "duracion_simulacion": escenario["duracion_simulacion"],
+        "replica": resultado["replica"],
+        "incidentes_totales": metricas["incidentes_totales"],
+        "incidentes_exitosos": metricas["incidentes_exitosos"],
+        "incidentes_fallidos": metricas["incidentes_fallidos"],
+        "usuarios_no_encontrados": no_encontrados,
+        "sin_vehiculos": metricas["incidentes_fallidos"] - no_encontrados,
+        "distancia_total": sum(v["distancia_total"] for v in vehiculos)
+    }
+
+
+def ejecutar_barrido_resultados(rejilla, num_replicas, num_procesos=None, parametros_generadores=None):
+    """
+    Ejecuta todas las combinaciones escenario × réplica en procesos de trabajo y
+    entrega los resultados completos a medida que terminan (generador).
+
+    Las tareas se envían de la más costosa a la más barata y cada proceso toma la
+    siguiente cuando queda libre, de modo que las celdas de λ alto no quedan al final
+    desbalanceando la carga. La réplica r de cada escenario usa el mismo subflujo de
+    números aleatorios (números aleatorios comunes entre escenarios).
+
+    Parámetros:
+        rejilla (list): Escenarios, por ejemplo los de construir_rejilla.
+        num_replicas (int): Réplicas por escenario.
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles).
+        parametros_generadores (dict): Parámetros opcionales de los generadores.
+
+    Produce: tuplas (índice del escenario, resultado de replicas.ejecutar_replica)
+    """
+    validar_replicas(num_replicas, parametros_generadores)
+    tareas = [
+        (indice, replica)
+        for indice in range(len(rejilla))
+        for replica in range(num_replicas)
+    ]
+    tareas.sort(key=lambda t: _costo_estimado(rejilla[t[0]]), reverse=True)
+
+    with ProcessPoolExecutor(max_workers=num_procesos or os.cpu_count() or 1) as ejecutor:
+        futuros = {
+            ejecutor.submit(ejecutar_replica, replica, num_replicas, rejilla[indice], parametros_generadores): indice
+            for indice, replica in tareas
+        }
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
+
+
+def ejecutar_barrido(rejilla, num_replicas, num_procesos=None, parametros_generadores=None):
+    """
+    Igual que ejecutar_barrido_resultados, pero entrega cada réplica como una fila
+    de la tabla de resultados.
+
+    Produce: diccionarios con las columnas de COLUMNAS
+    """
+    for indice, resultado in ejecutar_barrido_resultados(rejilla, num_replicas, num_procesos, parametros_generadores):
+        yield _fila(indice, rejilla[indice], resultado)
+
+
+def guardar_almacen(rejilla, resultados, almacen):
+    """
+    Guarda en un AlmacenResultados los resultados de ejecutar_barrido_resultados a
+    medida que llegan (el almacén los escribe por lotes en transacciones).
+
+    Retorna: número de réplicas guardadas
+    """
+    total = 0
+    for indice, resultado in resultados:
+        almacen.agregar_replica(rejilla[indice], resultado)
+        total += 1
+    almacen.confirmar()
+    return total
+
+
+def guardar_tabla(filas, archivo="resultados_barrido.csv"):
+    """
+    Escribe las filas en un CSV a medida que llegan, de modo que los resultados
+    parciales quedan en disco mientras el barrido sigue en ejecución.
+
+    Retorna: número de filas escritas
+    """
+    total = 0
+    with open(archivo, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNAS)
+        writer.writeheader()
+        for fila in filas:
+            writer.writerow(fila)
+            f.flush()
+            total += 1
+    return total
+
+
+if __name__ == "__main__":
+    rejilla = construir_rejilla(
+        lambdas=[0.5, 1.0, 2.0],
+        flotas=[2, 3, 5],
+        velocidades=[2.5],
+        duraciones=[100]
+    )
+    filas = guardar_tabla(ejecutar_barrido(rejilla, num_replicas=5))
+    print(f"Barrido completado: {len(rejilla)} escenarios, {filas} filas en resultados_barrido.csv")
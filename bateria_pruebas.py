@@ -0,0 +1,243 @@
+# ============================================================
+# bateria_pruebas.py
+# Batería ampliada de pruebas de aleatoriedad y cribado de candidatos LCG
+# ============================================================
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from estadisticas import valor_p_chi2
+from generadores import GeneradorMixto, AcumuladorDistancia, AcumuladorFrecuencia
+from registro_resultados import guardar_resultados
+
+_NORMAL = NormalDist()
+
+# Probabilidades de cada mano en la prueba de póker (5 dígitos)
+PROBABILIDADES_POKER = {
+    "todos_diferentes": 0.3024,
+    "un_par": 0.504,
+    "dos_pares": 0.108,
+    "tercia": 0.072,
+    "full": 0.009,
+    "poker": 0.0045,
+    "quintilla": 0.0001,
+}
+
+
+def _resultado(prueba, estadistico, valor_p, alfa):
+    return {"prueba": prueba, "estadistico": float(estadistico), "valor_p": float(valor_p),
+            "aprobada": bool(valor_p >= alfa)}
+
+
+def _valor_p_normal(z):
+    """Valor p bilateral de un estadístico normal estándar."""
+    return 2.0 * (1.0 - _NORMAL.cdf(abs(z)))
+
+
+def prueba_corridas(valores, alfa=0.05):
+    """Corridas arriba y abajo: número de rachas crecientes/decrecientes consecutivas."""
+    n = len(valores)
+    signos = np.sign(np.diff(valores))
+    signos = signos[signos != 0]
+    corridas = 1 + int(np.count_nonzero(signos[1:] != signos[:-1])) if len(signos) else 0
+
+    media = (2 * n - 1) / 3
+    varianza = (16 * n - 29) / 90
+    z = (corridas - media) / math.sqrt(varianza)
+    return _resultado("corridas", z, _valor_p_normal(z), alfa)
+
+
+def prueba_series(valores, num_intervalos=5, alfa=0.05):
+    """Series: pares consecutivos no solapados en una rejilla k × k, prueba chi-cuadrado."""
+    pares = valores[:len(valores) // 2 * 2].reshape(-1, 2)
+    celdas = np.minimum((pares * num_intervalos).astype(np.int64), num_intervalos - 1)
+    observadas = np.bincount(celdas[:, 0] * num_intervalos + celdas[:, 1], minlength=num_intervalos ** 2)
+
+    esperada = len(pares) / num_intervalos ** 2
+    chi_cuadrado = float(((observadas - esperada) ** 2 / esperada).sum())
+    return _resultado("series", chi_cuadrado, valor_p_chi2(chi_cuadrado, num_intervalos ** 2 - 1), alfa)
+
+
+def prueba_huecos(valores, alfa_intervalo=0.0, beta_intervalo=0.5, max_hueco=10, alfa=0.05):
+    """
+    Huecos: longitudes entre apariciones sucesivas de valores en [alfa_intervalo, beta_intervalo).
+    Las longitudes siguen una geométrica de parámetro p = beta − alfa; los huecos de
+    longitud >= max_hueco se agrupan en una sola clase.
+    """
+    posiciones = np.flatnonzero((valores >= alfa_intervalo) & (valores < beta_intervalo))
+    huecos = np.diff(posiciones) - 1
+    if len(huecos) == 0:
+        # Menos de dos apariciones en el intervalo: no hay huecos que comparar y el
+        # generador (degenerado) no pasa la prueba
+        return _resultado("huecos", math.inf, 0.0, alfa)
+    p = beta_intervalo - alfa_intervalo
+
+    observadas = np.bincount(np.minimum(huecos, max_hueco), minlength=max_hueco + 1)
+    probabilidades = p * (1 - p) ** np.arange(max_hueco)
+    probabilidades = np.append(probabilidades, (1 - p) ** max_hueco)
+    esperadas = len(huecos) * probabilidades
+
+    chi_cuadrado = float(((observadas - esperadas) ** 2 / esperadas).sum())
+    return _resultado("huecos", chi_cuadrado, valor_p_chi2(chi_cuadrado, max_hueco), alfa)
+
+
+def prueba_poker(valores, alfa=0.05):
+    """Póker: clasifica los primeros 5 dígitos decimales de cada número como una mano."""
+    digitos = (np.floor(valores * 100000).astype(np.int64)[:, None] // 10 ** np.arange(4, -1, -1)) % 10
+    conteos = (digitos[:, :, None] == np.arange(10)).sum(axis=1)
+    conteos.sort(axis=1)
+    mayor, segundo = conteos[:, -1], conteos[:, -2]
+
+    manos = {
+        "todos_diferentes": mayor == 1,
+        "un_par": (mayor == 2) & (segundo == 1),
+        "dos_pares": (mayor == 2) & (segundo == 2),
+        "tercia": (mayor == 3) & (segundo == 1),
+        "full": (mayor == 3) & (segundo == 2),
+        "poker": mayor == 4,
+        "quintilla": mayor == 5,
+    }
+    observadas = np.array([np.count_nonzero(manos[m]) for m in PROBABILIDADES_POKER])
+    esperadas = len(valores) * np.array(list(PROBABILIDADES_POKER.values()))
+
+    chi_cuadrado = float(((observadas - esperadas) ** 2 / esperadas).sum())
+    return _resultado("poker", chi_cuadrado, valor_p_chi2(chi_cuadrado, len(PROBABILIDADES_POKER) - 1), alfa)
+
+
+def _valor_p_kolmogorov(d, n):
+    """Valor p asintótico de Kolmogorov para el estadístico D con n observaciones."""
+    lmbda = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * d
+    if lmbda < 0.2:
+        return 1.0
+    suma = sum(2 * (-1) ** (j - 1) * math.exp(-2 * j * j * lmbda * lmbda) for j in range(1, 101))
+    return min(1.0, max(0.0, suma))
+
+
+def prueba_kolmogorov_smirnov(valores, alfa=0.05):
+    """Kolmogorov–Smirnov: máxima distancia entre la distribución empírica y la uniforme."""
+    n = len(valores)
+    ordenados = np.sort(valores)
+    i = np.arange(1, n + 1)
+    d = max(float((i / n - ordenados).max()), float((ordenados - (i - 1) / n).max()))
+    return _resultado("kolmogorov_smirnov", d, _valor_p_kolmogorov(d, n), alfa)
+
+
+def prueba_autocorrelacion(valores, desfase=1, alfa=0.05):
+    """Autocorrelación de desfase k: correlación entre U(i) y U(i+k), normal bajo independencia."""
+    centrados = valores - 0.5
+    productos = centrados[:-desfase] * centrados[desfase:]
+    rho = float(productos.mean()) * 12
+    z = rho * math.sqrt(len(productos))
+    return _resultado(f"autocorrelacion_{desfase}", z, _valor_p_normal(z), alfa)
+
+
+def ejecutar_bateria(valores, alfa=0.05, desfases=(1, 2, 5)):
+    """
+    Aplica toda la batería a un bloque de valores en [0,1).
+    Retorna: lista de resultados {"prueba", "estadistico", "valor_p", "aprobada"}
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    resultados = [
+        prueba_corridas(valores, alfa=alfa),
+        prueba_series(valores, alfa=alfa),
+        prueba_huecos(valores, alfa=alfa),
+        prueba_poker(valores, alfa=alfa),
+        prueba_kolmogorov_smirnov(valores, alfa=alfa),
+    ]
+    resultados += [prueba_autocorrelacion(valores, desfase=k, alfa=alfa) for k in desfases]
+    return resultados
+
+
+def evaluar_candidato(candidato, n=100000, alfa=0.05):
+    """
+    Genera n valores de un candidato {"a", "c", "m", "x0"} y le aplica las pruebas de
+    frecuencia, distancia y la batería completa.
+    Retorna: diccionario con los parámetros, los resultados y si aprobó todas
+    """
+    generador = GeneradorMixto(candidato["a"], candidato["c"], candidato["m"], candidato["x0"])
+    valores = generador.aleatorio_lote(n).astype(np.float64)
+
+    frecuencia = AcumuladorFrecuencia()
+    frecuencia.agregar(valores)
+    distancia = AcumuladorDistancia()
+    distancia.agregar(valores)
+    chi_cuadrado, frecuencias = frecuencia.resultado()
+    promedio, esperado, diferencia = distancia.resultado()
+
+    bateria = ejecutar_bateria(valores, alfa=alfa)
+    aprobada = valor_p_chi2(chi_cuadrado, len(frecuencias) - 1) >= alfa and all(r["aprobada"] for r in bateria)
+
+    return {
+        "parametros": dict(candidato),
+        "chi_cuadrado": chi_cuadrado,
+        "frecuencias": frecuencias,
+        "promedio": promedio,
+        "esperado": esperado,
+        "diferencia": diferencia,
+        "bateria": bateria,
+        "aprobada": aprobada
+    }
+
+
+def _evaluar_tarea(tarea):
+    return evaluar_candidato(*tarea)
+
+
+def cribar_candidatos(candidatos, n=100000, alfa=0.05, num_procesos=None, archivo="resultados_cribado.csv",
+                      almacen=None):
+    """
+    Evalúa muchos candidatos (a, c, m, x0) en paralelo y escribe una fila por
+    candidato con guardar_resultados (incluye el valor p de cada prueba de la batería),
+    o en un AlmacenResultados si se indica uno.
+
+    Parámetros:
+        candidatos (list): Diccionarios con las claves a, c, m, x0.
+        n (int): Valores generados por candidato.
+        alfa (float): Nivel de significancia.
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles).
+        archivo (str): CSV de salida.
+        almacen (AlmacenResultados): Almacén SQLite opcional en lugar del CSV.
+
+    Retorna: lista de evaluaciones en el orden de los candidatos
+    """
+    tareas = [(candidato, n, alfa) for candidato in candidatos]
+    trabajadores = num_procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        evaluaciones = list(ejecutor.map(_evaluar_tarea, tareas, chunksize=max(1, len(tareas) // (trabajadores * 4))))
+
+    guardar = almacen.agregar_prueba if almacen is not None else guardar_resultados
+    destino = {} if almacen is not None else {"archivo": archivo}
+    for e in evaluaciones:
+        p = e["parametros"]
+        guardar(
+            f"LCG a={p['a']} c={p['c']} m={p['m']}",
+            p,
+            e["chi_cuadrado"],
+            e["frecuencias"],
+            e["promedio"],
+            e["esperado"],
+            e["diferencia"],
+            "Aprobada" if e["aprobada"] else "Posible desviación",
+            pruebas_adicionales={f"p_{r['prueba']}": r["valor_p"] for r in e["bateria"]},
+            **destino
+        )
+
+    return evaluaciones
+
+
+if __name__ == "__main__":
+    candidatos = [
+        {"a": 501, "c": 547, "m": 1000, "x0": 827},
+        {"a": 5001, "c": 4607, "m": 10000, "x0": 4049},
+        {"a": 1103515245, "c": 12345, "m": 2**31, "x0": 1},
+        {"a": 69069, "c": 1, "m": 2**32, "x0": 1},
+    ]
+    for e in cribar_candidatos(candidatos, n=10000):
+        p = e["parametros"]
+        fallidas = [r["prueba"] for r in e["bateria"] if not r["aprobada"]]
+        print(f"a={p['a']:<12} c={p['c']:<8} m={p['m']:<12} "
+              f"{'Aprobada' if e['aprobada'] else 'Posible desviación'} {fallidas}")
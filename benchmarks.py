@@ -0,0 +1,399 @@
+# ============================================================
+# benchmarks.py
+# Medición de rendimiento de las rutas críticas, curvas de escala y
+# comparación contra una línea base guardada
+# ============================================================
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+from time import perf_counter_ns
+
+import numpy as np
+
+from eventos import evento_incidente, evento_incidente_lote, evento_tick_patrulla_con_rutas
+from generadores import crear_generadores
+from geometria import A1, A2, A3, MAPA_LIMITES
+from registro_eventos import SumideroNulo
+from simulacion import Simulacion
+from zonas import RegistroZonas
+
+VERSION_RESULTADOS = 1
+ARCHIVO_RESULTADOS = "benchmarks.json"
+ARCHIVO_BASE = "benchmarks_base.json"
+
+# Rejillas de parámetros de los benchmarks de despacho y de ejecución completa
+FLOTAS = (3, 10, 30, 100)
+LAMBDAS = (0.5, 2.0, 8.0)
+DURACIONES = (100, 1000)
+MODOS = ("ticks", "eventos")
+
+# Rejilla reducida (--rapido) para verificaciones en cada cambio
+FLOTAS_RAPIDO = (3, 30)
+LAMBDAS_RAPIDO = (2.0,)
+DURACIONES_RAPIDO = (100,)
+
+# Cantidad de zonas del benchmark de ubicación de puntos
+CANTIDADES_ZONAS = (3, 12, 48)
+
+
+def medir(operacion, repeticiones=5, minimo_s=0.05):
+    """
+    Mide el tiempo por llamada de operacion() con perf_counter_ns.
+
+    Primero calibra cuántas llamadas caben en minimo_s (duplicando hasta
+    alcanzarlo, como timeit.autorange); luego repite la medición 'repeticiones'
+    veces y toma la mejor, que es la menos afectada por interrupciones del sistema.
+
+    Retorna: (ns por llamada, llamadas por repetición)
+    """
+    llamadas = 1
+    while True:
+        inicio = perf_counter_ns()
+        for _ in range(llamadas):
+            operacion()
+        transcurrido = perf_counter_ns() - inicio
+        if transcurrido >= minimo_s * 1e9 or llamadas >= 1 << 24:
+            break
+        llamadas *= 2
+
+    mejor = transcurrido
+    for _ in range(repeticiones - 1):
+        inicio = perf_counter_ns()
+        for _ in range(llamadas):
+            operacion()
+        mejor = min(mejor, perf_counter_ns() - inicio)
+    return mejor / llamadas, llamadas
+
+
+def _resultado(nombre, parametros, ns_por_op, llamadas, **extra):
+    return {"nombre": nombre, "parametros": parametros, "ns_por_op": ns_por_op, "llamadas": llamadas, **extra}
+
+
+# ---------- Benchmarks ----------
+
+def bench_generador(repeticiones):
+    """GeneradorMixto.aleatorio y poisson (tabla para λ chico, rechazo para λ grande)."""
+    generador = crear_generadores()["reportes"]
+    resultados = [_resultado("generador.aleatorio", {}, *medir(generador.aleatorio, repeticiones))]
+    for lmbda in (0.5, 8.0, 100.0):
+        resultados.append(_resultado(
+            "generador.poisson", {"lambda": lmbda}, *medir(lambda: generador.poisson(lmbda), repeticiones)))
+    return resultados
+
+
+def bench_incidente(repeticiones):
+    """evento_incidente sin salida (zona, punto dentro del área y evento)."""
+    generador = crear_generadores()["reportes"]
+    sumidero = SumideroNulo()
+    return [_resultado("evento_incidente", {}, *medir(lambda: evento_incidente(generador, sumidero), repeticiones))]
+
+
+def bench_patrulla(repeticiones):
+    """evento_tick_patrulla_con_rutas de un vehículo (diccionario) en cada una de las rutas."""
+    generador = crear_generadores()["vehiculos"]
+    sumidero = SumideroNulo()
+    vehiculos = [{"nombre": f"Vehiculo {i + 1}", "x": 5.0, "y": 10.0} for i in range(3)]
+
+    def operacion():
+        for i, vehiculo in enumerate(vehiculos):
+            evento_tick_patrulla_con_rutas(vehiculo, i, generador, sumidero)
+
+    ns, llamadas = medir(operacion, repeticiones)
+    return [_resultado("patrulla_con_rutas", {}, ns / len(vehiculos), llamadas * len(vehiculos))]
+
+
+def bench_area(repeticiones, n=1000):
+    """Area.contiene sobre puntos uniformes del mapa (mezcla de rechazos por caja y pruebas exactas)."""
+    azar = np.random.default_rng(0)
+    xs = azar.uniform(MAPA_LIMITES["x_min"], MAPA_LIMITES["x_max"], n).tolist()
+    ys = azar.uniform(MAPA_LIMITES["y_min"], MAPA_LIMITES["y_max"], n).tolist()
+    puntos = list(zip(xs, ys))
+    resultados = []
+    for area in (A1, A2, A3):
+        contiene = area.contiene
+
+        def operacion():
+            for x, y in puntos:
+                contiene(x, y)
+
+        ns, llamadas = medir(operacion, repeticiones)
+        resultados.append(_resultado("area.contiene", {"area": area.nombre}, ns / n, llamadas * n))
+    return resultados
+
+
+def _registro_sintetico(cantidad):
+    """Registro de 'cantidad' zonas que se alternan entre círculos, sectores y polígonos sobre el mapa."""
+    columnas = math.ceil(math.sqrt(cantidad))
+    ancho = (MAPA_LIMITES["x_max"] - MAPA_LIMITES["x_min"]) / columnas
+    alto = (MAPA_LIMITES["y_max"] - MAPA_LIMITES["y_min"]) / math.ceil(cantidad / columnas)
+    radio = 0.45 * min(ancho, alto)
+    zonas = []
+    for k in range(cantidad):
+        cx = MAPA_LIMITES["x_min"] + (k % columnas + 0.5) * ancho
+        cy = MAPA_LIMITES["y_min"] + (k // columnas + 0.5) * alto
+        zona = {"nombre": f"Z{k}", "peso": 1, "destino": "EP1"}
+        if k % 3 == 0:
+            zona.update(forma="circulo", centro=[cx, cy], radio=radio)
+        elif k % 3 == 1:
+            zona.update(forma="sector", centro=[cx, cy], radio=radio, inicio=30 * k, fin=30 * k + 240)
+        else:
+            # Estrella de 6 puntas (no convexa)
+            zona.update(forma="poligono", vertices=[
+                [cx + radio * (1.0 if i % 2 == 0 else 0.5) * math.cos(i * math.pi / 6),
+                 cy + radio * (1.0 if i % 2 == 0 else 0.5) * math.sin(i * math.pi / 6)] for i in range(12)])
+        zonas.append(zona)
+    return RegistroZonas({"zonas": zonas})
+
+
+def bench_zonas(repeticiones, cantidades=CANTIDADES_ZONAS, n=1000):
+    """
+    RegistroZonas.zona_de sobre puntos uniformes del mapa, según la cantidad de
+    zonas (el costo no debería crecer con ella: una lectura de la grilla).
+    """
+    azar = np.random.default_rng(0)
+    xs = azar.uniform(MAPA_LIMITES["x_min"], MAPA_LIMITES["x_max"], n).tolist()
+    ys = azar.uniform(MAPA_LIMITES["y_min"], MAPA_LIMITES["y_max"], n).tolist()
+    puntos = list(zip(xs, ys))
+    resultados = []
+    for cantidad in cantidades:
+        zona_de = _registro_sintetico(cantidad).zona_de
+
+        def operacion():
+            for x, y in puntos:
+                zona_de(x, y)
+
+        ns, llamadas = medir(operacion, repeticiones)
+        resultados.append(_resultado("zonas.zona_de", {"zonas": cantidad}, ns / n, llamadas * n))
+    return resultados
+
+
+def bench_despacho(repeticiones, flotas, lambdas, duraciones, n=500):
+    """
+    Simulacion.seleccionar_vehiculo tras un calentamiento de 'duracion' con tasa λ
+    (posiciones y estados de la flota representativos del escenario). Cada llamada
+    despacha a un incidente de un conjunto fijo y devuelve el vehículo a patrulla.
+    """
+    resultados = []
+    for num_vehiculos, lmbda, duracion in itertools.product(flotas, lambdas, duraciones):
+        simulacion = Simulacion(duracion_simulacion=duracion, lambda_incidentes=lmbda,
+                                num_vehiculos=num_vehiculos, sumidero=SumideroNulo())
+        simulacion.ejecutar(mostrar=False)
+        incidentes = evento_incidente_lote(crear_generadores()["reportes"], n, SumideroNulo())
+        incidentes = [{"zona": z, "x": x, "y": y}
+                      for z, x, y in zip(incidentes["zona"], incidentes["x"].tolist(), incidentes["y"].tolist())]
+
+        def operacion():
+            for incidente in incidentes:
+                simulacion.seleccionar_vehiculo(incidente).estado = "PATRULLANDO"
+
+        ns, llamadas = medir(operacion, repeticiones)
+        parametros = {"flota": num_vehiculos, "lambda": lmbda, "duracion": duracion}
+        resultados.append(_resultado("despacho", parametros, ns / n, llamadas * n))
+    return resultados
+
+
+def bench_simulacion(repeticiones, flotas, lambdas, duraciones, modos=MODOS):
+    """
+    Simulacion.ejecutar completa sin salida, en ambos motores. Además del tiempo
+    total reporta los incidentes generados y el tiempo por incidente.
+    """
+    resultados = []
+    for modo, num_vehiculos, lmbda, duracion in itertools.product(modos, flotas, lambdas, duraciones):
+        mejor = math.inf
+        for _ in range(repeticiones):
+            simulacion = Simulacion(duracion_simulacion=duracion, lambda_incidentes=lmbda,
+                                    num_vehiculos=num_vehiculos, sumidero=SumideroNulo())
+            inicio = perf_counter_ns()
+            simulacion.ejecutar(mostrar=False, modo=modo)
+            mejor = min(mejor, perf_counter_ns() - inicio)
+        incidentes = simulacion.metricas["incidentes_totales"]
+        parametros = {"modo": modo, "flota": num_vehiculos, "lambda": lmbda, "duracion": duracion}
+        resultados.append(_resultado(
+            "simulacion", parametros, mejor, 1,
+            incidentes=incidentes,
+            ns_por_incidente=mejor / incidentes if incidentes else None
+        ))
+    return resultados
+
+
+# ---------- Ejecución, resultados y comparación ----------
+
+def ejecutar_benchmarks(rapido=False, repeticiones=5, filtro=None):
+    """
+    Ejecuta todos los benchmarks (o los que contienen 'filtro' en su nombre).
+
+    Parámetros:
+        rapido (bool): Usa la rejilla reducida de flota, λ y duración.
+        repeticiones (int): Repeticiones por medición (se reporta la mejor).
+        filtro (str): Subcadena del nombre de los benchmarks a ejecutar.
+
+    Retorna: diccionario con la plataforma, la fecha y la lista de resultados
+    """
+    flotas = FLOTAS_RAPIDO if rapido else FLOTAS
+    lambdas = LAMBDAS_RAPIDO if rapido else LAMBDAS
+    duraciones = DURACIONES_RAPIDO if rapido else DURACIONES
+    grupos = {
+        "generador": lambda: bench_generador(repeticiones),
+        "evento_incidente": lambda: bench_incidente(repeticiones),
+        "patrulla_con_rutas": lambda: bench_patrulla(repeticiones),
+        "area.contiene": lambda: bench_area(repeticiones),
+        "zonas.zona_de": lambda: bench_zonas(repeticiones),
+        "despacho": lambda: bench_despacho(repeticiones, flotas, lambdas, duraciones),
+        "simulacion": lambda: bench_simulacion(min(repeticiones, 3), flotas, lambdas, duraciones),
+    }
+
+    resultados = []
+    for nombre, grupo in grupos.items():
+        if filtro and filtro not in nombre:
+            continue
+        resultados.extend(grupo())
+
+    return {
+        "version": VERSION_RESULTADOS,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "plataforma": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sistema": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+            "nucleos": os.cpu_count()
+        },
+        "resultados": resultados
+    }
+
+
+def _clave(resultado):
+    return resultado["nombre"], json.dumps(resultado["parametros"], sort_keys=True)
+
+
+def comparar(actual, base, umbral=0.25):
+    """
+    Compara cada resultado con el de la línea base de mismo nombre y parámetros.
+
+    Parámetros:
+        actual (dict): Resultado de ejecutar_benchmarks().
+        base (dict): Línea base con el mismo formato.
+        umbral (float): Enlentecimiento relativo tolerado (0.25 = hasta 25% más lento).
+
+    Retorna: lista de (nombre, parámetros, ns base, ns actual, razón, regresión) de los
+             resultados presentes en ambos
+    """
+    en_base = {_clave(r): r for r in base["resultados"]}
+    filas = []
+    for r in actual["resultados"]:
+        anterior = en_base.get(_clave(r))
+        if anterior is None or not anterior["ns_por_op"]:
+            continue
+        razon = r["ns_por_op"] / anterior["ns_por_op"]
+        filas.append((r["nombre"], r["parametros"], anterior["ns_por_op"], r["ns_por_op"], razon, razon > 1 + umbral))
+    return filas
+
+
+def exponentes_escala(resultados, nombre, parametro):
+    """
+    Curva de escala: pendiente de log(tiempo) frente a log(parametro) para cada
+    combinación fija de los demás parámetros (1 = lineal, 0 = constante).
+
+    Retorna: lista de (otros parámetros, exponente)
+    """
+    grupos = {}
+    for r in resultados:
+        if r["nombre"] != nombre or parametro not in r["parametros"]:
+            continue
+        otros = {k: v for k, v in r["parametros"].items() if k != parametro}
+        grupos.setdefault(json.dumps(otros, sort_keys=True), []).append((r["parametros"][parametro], r["ns_por_op"]))
+
+    exponentes = []
+    for otros, puntos in grupos.items():
+        if len(puntos) < 2:
+            continue
+        x = np.log([p for p, _ in puntos])
+        y = np.log([t for _, t in puntos])
+        exponentes.append((json.loads(otros), float(np.polyfit(x, y, 1)[0])))
+    return exponentes
+
+
+def _formato_tiempo(ns):
+    for unidad, escala in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= escala:
+            return f"{ns / escala:.2f} {unidad}"
+    return f"{ns:.0f} ns"
+
+
+def _formato_parametros(parametros):
+    return ", ".join(f"{k}={v}" for k, v in parametros.items())
+
+
+def mostrar_resultados(resultados):
+    """Imprime los tiempos por operación y los exponentes de escala."""
+    print(" ")
+    print("BENCHMARKS")
+    print(" ")
+    print(f"   {'Benchmark':<20} {'Parámetros':<45} {'Tiempo/op':>12}")
+    print(f"   {'-'*79}")
+    for r in resultados["resultados"]:
+        print(f"   {r['nombre']:<20} {_formato_parametros(r['parametros']):<45} {_formato_tiempo(r['ns_por_op']):>12}")
+
+    print(f"\n CURVAS DE ESCALA (exponente de tiempo frente al parámetro)")
+    for nombre, parametro in (("zonas.zona_de", "zonas"), ("despacho", "flota"), ("simulacion", "flota"),
+                              ("simulacion", "lambda"), ("simulacion", "duracion")):
+        for otros, exponente in exponentes_escala(resultados["resultados"], nombre, parametro):
+            print(f"   {nombre:<12} vs {parametro:<9} ({_formato_parametros(otros)}): {exponente:.2f}")
+    print(" ")
+
+
+def mostrar_comparacion(filas, umbral):
+    """Imprime la comparación contra la línea base y retorna la cantidad de regresiones."""
+    print(f"\n COMPARACIÓN CON LA LÍNEA BASE (umbral +{umbral * 100:.0f}%)")
+    print(f"   {'Benchmark':<20} {'Parámetros':<45} {'Base':>10} {'Actual':>10} {'Razón':>7}")
+    print(f"   {'-'*96}")
+    regresiones = 0
+    for nombre, parametros, base, actual, razon, regresion in filas:
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"   {nombre:<20} {_formato_parametros(parametros):<45} {_formato_tiempo(base):>10} "
+              f"{_formato_tiempo(actual):>10} {razon:>6.2f}x{marca}")
+        regresiones += regresion
+    print(" ")
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de la simulación.")
+    parser.add_argument("--salida", default=ARCHIVO_RESULTADOS, help="Archivo JSON de resultados")
+    parser.add_argument("--base", default=ARCHIVO_BASE, help="Línea base con la que comparar (si existe)")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Enlentecimiento tolerado (0.25 = 25%%)")
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda los resultados como nueva línea base")
+    parser.add_argument("--rapido", action="store_true", help="Rejilla reducida de flota, λ y duración")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por medición")
+    parser.add_argument("--filtro", help="Solo los benchmarks cuyo nombre contiene este texto")
+    args = parser.parse_args(argumentos)
+
+    resultados = ejecutar_benchmarks(rapido=args.rapido, repeticiones=args.repeticiones, filtro=args.filtro)
+    mostrar_resultados(resultados)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        return 0
+
+    if not os.path.exists(args.base):
+        return 0
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    regresiones = mostrar_comparacion(comparar(resultados, base, args.umbral), args.umbral)
+    if regresiones:
+        print(f"{regresiones} benchmark(s) superan el umbral de enlentecimiento")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# ============================================================
+# calendario.py
+# Calendario de eventos (cola de prioridad) para la simulación por eventos discretos
+# ============================================================
+
+import heapq
+
+# Tipos de evento del motor por eventos
+INCIDENTE = "INCIDENTE"              # Llegada de un nuevo incidente
+LLEGADA = "LLEGADA"                  # Un vehículo llega al punto del incidente
+FIN_TRASLADO = "FIN_TRASLADO"        # Un vehículo termina el traslado a EP1/EP2
+WAYPOINT = "WAYPOINT"                # Un vehículo en patrulla alcanza su waypoint
+
+
+class CalendarioEventos:
+    """
+    Lista de eventos futuros ordenada por tiempo (montículo binario).
+    Los eventos con el mismo tiempo se atienden en el orden en que se programaron.
+    """
+
+    def __init__(self):
+        self._eventos = []
+        self._secuencia = 0
+
+    def programar(self, tiempo, tipo, datos=None):
+        """Agrega un evento de tipo 'tipo' que ocurrirá en 'tiempo'."""
+        heapq.heappush(self._eventos, (tiempo, self._secuencia, tipo, datos))
+        self._secuencia += 1
+
+    def siguiente(self):
+        """Extrae el próximo evento. Retorna: (tiempo, tipo, datos)"""
+        tiempo, _, tipo, datos = heapq.heappop(self._eventos)
+        return tiempo, tipo, datos
+
+    def proximo_tiempo(self):
+        """Tiempo del próximo evento, o infinito si el calendario está vacío."""
+        return self._eventos[0][0] if self._eventos else float("inf")
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def pendientes(self):
+        """Eventos pendientes como lista de (tiempo, secuencia, tipo, datos), en orden de atención."""
+        return sorted(self._eventos, key=lambda e: (e[0], e[1]))
+
+    @classmethod
+    def desde_pendientes(cls, eventos, secuencia):
+        """Reconstruye un calendario a partir de pendientes() y el contador de secuencia."""
+        calendario = cls()
+        calendario._eventos = [tuple(e) for e in eventos]
+        heapq.heapify(calendario._eventos)
+        calendario._secuencia = secuencia
+        return calendario
@@ -0,0 +1,227 @@
+# ============================================================
+# escenarios.py
+# Ejecución sin interfaz de uno o varios escenarios desde un
+# archivo JSON o TOML, en un solo proceso
+# ============================================================
+#
+# Uso:
+#   python escenarios.py escenarios.toml [--salida resultados.json] [--almacen resultados.db]
+#
+# Formato (TOML; el JSON equivalente usa las mismas claves):
+#
+#   [comun]                      # Valores por defecto de todos los escenarios
+#   duracion_simulacion = 200
+#   modo = "eventos"
+#
+#   [[escenarios]]
+#   nombre = "base"
+#   lambda_incidentes = 0.5
+#
+#   [[escenarios]]
+#   nombre = "alta demanda"
+#   lambda_incidentes = 2.0
+#   num_vehiculos = 6
+#   replicas = 20
+#
+# Además de los argumentos del constructor de Simulacion, cada escenario admite
+# nombre, modo ("ticks" o "eventos"), replicas (por defecto 1), procesos y
+# valores_por_replica (longitud de los subflujos de cada réplica). Con
+# red_vial = true (o el tamaño de celda en km) la red se carga una sola vez por
+# tamaño de celda en cada proceso y se comparte entre escenarios. Del mismo modo,
+# zonas = "archivo" (o true para zonas.json) compila el registro de zonas una sola
+# vez por archivo en cada proceso; las tareas de las réplicas solo llevan la referencia.
+# Con mapas_calor = true (o el tamaño de celda en km) y --mapas DIRECTORIO, los
+# mapas de calor de todas las réplicas se suman y se guardan como .npy en
+# DIRECTORIO/<nombre del escenario>/.
+#
+# Los módulos de simulación (NumPy incluido) se importan recién al ejecutar el
+# primer escenario, y los opcionales (TOML, red vial, SQLite, pool de procesos)
+# solo si el archivo o los argumentos los piden.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Claves del escenario que no son argumentos de Simulacion
+CLAVES_EJECUCION = ("nombre", "modo", "replicas", "procesos", "valores_por_replica")
+
+
+def cargar_escenarios(ruta):
+    """
+    Lee un archivo de escenarios (.json o .toml). El archivo puede ser una lista de
+    escenarios o un objeto con "escenarios" y, opcionalmente, "comun" (valores por
+    defecto que cada escenario puede reemplazar).
+
+    Retorna: lista de diccionarios, uno por escenario, con los valores comunes aplicados
+    """
+    if ruta.endswith(".toml"):
+        try:
+            import tomllib
+        except ModuleNotFoundError:  # Python < 3.11
+            import tomli as tomllib
+        with open(ruta, "rb") as f:
+            datos = tomllib.load(f)
+    else:
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+
+    if isinstance(datos, list):
+        datos = {"escenarios": datos}
+    comun = datos.get("comun", {})
+    escenarios = [{**comun, **escenario} for escenario in datos.get("escenarios", [])]
+    if not escenarios:
+        raise ValueError(f"{ruta} no define escenarios")
+    for i, escenario in enumerate(escenarios):
+        escenario.setdefault("nombre", f"escenario_{i + 1}")
+    return escenarios
+
+
+def _validar(escenario):
+    """Verifica que las claves del escenario sean argumentos de Simulacion o de ejecución."""
+    import inspect
+    from simulacion import Simulacion
+
+    admitidos = set(inspect.signature(Simulacion.__init__).parameters) - {"self", "generadores", "sumidero"}
+    desconocidas = set(escenario) - admitidos - set(CLAVES_EJECUCION)
+    if desconocidas:
+        raise ValueError(f"Escenario '{escenario['nombre']}': claves desconocidas {sorted(desconocidas)}")
+    if escenario.get("modo", "ticks") not in ("ticks", "eventos"):
+        raise ValueError(f"Escenario '{escenario['nombre']}': modo desconocido {escenario['modo']}")
+
+
+class EjecutorEscenarios:
+    """
+    Ejecuta escenarios en el proceso actual, reutilizando entre ellos los módulos
+    ya importados, las redes viales y los registros de zonas ya cargados.
+
+    Parámetros:
+        procesos (int): Procesos por defecto para escenarios con varias réplicas
+                        (1 = en serie dentro de este proceso).
+        almacen (AlmacenResultados): Si se indica, se guardan allí todas las réplicas.
+    """
+
+    def __init__(self, procesos=1, almacen=None):
+        self.procesos = procesos
+        self.almacen = almacen
+
+    def ejecutar(self, escenario):
+        """
+        Ejecuta las réplicas de un escenario.
+
+        Retorna: diccionario con el nombre, los parámetros, el modo, el tiempo de reloj,
+                 el resumen de replicas.resumir_replicas (métricas, percentiles y vehículos)
+                 y, si el escenario los pide, los mapas de calor de todas las réplicas
+                 sumados (MapasCalor)
+        """
+        from replicas import ejecutar_replicas_resultados, resumir_replicas
+
+        _validar(escenario)
+        parametros = {k: v for k, v in escenario.items() if k not in CLAVES_EJECUCION}
+        modo = escenario.get("modo", "ticks")
+        replicas = int(escenario.get("replicas", 1))
+        procesos = int(escenario.get("procesos", self.procesos))
+        # La red vial y las zonas viajan por referencia (tamaño de celda, ruta): cada
+        # proceso las carga una sola vez (replicas.cargar_recursos)
+        if parametros.get("red_vial") is True:
+            parametros["red_vial"] = 2.5
+        if parametros.get("zonas") is True:
+            from zonas import ARCHIVO_ZONAS
+            parametros["zonas"] = ARCHIVO_ZONAS
+
+        generadores = None
+        if "valores_por_replica" in escenario:
+            generadores = {"valores_por_replica": int(escenario["valores_por_replica"])}
+
+        inicio = time.perf_counter()
+        resultados = ejecutar_replicas_resultados(replicas, parametros, procesos, generadores, modo)
+        transcurrido = time.perf_counter() - inicio
+
+        if self.almacen is not None:
+            clave = dict(parametros, **({"modo": modo} if modo != "ticks" else {}))
+            self.almacen.agregar_replicas(clave, resultados)
+
+        resultado = {
+            "nombre": escenario["nombre"],
+            "parametros": {k: v for k, v in escenario.items() if k not in ("nombre", "procesos")},
+            "modo": modo,
+            "tiempo_s": transcurrido,
+            "resumen": resumir_replicas(resultados)
+        }
+        if all("mapas" in r for r in resultados):
+            from mapas_calor import MapasCalor
+            resultado["mapas"] = MapasCalor.combinar_exportados(r.pop("mapas") for r in resultados)
+        return resultado
+
+
+def _linea_resumen(resultado):
+    resumen = resultado["resumen"]
+    metricas = resumen["metricas"]
+    texto = (f"{resultado['nombre']:<24} {resumen['replicas']:>4} rép. "
+             f"{metricas['incidentes_exitosos']['media']:>9.1f} exitosos / "
+             f"{metricas['incidentes_totales']['media']:>9.1f} incidentes")
+    respuesta = (resumen.get("flujo") or {}).get("respuesta")
+    if respuesta and respuesta["n"]:
+        texto += f"   respuesta p50 {respuesta['p50']:.2f}  p95 {respuesta['p95']:.2f}"
+    return texto + f"   ({resultado['tiempo_s']:.2f} s)"
+
+
+def _serializable(valor):
+    """Convierte NaN/inf en None para escribir JSON estándar."""
+    if isinstance(valor, float) and (valor != valor or valor in (float("inf"), float("-inf"))):
+        return None
+    if isinstance(valor, dict):
+        return {k: _serializable(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_serializable(v) for v in valor]
+    return valor
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ejecuta escenarios de la simulación desde un archivo JSON o TOML.")
+    parser.add_argument("archivo", help="Archivo de escenarios (.json o .toml)")
+    parser.add_argument("--salida", help="Archivo JSON con los resúmenes (por defecto solo se imprimen)")
+    parser.add_argument("--almacen", help="Base SQLite donde guardar todas las réplicas")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para escenarios con varias réplicas (1 = en serie, 0 = núcleos disponibles)")
+    parser.add_argument("--mapas", help="Directorio donde guardar los mapas de calor (.npy) de cada escenario")
+    parser.add_argument("--silencioso", action="store_true", help="No imprime el resumen por escenario")
+    args = parser.parse_args(argumentos)
+
+    try:
+        escenarios = cargar_escenarios(args.archivo)
+        for escenario in escenarios:
+            _validar(escenario)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+
+    almacen = None
+    if args.almacen:
+        from almacen_resultados import AlmacenResultados
+        almacen = AlmacenResultados(args.almacen)
+
+    ejecutor = EjecutorEscenarios(procesos=args.procesos or os.cpu_count() or 1, almacen=almacen)
+    resultados = []
+    try:
+        for escenario in escenarios:
+            resultado = ejecutor.ejecutar(escenario)
+            mapas = resultado.pop("mapas", None)
+            if mapas is not None and args.mapas:
+                mapas.guardar(os.path.join(args.mapas, resultado["nombre"]))
+            resultados.append(resultado)
+            if not args.silencioso:
+                print(_linea_resumen(resultado))
+    finally:
+        if almacen is not None:
+            almacen.cerrar()
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(_serializable(resultados), f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
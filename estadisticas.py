@@ -0,0 +1,159 @@
+# ============================================================
+# estadisticas.py
+# Funciones estadísticas para resumir réplicas y evaluar pruebas
+# ============================================================
+
+import math
+
+
+def _fraccion_continua_beta(a, b, x):
+    """Evalúa la fracción continua de la función beta incompleta (método de Lentz)."""
+    minimo = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > minimo else minimo)
+    resultado = d
+
+    for m in range(1, 300):
+        m2 = 2 * m
+        # Paso par
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > minimo else minimo)
+        c = 1.0 + aa / c
+        c = c if abs(c) > minimo else minimo
+        resultado *= d * c
+        # Paso impar
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > minimo else minimo)
+        c = 1.0 + aa / c
+        c = c if abs(c) > minimo else minimo
+        delta = d * c
+        resultado *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+
+    return resultado
+
+
+def beta_incompleta(a, b, x):
+    """Función beta incompleta regularizada I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+
+    ln_factor = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log(1.0 - x))
+    factor = math.exp(ln_factor)
+
+    # La fracción continua converge rápido para x < (a+1)/(a+b+2); si no, se usa la simetría
+    if x < (a + 1.0) / (a + b + 2.0):
+        return factor * _fraccion_continua_beta(a, b, x) / a
+    return 1.0 - factor * _fraccion_continua_beta(b, a, 1.0 - x) / b
+
+
+def distribucion_t(t, grados_libertad):
+    """Función de distribución acumulada de la t de Student."""
+    x = grados_libertad / (grados_libertad + t * t)
+    cola = 0.5 * beta_incompleta(grados_libertad / 2.0, 0.5, x)
+    return 1.0 - cola if t > 0 else cola
+
+
+def cuantil_t(p, grados_libertad):
+    """
+    Cuantil de la t de Student: valor t tal que P(T <= t) = p.
+    Se obtiene por bisección sobre la distribución acumulada.
+    """
+    if not 0.0 < p < 1.0:
+        raise ValueError("La probabilidad debe estar en (0, 1)")
+    if p < 0.5:
+        return -cuantil_t(1.0 - p, grados_libertad)
+
+    inferior, superior = 0.0, 1.0
+    while distribucion_t(superior, grados_libertad) < p:
+        superior *= 2.0
+
+    for _ in range(100):
+        medio = (inferior + superior) / 2.0
+        if distribucion_t(medio, grados_libertad) < p:
+            inferior = medio
+        else:
+            superior = medio
+        if superior - inferior < 1e-12:
+            break
+
+    return (inferior + superior) / 2.0
+
+
+def gamma_incompleta(a, x):
+    """Función gamma incompleta inferior regularizada P(a, x)."""
+    if x <= 0.0:
+        return 0.0
+
+    ln_factor = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1.0:
+        # Serie
+        termino = suma = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1.0
+            termino *= x / ap
+            suma += termino
+            if abs(termino) < abs(suma) * 1e-15:
+                break
+        return suma * math.exp(ln_factor)
+
+    # Fracción continua (método de Lentz) para la cola superior
+    minimo = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / minimo
+    d = 1.0 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = 1.0 / (d if abs(d) > minimo else minimo)
+        c = b + an / c
+        c = c if abs(c) > minimo else minimo
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return 1.0 - math.exp(ln_factor) * h
+
+
+def valor_p_chi2(estadistico, grados_libertad):
+    """Probabilidad de la cola superior de una chi-cuadrado: P(X >= estadistico)."""
+    return 1.0 - gamma_incompleta(grados_libertad / 2.0, estadistico / 2.0)
+
+
+def intervalo_confianza(valores, nivel_confianza=0.95):
+    """
+    Calcula media, desviación estándar muestral e intervalo de confianza t
+    para la media de una lista de observaciones independientes.
+
+    Retorna: diccionario con media, desviacion, ic_inferior, ic_superior y n
+    """
+    n = len(valores)
+    if n == 0:
+        raise ValueError("Se requiere al menos una observación")
+
+    media = sum(valores) / n
+    if n == 1:
+        return {"n": 1, "media": media, "desviacion": 0.0, "ic_inferior": media, "ic_superior": media}
+
+    desviacion = math.sqrt(sum((v - media) ** 2 for v in valores) / (n - 1))
+    t_critico = cuantil_t(1.0 - (1.0 - nivel_confianza) / 2.0, n - 1)
+    margen = t_critico * desviacion / math.sqrt(n)
+
+    return {
+        "n": n,
+        "media": media,
+        "desviacion": desviacion,
+        "ic_inferior": media - margen,
+        "ic_superior": media + margen
+    }
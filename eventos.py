@@ -1,13 +1,36 @@
 import math
-from generadores import gen_vehiculos, gen_reportes
+
+import numpy as np
+
+from flota import NUM_WAYPOINTS, WAYPOINTS_RUTAS
 from geometria import   A1, A2, EP1, EP2, MAPA_LIMITES, RUTAS
+from registro_eventos import SumideroConsola
+
+# Sumidero por defecto: narrativa completa en consola
+CONSOLA = SumideroConsola()
+
+# Eventos que emite el paso de patrulla de la flota
+_EVENTOS_PATRULLA = frozenset(("EV_TICK_PATRULLA", "EV_TICK_RUTA", "EV_WAYPOINT"))
+
 
+def evento_incidente(gen_reportes, sumidero=CONSOLA, zonas=None):
+    """
+    Genera un incidente aleatorio en A1 o A2 con coordenadas válidas dentro del área.
+    gen_reportes: generador de la simulación usado para zona y coordenadas
+    sumidero: destino de los eventos (ver registro_eventos)
+    zonas: RegistroZonas (ver zonas.py) del que se sortean la zona, según sus pesos,
+           y la estación de destino; None usa A1 y A2
+    """
+    # Elegir zona aleatoriamente (se descartan 99 valores, como en la versión original,
+    # pero avanzando el generador en O(log k) en lugar de generarlos uno por uno)
+    gen_reportes.saltar(99)
+    if zonas is not None:
+        zona, x_coord, y_coord = zonas.muestrear(gen_reportes)
+        if "EV_INCIDENTE" in sumidero.activos:
+            sumidero.emitir("EV_INCIDENTE", zona.nombre, x_coord, y_coord)
+        return zonas.incidente(zona, x_coord, y_coord)
 
-def evento_incidente():
-    """Genera un incidente aleatorio en A1 o A2 con coordenadas válidas dentro del área."""
-    # Elegir zona aleatoriamente
-    for _ in range(100):
-        rand_zona = gen_reportes.aleatorio()
+    rand_zona = gen_reportes.aleatorio()
     zona_incidente = A1 if rand_zona < 0.5 else A2
     
     
@@ -16,7 +39,7 @@ def evento_incidente():
     if zona_incidente.tipo == "triangulo":
         # Generar punto aleatorio dentro del triángulo usando coordenadas baricéntricas
         vertices = zona_incidente.parametros["vertices"]
-        x_coord, y_coord = _generar_punto_en_triangulo(vertices)
+        x_coord, y_coord = _generar_punto_en_triangulo(vertices, gen_reportes)
 
     elif zona_incidente.tipo == "semicirculo":
         # Generar punto aleatorio en semicírculo con apertura hacia ABAJO
@@ -35,7 +58,8 @@ def evento_incidente():
     else:
         raise ValueError(f"Tipo de área desconocido: {zona_incidente.tipo}")
 
-    print(f"[EV_INCIDENTE] Generado en {zona_incidente.nombre:<3} | Coordenadas: ({x_coord:.2f}, {y_coord:.2f})")
+    if "EV_INCIDENTE" in sumidero.activos:
+        sumidero.emitir("EV_INCIDENTE", zona_incidente.nombre, x_coord, y_coord)
 
     return {
         "zona": zona_incidente.nombre,
@@ -44,7 +68,39 @@ def evento_incidente():
     }
 
 
-def _generar_punto_en_triangulo(vertices):
+def evento_incidente_lote(gen_reportes, n, sumidero=CONSOLA, zonas=None):
+    """
+    Genera n incidentes de una vez (los de un tick o los de todo el horizonte).
+
+    Produce exactamente los mismos incidentes que n llamadas a evento_incidente:
+    cada incidente descarta 99 valores, usa uno para la zona y dos para las
+    coordenadas (zonas.valores con un registro de zonas), pero los descartados
+    nunca se generan (ver aleatorio_filas).
+
+    Retorna: diccionario con arreglos de NumPy "zona", "x" e "y"
+    """
+    if zonas is not None:
+        u = gen_reportes.aleatorio_filas(n, tomar=1 + zonas.valores, descartar=99)
+        indices, x, y = zonas.muestrear_lote(u)
+        nombres = np.array([zona.nombre for zona in zonas.con_incidentes])[indices]
+    else:
+        u = gen_reportes.aleatorio_filas(n, tomar=3, descartar=99)
+        en_a1 = u[:, 0] < 0.5
+
+        x = np.empty(n)
+        y = np.empty(n)
+        x[en_a1], y[en_a1] = A1.transformar_uniformes(u[en_a1, 1], u[en_a1, 2])
+        x[~en_a1], y[~en_a1] = A2.transformar_uniformes(u[~en_a1, 1], u[~en_a1, 2])
+        nombres = np.where(en_a1, A1.nombre, A2.nombre)
+
+    if "EV_INCIDENTE" in sumidero.activos:
+        for zona, x_coord, y_coord in zip(nombres, x, y):
+            sumidero.emitir("EV_INCIDENTE", str(zona), x_coord, y_coord)
+
+    return {"zona": nombres, "x": x, "y": y}
+
+
+def _generar_punto_en_triangulo(vertices, gen_reportes):
     """
     Genera un punto aleatorio uniformemente distribuido dentro de un triángulo.
     Usa coordenadas baricéntricas.
@@ -70,36 +126,55 @@ def _generar_punto_en_triangulo(vertices):
     return x, y
 
 
-def evento_llegada_vehiculo(vehiculo, incidente):
-    """Simula la llegada de un vehículo al punto del incidente."""
-    print(f"[EV_LLEGADA_VEHICULO] {vehiculo['nombre']} llegó al incidente en zona {incidente['zona']}.")
+def evento_llegada_vehiculo(vehiculo, incidente, gen_vehiculos, trasladar=True, sumidero=CONSOLA):
+    """
+    Simula la llegada de un vehículo al punto del incidente.
+    gen_vehiculos: generador de la simulación usado para el contacto con el usuario
+    trasladar: si es False, el traslado queda pendiente y el llamador debe completarlo
+               con evento_fin_traslado_ep (motor por eventos)
+    """
+    if "EV_LLEGADA_VEHICULO" in sumidero.activos:
+        sumidero.emitir("EV_LLEGADA_VEHICULO", vehiculo["nombre"], incidente["zona"])
 
     # Probabilidad 60% de contacto exitoso
     contacto_exitoso = gen_vehiculos.aleatorio() < 0.6
-    
+    if "EV_CONTACTO" in sumidero.activos:
+        sumidero.emitir("EV_CONTACTO", vehiculo["nombre"], contacto_exitoso)
+
     if contacto_exitoso:
-        print("Contacto exitoso. Iniciando traslado al punto de evacuación correspondiente.")
-        estacion = evento_fin_traslado_ep(vehiculo, incidente)
+        if trasladar:
+            estacion = evento_fin_traslado_ep(vehiculo, incidente, sumidero)
+        else:
+            vehiculo["estado"] = "TRASLADANDO"
+            estacion = estacion_destino(incidente)["nombre"]
         return {"vehiculo": vehiculo["nombre"], "resultado": "EXITO", "ep": estacion}
     else:
-        print("Contacto fallido. Usuario no encontrado. Retornando a ruta de patrulla.")
         vehiculo["estado"] = "PATRULLANDO"
         return {"vehiculo": vehiculo["nombre"], "resultado": "FALLO"}
 
 
-def evento_fin_traslado_ep(vehiculo, incidente):
-    """Evento que marca el fin del traslado hacia una estación EP."""
+def estacion_destino(incidente):
+    """Estación de apoyo a la que se traslada al usuario según la zona del incidente."""
+    # Los incidentes de un registro de zonas traen su estación de destino
+    if incidente.get("destino") is not None:
+        return incidente["destino"]
     # Si el incidente fue en A1 → llevar a EP2
     # Si el incidente fue en A2 → llevar a EP1
-    estacion_destino = EP2 if incidente["zona"] == "A1" else EP1
+    return EP2 if incidente["zona"] == "A1" else EP1
+
+
+def evento_fin_traslado_ep(vehiculo, incidente, sumidero=CONSOLA):
+    """Evento que marca el fin del traslado hacia una estación EP."""
+    estacion = estacion_destino(incidente)
 
-    print(f"[EV_FIN_TRASLADO_EP] {vehiculo['nombre']} completó traslado hacia {estacion_destino['nombre']}.")
+    if "EV_FIN_TRASLADO_EP" in sumidero.activos:
+        sumidero.emitir("EV_FIN_TRASLADO_EP", vehiculo["nombre"], estacion["nombre"])
     vehiculo["estado"] = "DISPONIBLE"
 
-    return estacion_destino["nombre"]
+    return estacion["nombre"]
 
 
-def evento_tick_patrulla(vehiculo):
+def evento_tick_patrulla(vehiculo, gen_vehiculos, sumidero=CONSOLA):
     """
     Actualiza la posición de un vehículo durante la patrulla.
     Usa límites correctos del mapa y movimiento más realista.
@@ -119,11 +194,8 @@ def evento_tick_patrulla(vehiculo):
     vehiculo["x"] = max(MAPA_LIMITES["x_min"], min(vehiculo["x"], MAPA_LIMITES["x_max"]))
     vehiculo["y"] = max(MAPA_LIMITES["y_min"], min(vehiculo["y"], MAPA_LIMITES["y_max"]))
 
-    print(
-        f"[EV_TICK_PATRULLA] {vehiculo['nombre']:<12} | "
-        f"Pos: ({vehiculo['x']:5.1f}, {vehiculo['y']:5.1f}) | "
-        f"Vel: {velocidad:.1f} km/tick"
-    )
+    if "EV_TICK_PATRULLA" in sumidero.activos:
+        sumidero.emitir("EV_TICK_PATRULLA", vehiculo["nombre"], vehiculo["x"], vehiculo["y"], velocidad)
 
     return {
         "vehiculo": vehiculo["nombre"], 
@@ -136,7 +208,7 @@ def evento_tick_patrulla(vehiculo):
 #Patrullaje en rutas específicas
 
 
-def evento_tick_patrulla_con_rutas(vehiculo, indice_vehiculo):
+def evento_tick_patrulla_con_rutas(vehiculo, indice_vehiculo, gen_vehiculos, sumidero=CONSOLA):
     """
     Los vehículos patrullan siguiendo rutas predefinidas.
     
@@ -148,7 +220,7 @@ def evento_tick_patrulla_con_rutas(vehiculo, indice_vehiculo):
     ruta_key = f"vehiculo_{indice_vehiculo + 1}"
     if ruta_key not in RUTAS:
         # Fallback al patrullaje aleatorio
-        return evento_tick_patrulla(vehiculo)
+        return evento_tick_patrulla(vehiculo, gen_vehiculos, sumidero)
     
     puntos_ruta = RUTAS[ruta_key]["puntos_clave"]
     
@@ -173,7 +245,8 @@ def evento_tick_patrulla_con_rutas(vehiculo, indice_vehiculo):
         vehiculo["x"] = destino_x
         vehiculo["y"] = destino_y
         vehiculo["waypoint_actual"] = (idx_waypoint + 1) % len(puntos_ruta)
-        print(f"[EV_TICK_PATRULLA] {vehiculo['nombre']} alcanzó waypoint {idx_waypoint + 1}")
+        if "EV_WAYPOINT" in sumidero.activos:
+            sumidero.emitir("EV_WAYPOINT", vehiculo["nombre"], idx_waypoint + 1)
     else:
         # Moverse hacia el waypoint
         vehiculo["x"] += (dx / distancia) * velocidad
@@ -187,16 +260,82 @@ def evento_tick_patrulla_con_rutas(vehiculo, indice_vehiculo):
     vehiculo["x"] = max(MAPA_LIMITES["x_min"], min(vehiculo["x"], MAPA_LIMITES["x_max"]))
     vehiculo["y"] = max(MAPA_LIMITES["y_min"], min(vehiculo["y"], MAPA_LIMITES["y_max"]))
     
-    print(
-        f"[EV_TICK_PATRULLA] {vehiculo['nombre']:<12} | "
-        f"Pos: ({vehiculo['x']:5.1f}, {vehiculo['y']:5.1f}) | "
-        f"→ Waypoint {idx_waypoint + 1}: ({destino_x}, {destino_y}) | "
-        f"Dist: {distancia:.1f} km"
-    )
+    if "EV_TICK_RUTA" in sumidero.activos:
+        sumidero.emitir(
+            "EV_TICK_RUTA", vehiculo["nombre"], vehiculo["x"], vehiculo["y"],
+            idx_waypoint + 1, destino_x, destino_y, distancia
+        )
     
     return {
         "vehiculo": vehiculo["nombre"],
         "x": vehiculo["x"],
         "y": vehiculo["y"],
         "velocidad": velocidad
-    }
\ No newline at end of file
+    }
+
+def evento_tick_patrulla_flota(flota, gen_vehiculos, sumidero=CONSOLA):
+    """
+    Avanza un tick de patrulla de todos los vehículos en estado PATRULLANDO en un
+    solo paso vectorizado sobre los arreglos de la flota.
+
+    Aplica las mismas reglas que evento_tick_patrulla_con_rutas (vehículos con ruta)
+    y evento_tick_patrulla (vehículos sin ruta), y consume del generador los mismos
+    valores en el mismo orden: tres por vehículo, en orden de la flota. El waypoint
+    de cada vehículo se conserva en la flota entre ticks.
+
+    Retorna: índices de los vehículos actualizados
+    """
+    indices = flota.en_patrulla()
+    k = len(indices)
+    if k == 0:
+        return indices
+
+    u = gen_vehiculos.aleatorio_lote(3 * k).reshape(k, 3)
+    x = flota.x[indices]
+    y = flota.y[indices]
+    rutas = flota.ruta[indices]
+    con_ruta = rutas >= 0
+
+    # Vehículos con ruta: avanzar hacia el waypoint actual a 3-5 km/tick
+    r = np.where(con_ruta, rutas, 0)
+    w = flota.waypoint[indices]
+    destino_x = WAYPOINTS_RUTAS[r, w, 0]
+    destino_y = WAYPOINTS_RUTAS[r, w, 1]
+    dx = destino_x - x
+    dy = destino_y - y
+    distancia = np.hypot(dx, dy)
+    velocidad = 3.0 + 2.0 * u[:, 0]
+
+    alcanza = distancia < velocidad
+    paso = np.divide(velocidad, distancia, out=np.zeros(k), where=~alcanza)
+    ruta_x = np.where(alcanza, destino_x, x + dx * paso) + (u[:, 1] - 0.5) * 0.5
+    ruta_y = np.where(alcanza, destino_y, y + dy * paso) + (u[:, 2] - 0.5) * 0.5
+
+    # Vehículos sin ruta: movimiento aleatorio a 2.5-7.5 km/tick
+    velocidad_libre = 5 * (0.5 + u[:, 2])
+    libre_x = x + (u[:, 0] - 0.5) * 2 * velocidad_libre
+    libre_y = y + (u[:, 1] - 0.5) * 2 * velocidad_libre
+
+    nuevo_x = np.clip(np.where(con_ruta, ruta_x, libre_x), MAPA_LIMITES["x_min"], MAPA_LIMITES["x_max"])
+    nuevo_y = np.clip(np.where(con_ruta, ruta_y, libre_y), MAPA_LIMITES["y_min"], MAPA_LIMITES["y_max"])
+    flota.x[indices] = nuevo_x
+    flota.y[indices] = nuevo_y
+    flota.waypoint[indices] = np.where(con_ruta & alcanza, (w + 1) % NUM_WAYPOINTS[r], w)
+    flota.sincronizar(indices)
+
+    if sumidero.activos & _EVENTOS_PATRULLA:
+        for j, i in enumerate(indices):
+            nombre = flota.nombres[i]
+            if not con_ruta[j]:
+                if "EV_TICK_PATRULLA" in sumidero.activos:
+                    sumidero.emitir("EV_TICK_PATRULLA", nombre, nuevo_x[j], nuevo_y[j], velocidad_libre[j])
+                continue
+            if alcanza[j] and "EV_WAYPOINT" in sumidero.activos:
+                sumidero.emitir("EV_WAYPOINT", nombre, int(w[j]) + 1)
+            if "EV_TICK_RUTA" in sumidero.activos:
+                sumidero.emitir(
+                    "EV_TICK_RUTA", nombre, nuevo_x[j], nuevo_y[j],
+                    int(w[j]) + 1, destino_x[j], destino_y[j], distancia[j]
+                )
+
+    return indices
@@ -0,0 +1,118 @@
+# ============================================================
+# flota.py
+# Estado de la flota en arreglos de NumPy (estructura de arreglos)
+# ============================================================
+
+import numpy as np
+
+from geometria import RUTAS
+
+# Estados posibles de un vehículo y su código numérico en la flota
+ESTADOS = ("PATRULLANDO", "DESPACHADO", "TRASLADANDO", "DISPONIBLE")
+CODIGO_ESTADO = {estado: codigo for codigo, estado in enumerate(ESTADOS)}
+PATRULLANDO = CODIGO_ESTADO["PATRULLANDO"]
+
+# Sin ruta asignada: el vehículo patrulla con movimiento aleatorio
+SIN_RUTA = -1
+
+
+def _tabla_rutas():
+    """
+    Convierte RUTAS en arreglos: waypoints (rutas × máx. waypoints × 2) rellenados
+    con el último punto, y cantidad de waypoints de cada ruta. La ruta r corresponde
+    a la clave f"vehiculo_{r + 1}".
+    """
+    puntos = [RUTAS[f"vehiculo_{r + 1}"]["puntos_clave"] for r in range(len(RUTAS))]
+    max_puntos = max(len(p) for p in puntos)
+    waypoints = np.empty((len(puntos), max_puntos, 2))
+    for r, p in enumerate(puntos):
+        waypoints[r, :len(p)] = p
+        waypoints[r, len(p):] = p[-1]
+    return waypoints, np.array([len(p) for p in puntos])
+
+
+WAYPOINTS_RUTAS, NUM_WAYPOINTS = _tabla_rutas()
+
+
+class Flota:
+    """
+    Estado de todos los vehículos en arreglos paralelos (uno por atributo), para
+    actualizar la patrulla de toda la flota en un solo paso vectorizado.
+
+    Si se indica un índice espacial, la flota lo mantiene sincronizado: contiene
+    exactamente los vehículos en patrulla, con su posición actual.
+
+    Atributos (arreglos de longitud n):
+        x, y (float): Posición.
+        velocidad (float): Velocidad de despacho (km/tick).
+        estado (int8): Código de estado (ver ESTADOS).
+        waypoint (int32): Índice del waypoint destino dentro de la ruta.
+        ruta (int32): Índice de la ruta de patrulla, o SIN_RUTA.
+    """
+
+    def __init__(self, capacidad=8, indice=None):
+        capacidad = max(1, capacidad)
+        self.indice = indice
+        self.n = 0
+        self.nombres = []
+        self.x = np.zeros(capacidad)
+        self.y = np.zeros(capacidad)
+        self.velocidad = np.zeros(capacidad)
+        self.estado = np.zeros(capacidad, dtype=np.int8)
+        self.waypoint = np.zeros(capacidad, dtype=np.int32)
+        self.ruta = np.full(capacidad, SIN_RUTA, dtype=np.int32)
+
+    def agregar(self, nombre, x, y, velocidad, ruta=SIN_RUTA):
+        """Agrega un vehículo en patrulla y retorna su índice en la flota."""
+        if self.n == len(self.x):
+            self._crecer(2 * self.n)
+
+        i = self.n
+        self.nombres.append(nombre)
+        self.x[i] = x
+        self.y[i] = y
+        self.velocidad[i] = velocidad
+        self.estado[i] = PATRULLANDO
+        self.waypoint[i] = 0
+        self.ruta[i] = ruta
+        self.n += 1
+        if self.indice is not None:
+            self.indice.insertar(i, x, y)
+        return i
+
+    def fijar_posicion(self, i, x, y):
+        """Cambia la posición del vehículo i y actualiza el índice espacial."""
+        self.x[i] = x
+        self.y[i] = y
+        if self.indice is not None:
+            self.indice.actualizar(i, self.x[i], self.y[i])
+
+    def fijar_estado(self, i, codigo):
+        """Cambia el estado del vehículo i; solo los vehículos en patrulla quedan indexados."""
+        self.estado[i] = codigo
+        if self.indice is not None:
+            if codigo == PATRULLANDO:
+                self.indice.insertar(i, self.x[i], self.y[i])
+            else:
+                self.indice.retirar(i)
+
+    def sincronizar(self, indices):
+        """Lleva al índice espacial las posiciones de los vehículos dados (tras un paso vectorizado)."""
+        if self.indice is not None:
+            self.indice.actualizar_lote(indices, self.x[indices], self.y[indices])
+
+    def velocidad_maxima(self):
+        """Mayor velocidad de despacho de la flota."""
+        return float(self.velocidad[:self.n].max()) if self.n else 0.0
+
+    def _crecer(self, capacidad):
+        """Amplía los arreglos conservando los vehículos existentes."""
+        for campo in ("x", "y", "velocidad", "estado", "waypoint", "ruta"):
+            actual = getattr(self, campo)
+            nuevo = np.full(capacidad, SIN_RUTA if campo == "ruta" else 0, dtype=actual.dtype)
+            nuevo[:self.n] = actual[:self.n]
+            setattr(self, campo, nuevo)
+
+    def en_patrulla(self):
+        """Índices de los vehículos en estado PATRULLANDO, en orden de la flota."""
+        return np.flatnonzero(self.estado[:self.n] == PATRULLANDO)
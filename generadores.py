@@ -1,6 +1,21 @@
 # Módulo de generadores mixtos para simulación de seguridad Uber
 
 import math
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+# Tamaño de bloque para la generación vectorizada
+TAM_BLOQUE = 4096
+
+# Valores por bloque de las pruebas en flujo: ~1.6 MB de memoria pico (flotantes,
+# enteros y temporales del bloque), independiente del total de valores probados
+TAM_BLOQUE_PRUEBAS = 1 << 16
+
+# Media a partir de la cual poisson() usa rechazo en lugar de la tabla acumulada
+UMBRAL_POISSON = 10.0
+
 
 class GeneradorMixto:
     """Implementa un generador congruencial lineal mixto (LCG mixto)."""
@@ -19,25 +34,254 @@ class GeneradorMixto:
     def aleatorio(self):
         """Retorna un número aleatorio U en [0,1)."""
         return self.siguiente() / self.m
-    
+
+    def copia(self):
+        """Retorna un generador independiente con los mismos parámetros y estado."""
+        return GeneradorMixto(self.a, self.c, self.m, self.x)
+
+    def subflujo(self, indice, longitud):
+        """
+        Retorna un generador independiente que comienza indice·longitud posiciones
+        adelante del estado actual. Los subflujos con el mismo 'longitud' no se solapan
+        mientras cada uno consuma a lo sumo 'longitud' valores.
+        """
+        if longitud <= 0:
+            raise ValueError("La longitud del subflujo debe ser positiva")
+        if (indice + 1) * longitud > self.m:
+            raise ValueError(
+                f"El subflujo {indice} de longitud {longitud} excede el periodo máximo del generador (m={self.m})"
+            )
+        generador = self.copia()
+        generador.saltar(indice * longitud)
+        return generador
+
+    def aleatorio_filas(self, n, tomar, descartar=0):
+        """
+        Genera n filas de 'tomar' números U en [0,1); antes de cada fila se descartan
+        'descartar' valores. Equivale bit a bit a repetir n veces saltar(descartar)
+        seguido de 'tomar' llamadas a aleatorio(), pero sin generar los descartados:
+        la primera columna es a su vez un LCG con la función afín de (descartar + tomar)
+        pasos, y las demás columnas se obtienen aplicando un paso a la anterior.
+
+        Retorna: arreglo de NumPy de forma (n, tomar)
+        """
+        if n <= 0:
+            return np.empty((0, tomar))
+
+        # Mismos tipos que siguiente_lote: int64 si m² < 2^63, uint64 si m es potencia de 2
+        if (self.m - 1) * self.m < 2**63:
+            tipo = np.int64
+        elif self.m & (self.m - 1) == 0 and self.m <= 2**64:
+            tipo = np.uint64
+        else:
+            filas = []
+            for _ in range(n):
+                self.saltar(descartar)
+                filas.append([self.aleatorio() for _ in range(tomar)])
+            return np.array(filas, dtype=np.float64)
+
+        A, C = self.coeficientes_salto(descartar + 1)
+        primero = (A * self.x + C) % self.m
+        paso = GeneradorMixto(*self.coeficientes_salto(descartar + tomar), self.m, primero)
+
+        enteros = np.empty((n, tomar), dtype=tipo)
+        enteros[0, 0] = primero
+        enteros[1:, 0] = paso.siguiente_lote(n - 1)
+        for j in range(1, tomar):
+            if tipo is np.uint64:
+                enteros[:, j] = (tipo(self.a % self.m) * enteros[:, j - 1] + tipo(self.c % self.m)) & tipo(self.m - 1)
+            else:
+                enteros[:, j] = (self.a % self.m * enteros[:, j - 1] + self.c % self.m) % self.m
+
+        self.x = int(enteros[-1, -1])
+        return enteros / self.m
+
+    def coeficientes_salto(self, k):
+        """
+        Calcula los coeficientes (A, C) de la función afín que avanza k pasos:
+        X(n+k) = (A * X(n) + C) mod m, con A = a^k y C = c·(a^k − 1)/(a − 1).
+        Usa exponenciación binaria de la composición de funciones afines, por lo que
+        cuesta O(log k) y no requiere que (a − 1) sea invertible módulo m.
+        """
+        if k < 0:
+            raise ValueError("El número de pasos debe ser no negativo")
+
+        A, C = 1, 0                       # Acumulado (identidad)
+        a_pot, c_pot = self.a % self.m, self.c % self.m   # Función de 2^i pasos
+        while k > 0:
+            if k & 1:
+                A, C = (a_pot * A) % self.m, (a_pot * C + c_pot) % self.m
+            c_pot = (a_pot * c_pot + c_pot) % self.m
+            a_pot = (a_pot * a_pot) % self.m
+            k >>= 1
+        return A, C
+
+    def saltar(self, k):
+        """Avanza el generador k posiciones en O(log k) sin generar los valores intermedios."""
+        A, C = self.coeficientes_salto(k)
+        self.x = (A * self.x + C) % self.m
+        return self.x
+
+    def distancia_desde(self, origen, limite=None):
+        """
+        Número de pasos k tales que avanzar k posiciones desde el estado 'origen'
+        lleva al estado actual. Si m es potencia de 2 y el generador tiene periodo
+        completo (a ≡ 1 mod 4, c impar) se obtiene bit a bit en O(log m): tras fijar
+        los i bits bajos del estado, el bit i solo cambia si se avanza 2^i pasos.
+        En otro caso se recorre la secuencia por bloques hasta 'limite' pasos (None = m).
+
+        Retorna: k, o None si el estado actual no se alcanza en 'limite' pasos
+        """
+        m = self.m
+        x = origen % m
+        if m & (m - 1) == 0 and self.a % 4 == 1 and self.c % 2 == 1:
+            a, c = self.a % m, self.c % m
+            bit, pasos = 1, 0
+            while x != self.x:
+                if (x ^ self.x) & bit:
+                    x = (a * x + c) % m
+                    pasos |= bit
+                c = (a + 1) * c % m
+                a = a * a % m
+                bit <<= 1
+            return pasos
+
+        if x == self.x:
+            return 0
+        limite = m if limite is None else min(limite, m)
+        recorrido = GeneradorMixto(self.a, self.c, m, x)
+        for inicio in range(0, limite, TAM_BLOQUE):
+            bloque = recorrido.siguiente_lote(min(TAM_BLOQUE, limite - inicio))
+            encontrados = np.flatnonzero(bloque == self.x)
+            if len(encontrados):
+                return inicio + int(encontrados[0]) + 1
+        return None
+
+    def siguiente_lote(self, n):
+        """
+        Genera los siguientes n enteros Xn en un arreglo de NumPy.
+        El resultado es idéntico bit a bit a llamar n veces a siguiente().
+        """
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Cada bloque se obtiene de un solo producto vectorizado: X(n+j) = A_j·X(n) + C_j.
+        # En int64 es seguro si A_j·X + C_j no desborda (m² < 2^63). Si m es potencia
+        # de 2 hasta 2^64, se usa aritmética uint64, cuyo desborde ya es el módulo 2^64.
+        if (self.m - 1) * self.m < 2**63:
+            tipo = np.int64
+        elif self.m & (self.m - 1) == 0 and self.m <= 2**64:
+            tipo = np.uint64
+        else:
+            return np.array([self.siguiente() for _ in range(n)], dtype=object)
+
+        A, C = _coeficientes_bloque(self.a, self.c, self.m)
+        valores = np.empty(n, dtype=tipo)
+        for inicio in range(0, n, TAM_BLOQUE):
+            tam = min(TAM_BLOQUE, n - inicio)
+            bloque = valores[inicio:inicio + tam]
+            np.multiply(A[:tam], tipo(self.x), out=bloque)
+            bloque += C[:tam]
+            if tipo is np.uint64:
+                bloque &= np.uint64(self.m - 1)
+            else:
+                bloque %= self.m
+            self.x = int(bloque[-1])
+        return valores
+
+    def aleatorio_lote(self, n):
+        """
+        Genera los siguientes n números U en [0,1) en un arreglo de NumPy.
+        El resultado es idéntico bit a bit a llamar n veces a aleatorio().
+        """
+        enteros = self.siguiente_lote(n)
+        if enteros.dtype == object:
+            return np.array([x / self.m for x in enteros], dtype=np.float64)
+        return enteros / self.m
+
     def poisson(self, lmbda):
         """
         Genera una variable aleatoria con distribución de Poisson.
         lmbda: tasa promedio de eventos (lambda)
         Retorna: número de eventos que ocurren
+
+        Para lmbda < UMBRAL_POISSON invierte la distribución acumulada (tabla en caché
+        por valor de lmbda, un solo número aleatorio por llamada). Para lmbda mayores
+        usa rechazo transformado (PTRS de Hörmann), con costo esperado O(1) y sin
+        calcular exp(-lmbda), que se anula por desbordamiento inferior para lmbda grandes.
         """
         if lmbda <= 0:
             return 0
-        
-        L = math.exp(-lmbda)
-        k = 0
-        p = 1.0
-        
-        while p > L:
-            k += 1
-            p *= self.aleatorio()
-        
-        return k - 1
+        if lmbda < UMBRAL_POISSON:
+            return bisect_right(_tabla_poisson(lmbda)[0], self.aleatorio())
+        return self._poisson_rechazo(lmbda)
+
+    def poisson_lote(self, lmbda, n):
+        """
+        Genera n variables de Poisson de media lmbda en un arreglo de NumPy
+        (por ejemplo, el número de incidentes de cada tick de una simulación).
+        El resultado es idéntico a llamar n veces a poisson().
+        """
+        if lmbda <= 0 or n <= 0:
+            return np.zeros(max(n, 0), dtype=np.int64)
+        if lmbda < UMBRAL_POISSON:
+            return np.searchsorted(_tabla_poisson(lmbda)[1], self.aleatorio_lote(n), side="right")
+        return np.array([self._poisson_rechazo(lmbda) for _ in range(n)], dtype=np.int64)
+
+    def _poisson_rechazo(self, lmbda):
+        """Método PTRS (transformed rejection with squeeze) de Hörmann (1993) para lmbda >= 10."""
+        raiz = math.sqrt(lmbda)
+        log_lmbda = math.log(lmbda)
+        b = 0.931 + 2.53 * raiz
+        a = -0.059 + 0.02483 * b
+        log_inv_alfa = math.log(1.1239 + 1.1328 / (b - 3.4))
+        v_r = 0.9277 - 3.6224 / (b - 2)
+
+        while True:
+            u = self.aleatorio() - 0.5
+            v = self.aleatorio()
+            us = 0.5 - abs(u)
+            if us <= 0:
+                continue  # aleatorio() devolvió 0 (u = -0.5): se rechaza antes de dividir por us
+            k = math.floor((2 * a / us + b) * u + lmbda + 0.43)
+            if us >= 0.07 and v <= v_r:
+                return k
+            if k < 0 or (us < 0.013 and v > us):
+                continue
+            if v > 0 and (math.log(v) + log_inv_alfa - math.log(a / (us * us) + b)
+                          <= -lmbda + k * log_lmbda - math.lgamma(k + 1)):
+                return k
+
+
+@lru_cache(maxsize=128)
+def _tabla_poisson(lmbda):
+    """
+    Distribución acumulada de Poisson(lmbda) hasta que la cola es despreciable.
+    Retorna: (lista para bisect, arreglo de NumPy para searchsorted)
+    """
+    probabilidad = math.exp(-lmbda)
+    acumulada = [probabilidad]
+    k = 0
+    while acumulada[-1] < 1.0 - 1e-15 and k < lmbda + 40 * math.sqrt(lmbda) + 40:
+        k += 1
+        probabilidad *= lmbda / k
+        acumulada.append(acumulada[-1] + probabilidad)
+    return acumulada, np.array(acumulada)
+
+
+@lru_cache(maxsize=32)
+def _coeficientes_bloque(a, c, m):
+    """Coeficientes A_j, C_j (j = 1..TAM_BLOQUE) de la generación por bloques, en caché por (a, c, m)."""
+    tipo = np.int64 if (m - 1) * m < 2**63 else np.uint64
+    A = np.empty(TAM_BLOQUE, dtype=tipo)
+    C = np.empty(TAM_BLOQUE, dtype=tipo)
+    a_j, c_j = 1, 0
+    for j in range(TAM_BLOQUE):
+        a_j = (a * a_j) % m
+        c_j = (a * c_j + c) % m
+        A[j] = a_j
+        C[j] = c_j
+    return A, C
 
 
 # Pruebas de bondad de ajuste
@@ -71,9 +315,228 @@ def prueba_distancia(valores):
     
     return promedio, esperado, diferencia
 
-# Configuración de generadores (cumplen periodo completo)
-gen_vehiculos = GeneradorMixto(a=501, c=547, m=1000, x0=827)
-gen_reportes = GeneradorMixto(a=5001, c=4607, m=10000, x0=4049)
+class AcumuladorFrecuencia:
+    """
+    Versión en flujo de prueba_frecuencia: acumula las frecuencias por intervalo
+    bloque a bloque con memoria constante. Dos acumuladores se combinan sumando
+    sus frecuencias (bloques de distintos procesos, en cualquier orden).
+    """
+
+    def __init__(self, num_intervalos=10):
+        self.num_intervalos = num_intervalos
+        self.frecuencias = np.zeros(num_intervalos, dtype=np.int64)
+
+    def agregar(self, valores):
+        """Acumula un bloque de valores en [0,1)."""
+        indices = np.minimum((np.asarray(valores) * self.num_intervalos).astype(np.int64), self.num_intervalos - 1)
+        self.frecuencias += np.bincount(indices, minlength=self.num_intervalos)
+
+    def combinar(self, otro):
+        """Incorpora las frecuencias de otro acumulador."""
+        self.frecuencias += otro.frecuencias
+        return self
+
+    def resultado(self):
+        """Retorna: (chi_cuadrado, frecuencias_observadas) como prueba_frecuencia."""
+        total_valores = int(self.frecuencias.sum())
+        frecuencia_esperada = total_valores / self.num_intervalos
+        chi_cuadrado = float(((self.frecuencias - frecuencia_esperada) ** 2 / frecuencia_esperada).sum())
+        return chi_cuadrado, self.frecuencias.tolist()
+
+
+class AcumuladorDistancia:
+    """
+    Versión en flujo de prueba_distancia: acumula la suma de |U(i+1) − U(i)| bloque
+    a bloque, incluida la distancia entre el último valor de un bloque y el primero
+    del siguiente. Para combinar acumuladores de tramos consecutivos de la secuencia
+    (por ejemplo, de distintos procesos) se conservan el primer y el último valor.
+    """
+
+    def __init__(self):
+        self.suma = 0.0
+        self.conteo = 0
+        self.primero = None
+        self.ultimo = None
+
+    def agregar(self, valores):
+        """Acumula un bloque de valores que sigue inmediatamente al anterior."""
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return
+        if self.ultimo is None:
+            self.primero = float(valores[0])
+        else:
+            self.suma += abs(float(valores[0]) - self.ultimo)
+            self.conteo += 1
+        self.suma += float(np.abs(np.diff(valores)).sum())
+        self.conteo += len(valores) - 1
+        self.ultimo = float(valores[-1])
+
+    def combinar(self, siguiente):
+        """Incorpora el acumulador del tramo que sigue inmediatamente a este."""
+        if siguiente.primero is None:
+            return self
+        if self.ultimo is None:
+            self.primero = siguiente.primero
+        else:
+            self.suma += abs(siguiente.primero - self.ultimo)
+            self.conteo += 1
+        self.suma += siguiente.suma
+        self.conteo += siguiente.conteo
+        self.ultimo = siguiente.ultimo
+        return self
+
+    def resultado(self):
+        """Retorna: (promedio, esperado, diferencia) como prueba_distancia."""
+        promedio = self.suma / self.conteo
+        esperado = 1 / math.sqrt(12)
+        return promedio, esperado, abs(promedio - esperado)
+
+
+def _pruebas_tramo(tarea):
+    """Aplica las pruebas en flujo a un tramo [inicio, inicio + total) de la secuencia."""
+    a, c, m, x0, inicio, total, tam_bloque, num_intervalos = tarea
+    generador = GeneradorMixto(a, c, m, x0)
+    generador.saltar(inicio)
+    frecuencia = AcumuladorFrecuencia(num_intervalos)
+    distancia = AcumuladorDistancia()
+    for desplazamiento in range(0, total, tam_bloque):
+        bloque = generador.aleatorio_lote(min(tam_bloque, total - desplazamiento))
+        frecuencia.agregar(bloque)
+        distancia.agregar(bloque)
+    return frecuencia, distancia
+
+
+def pruebas_en_flujo(generador, total, tam_bloque=TAM_BLOQUE_PRUEBAS, num_intervalos=10, num_procesos=1):
+    """
+    Ejecuta las pruebas de frecuencia y distancia sobre los siguientes 'total'
+    valores del generador, consumidos en bloques de tam_bloque con memoria constante.
+
+    Con num_procesos > 1 la secuencia se divide en tramos consecutivos (cada proceso
+    salta a su tramo en O(log k)) y los acumuladores se combinan en orden, con el
+    mismo resultado que una ejecución en serie.
+
+    Retorna: (AcumuladorFrecuencia, AcumuladorDistancia)
+    """
+    num_tramos = max(1, min(num_procesos, total // tam_bloque or 1))
+    tareas = []
+    inicio = 0
+    for i in range(num_tramos):
+        longitud = total // num_tramos + (1 if i < total % num_tramos else 0)
+        tareas.append((generador.a, generador.c, generador.m, generador.x, inicio, longitud,
+                       tam_bloque, num_intervalos))
+        inicio += longitud
+
+    if num_tramos == 1:
+        resultados = [_pruebas_tramo(tareas[0])]
+    else:
+        # Importación diferida: el pool de procesos solo se carga si se usa
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=num_tramos) as ejecutor:
+            resultados = list(ejecutor.map(_pruebas_tramo, tareas))
+
+    frecuencia, distancia = resultados[0]
+    for otra_frecuencia, otra_distancia in resultados[1:]:
+        frecuencia.combinar(otra_frecuencia)
+        distancia.combinar(otra_distancia)
+    generador.saltar(total)
+    return frecuencia, distancia
+
+
+# Configuración de generadores (cumplen periodo completo; ver periodo.py)
+PARAMETROS_VEHICULOS = {"a": 501, "c": 547, "m": 1000, "x0": 827}
+PARAMETROS_REPORTES = {"a": 5001, "c": 4607, "m": 10000, "x0": 4049}
+
+# Generador raíz de las réplicas: LCG con módulo 2^k (a ≡ 1 mod 4 y c impar, periodo
+# completo para todo k), que se reduce módulo 2^k según el número de réplicas
+MULTIPLICADOR_REPLICAS = 6364136223846793005
+INCREMENTO_REPLICAS = 1442695040888963407
+SEMILLA_REPLICAS = 827
+
+# Valores que puede consumir cada generador en una réplica sin invadir la siguiente
+VALORES_POR_REPLICA = 1 << 32
+
+
+def parametros_subflujos(num_replicas, parametros_vehiculos=None, parametros_reportes=None,
+                         valores_por_replica=None):
+    """
+    Calcula el generador raíz y la longitud del subflujo de cada generador cuando el
+    periodo se reparte entre num_replicas réplicas.
+
+    Con una sola réplica se usan los generadores originales (o los indicados). Con
+    varias, los generadores sin parámetros explícitos comparten un LCG de módulo 2^k
+    dimensionado con periodo.modulo_para_valores para 2 × num_replicas × valores_por_replica
+    valores: los subflujos de vehículos ocupan la primera mitad del periodo y los de
+    reportes la segunda, de modo que ninguna réplica comparte valores con otra.
+
+    Parámetros:
+        num_replicas (int): Total de réplicas.
+        parametros_vehiculos (dict): Parámetros {a, c, m, x0} explícitos o None.
+        parametros_reportes (dict): Parámetros {a, c, m, x0} explícitos o None.
+        valores_por_replica (int): Longitud de cada subflujo (None = VALORES_POR_REPLICA
+            para el generador de réplicas, m // num_replicas para parámetros explícitos).
+
+    Retorna: diccionario {nombre: (parámetros del generador raíz, longitud del subflujo)}
+    """
+    if num_replicas <= 0:
+        raise ValueError("El número de réplicas debe ser positivo")
+    if valores_por_replica is not None and valores_por_replica <= 0:
+        raise ValueError("Los valores por réplica deben ser positivos")
+
+    subflujos = {}
+    explicitos = {"vehiculos": parametros_vehiculos, "reportes": parametros_reportes}
+    if num_replicas > 1 and None in explicitos.values():
+        # Importación diferida: periodo importa este módulo
+        from periodo import modulo_para_valores
+
+        longitud = valores_por_replica or VALORES_POR_REPLICA
+        m = modulo_para_valores(2 * num_replicas * longitud)
+        if m > 2**64:
+            raise ValueError(
+                f"{num_replicas} réplicas de {longitud} valores exceden el periodo máximo (2^64) "
+                "del generador de réplicas"
+            )
+        a, c = MULTIPLICADOR_REPLICAS % m, INCREMENTO_REPLICAS % m
+        inicio = SEMILLA_REPLICAS % m
+        mitad = GeneradorMixto(a, c, m, inicio).saltar(num_replicas * longitud)
+        for nombre, x0 in (("vehiculos", inicio), ("reportes", mitad)):
+            if explicitos[nombre] is None:
+                subflujos[nombre] = ({"a": a, "c": c, "m": m, "x0": x0}, longitud)
+
+    originales = {"vehiculos": PARAMETROS_VEHICULOS, "reportes": PARAMETROS_REPORTES}
+    for nombre in ("vehiculos", "reportes"):
+        if nombre in subflujos:
+            continue
+        parametros = explicitos[nombre] or originales[nombre]
+        longitud = valores_por_replica or parametros["m"] // num_replicas
+        if longitud == 0 or num_replicas * longitud > parametros["m"]:
+            raise ValueError(
+                f"El generador de {nombre} (m={parametros['m']}) no admite {num_replicas} subflujos "
+                f"disjuntos de {max(longitud, 1)} o más valores"
+            )
+        subflujos[nombre] = (parametros, longitud)
+    return subflujos
+
+
+def crear_generadores(replica=0, num_replicas=1, parametros_vehiculos=None, parametros_reportes=None,
+                      valores_por_replica=None):
+    """
+    Crea los generadores propios de una simulación.
+
+    Cada réplica recibe un subflujo disjunto de la secuencia de un generador raíz
+    (ver parametros_subflujos): la réplica i comienza al inicio del tramo i. La
+    réplica 0 de una sola réplica reproduce exactamente los generadores originales.
+
+    Retorna: diccionario {"vehiculos": GeneradorMixto, "reportes": GeneradorMixto}
+    """
+    subflujos = parametros_subflujos(num_replicas, parametros_vehiculos, parametros_reportes, valores_por_replica)
+    return {
+        nombre: GeneradorMixto(**parametros).subflujo(replica, longitud)
+        for nombre, (parametros, longitud) in subflujos.items()
+    }
+
 
-for _ in range(100):
-    print(gen_reportes.aleatorio())
\ No newline at end of file
+if __name__ == "__main__":
+    gen_reportes = crear_generadores()["reportes"]
+    for _ in range(100):
+        print(gen_reportes.aleatorio())
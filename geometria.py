@@ -1,55 +1,140 @@
 import math
 
+import numpy as np
+
+
 class Area:
+    # Tolerancia (km) para considerar dentro los puntos sobre el borde
+    TOLERANCIA = 1e-9
+
     def __init__(self, nombre, tipo, parametros):
         self.nombre = str(nombre)
         self.tipo = tipo
         self.parametros = parametros
+        self._precalcular()
+
+    def _precalcular(self):
+        """
+        Calcula una sola vez los coeficientes de la forma: caja envolvente y, según
+        el tipo, las ecuaciones de los semiplanos de los lados (triángulo) o el
+        centro y el radio al cuadrado (semicírculo).
+        """
+        self.semiplanos = None
+        self.caja = None
 
-    def contiene(self, x, y):
-        """Verifica si un punto (x,y) está dentro del área."""
-        #A1: Triángulo
         if self.tipo == "triangulo":
             vertices = self.parametros.get("vertices")
-            if vertices and len(vertices) == 3:
-                return self._punto_en_triangulo(x, y, vertices)
-            return False
+            if not vertices or len(vertices) != 3:
+                return
+            (x1, y1), (x2, y2), (x3, y3) = vertices
+            # Orientación antihoraria para que el interior quede a la izquierda de cada lado
+            orientacion = 1.0 if (x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1) >= 0 else -1.0
+            semiplanos = []
+            for (ax, ay), (bx, by) in (((x1, y1), (x2, y2)), ((x2, y2), (x3, y3)), ((x3, y3), (x1, y1))):
+                # a·x + b·y + c >= 0 dentro, con (a, b) normal unitaria hacia el interior
+                longitud = math.hypot(bx - ax, by - ay)
+                a = -(by - ay) * orientacion / longitud
+                b = (bx - ax) * orientacion / longitud
+                semiplanos.append((a, b, -(a * ax + b * ay)))
+            self.semiplanos = np.array(semiplanos)
+            self.caja = (min(x1, x2, x3), max(x1, x2, x3), min(y1, y2, y3), max(y1, y2, y3))
 
-        #A2: Semicírculo
         elif self.tipo == "semicirculo":
-            cx, cy = self.parametros.get("centro")
+            self.centro = self.parametros.get("centro")
+            self.radio2 = self.parametros.get("radio") ** 2
+            cx, cy = self.centro
             r = self.parametros.get("radio")
-            distancia = math.sqrt((x - cx)**2 + (y - cy)**2)
-            # Semicírculo con apertura hacia abajo: y <= cy
-            return distancia <= r and y <= cy
-        #A3: Rectángulo (CAI)
+            self.caja = (cx - r, cx + r, cy - r, cy)
+
         elif self.tipo == "rectangulo":
-            x_min = self.parametros.get("x_min")
-            x_max = self.parametros.get("x_max")
-            y_min = self.parametros.get("y_min")
-            y_max = self.parametros.get("y_max")
-            return x_min <= x <= x_max and y_min <= y <= y_max
+            p = self.parametros
+            self.caja = (p.get("x_min"), p.get("x_max"), p.get("y_min"), p.get("y_max"))
 
-        return False
+    def contiene(self, x, y):
+        """Verifica si un punto (x,y) está dentro del área."""
+        if self.caja is None:
+            return False
+        x_min, x_max, y_min, y_max = self.caja
+        tol = self.TOLERANCIA
+        if not (x_min - tol <= x <= x_max + tol and y_min - tol <= y <= y_max + tol):
+            return False
+
+        #A1: Triángulo (dentro de los tres semiplanos)
+        if self.tipo == "triangulo":
+            return all(a * x + b * y + c >= -tol for a, b, c in self.semiplanos)
+
+        #A2: Semicírculo con apertura hacia abajo: y <= cy (cubierto por la caja)
+        elif self.tipo == "semicirculo":
+            cx, cy = self.centro
+            return (x - cx) ** 2 + (y - cy) ** 2 <= self.radio2
 
-    def _punto_en_triangulo(self, px, py, vertices):
+        #A3: Rectángulo (CAI): la caja es el área
+        return True
+
+    def contiene_lote(self, xs, ys):
         """
-        Verifica si un punto (px, py) está dentro de un triángulo.
-        Usa el método de áreas (coordenadas baricéntricas).
+        Versión vectorizada de contiene para arreglos de coordenadas.
+        Primero descarta los puntos fuera de la caja envolvente y aplica la prueba
+        exacta solo a los restantes.
+        Retorna: arreglo booleano de NumPy
         """
-        x1, y1 = vertices[0]
-        x2, y2 = vertices[1]
-        x3, y3 = vertices[2]
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if self.caja is None:
+            return np.zeros(xs.shape, dtype=bool)
+
+        x_min, x_max, y_min, y_max = self.caja
+        tol = self.TOLERANCIA
+        dentro = (xs >= x_min - tol) & (xs <= x_max + tol) & (ys >= y_min - tol) & (ys <= y_max + tol)
+        if self.tipo == "rectangulo":
+            return dentro
+
+        candidatos = np.flatnonzero(dentro)
+        px, py = xs[candidatos], ys[candidatos]
+        if self.tipo == "triangulo":
+            exacto = np.ones(len(candidatos), dtype=bool)
+            for a, b, c in self.semiplanos:
+                exacto &= a * px + b * py + c >= -tol
+        else:
+            cx, cy = self.centro
+            exacto = (px - cx) ** 2 + (py - cy) ** 2 <= self.radio2
 
-        def area_triangulo(ax, ay, bx, by, cx, cy):
-            return abs((ax*(by-cy) + bx*(cy-ay) + cx*(ay-by)) / 2.0)
+        dentro[candidatos] = exacto
+        return dentro
 
-        area_total = area_triangulo(x1, y1, x2, y2, x3, y3)
-        area1 = area_triangulo(px, py, x2, y2, x3, y3)
-        area2 = area_triangulo(x1, y1, px, py, x3, y3)
-        area3 = area_triangulo(x1, y1, x2, y2, px, py)
+    def muestrear(self, n, generador):
+        """
+        Genera n puntos uniformemente distribuidos dentro del área.
+        Usa dos números del generador por punto, en el mismo orden que el muestreo
+        escalar de eventos.py (coordenadas baricéntricas / polares).
+        Retorna: (xs, ys) como arreglos de NumPy
+        """
+        u = generador.aleatorio_lote(2 * n).reshape(n, 2)
+        return self.transformar_uniformes(u[:, 0], u[:, 1])
 
-        return abs(area_total - (area1 + area2 + area3)) < 0.01
+    def transformar_uniformes(self, u1, u2):
+        """Transforma pares de uniformes en [0,1) en puntos uniformes dentro del área."""
+        if self.tipo == "triangulo":
+            (x1, y1), (x2, y2), (x3, y3) = self.parametros["vertices"]
+            raiz_u1 = np.sqrt(u1)
+            a = 1 - raiz_u1
+            b = raiz_u1 * (1 - u2)
+            c = raiz_u1 * u2
+            return a * x1 + b * x2 + c * x3, a * y1 + b * y2 + c * y3
+
+        if self.tipo == "semicirculo":
+            # Apertura hacia abajo: ángulo entre π y 2π
+            cx, cy = self.parametros["centro"]
+            r = self.parametros["radio"] * np.sqrt(u1)
+            angulo = math.pi * (1 + u2)
+            return cx + r * np.cos(angulo), cy + r * np.sin(angulo)
+
+        if self.tipo == "rectangulo":
+            p = self.parametros
+            return (p["x_min"] + (p["x_max"] - p["x_min"]) * u1,
+                    p["y_min"] + (p["y_max"] - p["y_min"]) * u2)
+
+        raise ValueError(f"Tipo de área desconocido: {self.tipo}")
 
 
 # SISTEMA DE COORDENADAS
@@ -0,0 +1,183 @@
+# ============================================================
+# indice_espacial.py
+# Índice espacial de rejilla uniforme para el despacho al vehículo más cercano
+# ============================================================
+
+import heapq
+import math
+
+import numpy as np
+
+from geometria import MAPA_LIMITES
+
+SIN_CELDA = -1
+
+
+def tam_celda_sugerido(num_elementos, limites=MAPA_LIMITES):
+    """Tamaño de celda para que haya del orden de 4 elementos por celda (mínimo 1 km)."""
+    area = (limites["x_max"] - limites["x_min"]) * (limites["y_max"] - limites["y_min"])
+    return max(1.0, math.sqrt(4.0 * area / max(1, num_elementos)))
+
+
+class IndiceEspacial:
+    """
+    Rejilla uniforme sobre el mapa que agrupa los elementos indexados por celda.
+
+    Solo contiene los elementos que se insertan explícitamente (por ejemplo, los
+    vehículos en patrulla), de modo que las consultas ya filtran por estado. Las
+    posiciones se actualizan de forma incremental: un elemento solo cambia de celda
+    cuando su nueva posición cae fuera de la celda anterior.
+
+    Parámetros:
+        tam_celda (float): Lado de cada celda en km.
+        limites (dict): Límites del mapa (x_min, x_max, y_min, y_max).
+    """
+
+    def __init__(self, tam_celda=5.0, limites=MAPA_LIMITES):
+        self.tam_celda = float(tam_celda)
+        self.x_min = limites["x_min"]
+        self.y_min = limites["y_min"]
+        self.columnas = max(1, math.ceil((limites["x_max"] - limites["x_min"]) / self.tam_celda))
+        self.filas = max(1, math.ceil((limites["y_max"] - limites["y_min"]) / self.tam_celda))
+
+        self.celdas = [set() for _ in range(self.columnas * self.filas)]
+        self.x = np.zeros(8)
+        self.y = np.zeros(8)
+        self.celda = np.full(8, SIN_CELDA, dtype=np.int64)
+        self.total = 0
+
+    def _celda(self, x, y):
+        """Celda (índice lineal) que contiene el punto; los puntos fuera del mapa van al borde."""
+        columna = min(max(int((x - self.x_min) // self.tam_celda), 0), self.columnas - 1)
+        fila = min(max(int((y - self.y_min) // self.tam_celda), 0), self.filas - 1)
+        return fila * self.columnas + columna
+
+    def _asegurar_capacidad(self, indice):
+        if indice < len(self.x):
+            return
+        capacidad = max(2 * len(self.x), indice + 1)
+        for campo, relleno in (("x", 0.0), ("y", 0.0), ("celda", SIN_CELDA)):
+            actual = getattr(self, campo)
+            nuevo = np.full(capacidad, relleno, dtype=actual.dtype)
+            nuevo[:len(actual)] = actual
+            setattr(self, campo, nuevo)
+
+    def __contains__(self, indice):
+        return indice < len(self.celda) and self.celda[indice] != SIN_CELDA
+
+    def __len__(self):
+        return self.total
+
+    def insertar(self, indice, x, y):
+        """Agrega el elemento 'indice' en (x, y), o lo mueve si ya estaba."""
+        self._asegurar_capacidad(indice)
+        self.x[indice] = x
+        self.y[indice] = y
+        nueva = self._celda(x, y)
+        anterior = self.celda[indice]
+        if anterior == nueva:
+            return
+        if anterior == SIN_CELDA:
+            self.total += 1
+        else:
+            self.celdas[anterior].discard(indice)
+        self.celdas[nueva].add(indice)
+        self.celda[indice] = nueva
+
+    def retirar(self, indice):
+        """Quita el elemento del índice (no hace nada si no estaba)."""
+        if indice in self:
+            self.celdas[self.celda[indice]].discard(indice)
+            self.celda[indice] = SIN_CELDA
+            self.total -= 1
+
+    def actualizar(self, indice, x, y):
+        """Actualiza la posición de un elemento indexado (ignora los que no lo están)."""
+        if indice in self:
+            self.insertar(indice, x, y)
+
+    def actualizar_lote(self, indices, xs, ys):
+        """
+        Actualiza las posiciones de varios elementos indexados a la vez. Las celdas se
+        calculan de forma vectorizada y solo se tocan los conjuntos de los elementos
+        que cambiaron de celda.
+        """
+        indices = np.asarray(indices)
+        if len(indices) == 0:
+            return
+        self._asegurar_capacidad(int(indices.max()))
+        actuales = self.celda[indices]
+        indexados = actuales != SIN_CELDA
+        indices, actuales = indices[indexados], actuales[indexados]
+        xs, ys = np.asarray(xs)[indexados], np.asarray(ys)[indexados]
+
+        self.x[indices] = xs
+        self.y[indices] = ys
+        columnas = np.clip(((xs - self.x_min) // self.tam_celda).astype(np.int64), 0, self.columnas - 1)
+        filas = np.clip(((ys - self.y_min) // self.tam_celda).astype(np.int64), 0, self.filas - 1)
+        nuevas = filas * self.columnas + columnas
+
+        for j in np.flatnonzero(nuevas != actuales):
+            indice = int(indices[j])
+            self.celdas[actuales[j]].discard(indice)
+            self.celdas[nuevas[j]].add(indice)
+            self.celda[indice] = nuevas[j]
+
+    def _anillo(self, columna, fila, radio):
+        """Celdas (índices lineales) a distancia de Chebyshev exactamente 'radio'."""
+        if radio == 0:
+            yield fila * self.columnas + columna
+            return
+        for c in range(columna - radio, columna + radio + 1):
+            if 0 <= c < self.columnas:
+                for f in (fila - radio, fila + radio):
+                    if 0 <= f < self.filas:
+                        yield f * self.columnas + c
+        for f in range(fila - radio + 1, fila + radio):
+            if 0 <= f < self.filas:
+                for c in (columna - radio, columna + radio):
+                    if 0 <= c < self.columnas:
+                        yield f * self.columnas + c
+
+    def k_cercanos(self, x, y, k=1, clave=None, escala=1.0):
+        """
+        Retorna los k elementos indexados con menor clave, ordenados por clave.
+
+        Recorre anillos de celdas alrededor del punto y se detiene cuando ningún
+        elemento de los anillos restantes puede mejorar al k-ésimo encontrado. Para
+        ello, el primer componente de clave(indice, distancia) debe ser al menos
+        distancia × escala (por ejemplo, un ETA con escala = 1 / velocidad máxima).
+
+        Parámetros:
+            x, y (float): Punto de consulta.
+            k (int): Número de elementos a retornar.
+            clave (callable): clave(indice, distancia) → tupla comparable.
+                              Por defecto (distancia, indice).
+            escala (float): Cota inferior del primer componente de la clave por km.
+
+        Retorna: lista de (clave, indice)
+        """
+        if self.total == 0 or k <= 0:
+            return []
+        if clave is None:
+            clave = lambda indice, distancia: (distancia, indice)
+
+        celda = self._celda(x, y)
+        columna, fila = celda % self.columnas, celda // self.columnas
+        radio_maximo = max(columna, self.columnas - 1 - columna, fila, self.filas - 1 - fila)
+
+        candidatos = []
+        for radio in range(radio_maximo + 1):
+            for c in self._anillo(columna, fila, radio):
+                for indice in self.celdas[c]:
+                    distancia = math.hypot(self.x[indice] - x, self.y[indice] - y)
+                    candidatos.append((clave(indice, distancia), indice))
+
+            # Todo elemento fuera de los anillos recorridos está al menos a radio × tam_celda
+            if len(candidatos) >= k:
+                cota = radio * self.tam_celda * escala
+                mejores = heapq.nsmallest(k, candidatos)
+                if mejores[-1][0][0] < cota:
+                    return mejores
+
+        return heapq.nsmallest(k, candidatos)
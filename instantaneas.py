@@ -0,0 +1,113 @@
+# ============================================================
+# instantaneas.py
+# Guardado, carga y bifurcación de instantáneas de una Simulacion
+# ============================================================
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from registro_eventos import SumideroNulo
+from simulacion import CAMPOS_FLOTA, CONTADORES_VEHICULO, Simulacion
+
+
+def guardar_instantanea(instantanea, archivo):
+    """
+    Guarda una instantánea de Simulacion.capturar() en un archivo .npz comprimido:
+    los arreglos de la flota se guardan tal cual y el resto como un texto JSON.
+    """
+    resto = {clave: valor for clave, valor in instantanea.items() if clave != "flota"}
+    resto["nombres"] = instantanea["flota"]["nombres"]
+    arreglos = {f"flota_{campo}": instantanea["flota"][campo] for campo in CAMPOS_FLOTA}
+    with open(archivo, "wb") as f:
+        np.savez_compressed(f, estado=np.array(json.dumps(resto)), **arreglos)
+
+
+def cargar_instantanea(archivo):
+    """Carga una instantánea guardada con guardar_instantanea."""
+    with np.load(archivo) as datos:
+        instantanea = json.loads(str(datos["estado"]))
+        instantanea["flota"] = {
+            "nombres": instantanea.pop("nombres"),
+            **{campo: datos[f"flota_{campo}"] for campo in CAMPOS_FLOTA}
+        }
+    return instantanea
+
+
+def calentar(duracion_calentamiento, modo="ticks", **parametros):
+    """
+    Ejecuta una simulación sin salida hasta duracion_calentamiento y retorna su instantánea.
+    Los parámetros son los del constructor de Simulacion.
+    """
+    parametros.setdefault("sumidero", SumideroNulo())
+    simulacion = Simulacion(**parametros)
+    simulacion.ejecutar(mostrar=False, modo=modo, hasta=duracion_calentamiento)
+    return simulacion.capturar()
+
+
+def continuar(instantanea, cambios=None, modo="ticks"):
+    """
+    Restaura una instantánea, aplica los cambios y la ejecuta hasta el final sin salida.
+
+    Retorna: diccionario con los cambios, las métricas globales, las métricas en flujo
+             exportadas, los contadores por vehículo y, si la instantánea los lleva,
+             los mapas de calor exportados
+    """
+    cambios = cambios or {}
+    simulacion = Simulacion.restaurar(instantanea, sumidero=SumideroNulo(), **cambios)
+    simulacion.ejecutar(mostrar=False, modo=modo)
+    resultado = {
+        "cambios": dict(cambios),
+        "metricas": dict(simulacion.metricas),
+        "flujo": simulacion.flujo.exportar(),
+        "vehiculos": {
+            v.nombre: {campo: getattr(v, campo) for campo in CONTADORES_VEHICULO}
+            for v in simulacion.vehiculos
+        }
+    }
+    if simulacion.mapas is not None:
+        resultado["mapas"] = simulacion.mapas.exportar()
+    return resultado
+
+
+def _continuar_tarea(tarea):
+    """Adaptador de una tupla de argumentos para ProcessPoolExecutor.map."""
+    return continuar(*tarea)
+
+
+def bifurcar(instantanea, variantes, modo="ticks", num_procesos=None):
+    """
+    Ejecuta varias continuaciones "¿qué pasaría si?" a partir de una misma instantánea,
+    de modo que el periodo de calentamiento se simula una sola vez.
+
+    Todas las variantes parten del mismo estado de los generadores (números aleatorios
+    comunes), así que las diferencias entre ellas se deben a los cambios y no al azar.
+
+    Parámetros:
+        instantanea (dict): Resultado de Simulacion.capturar() o cargar_instantanea().
+        variantes (list): Diccionarios de cambios para Simulacion.restaurar, por ejemplo
+                          [{"lambda_incidentes": 1.0}, {"velocidad_vehiculos": 4.0}].
+        modo (str): Motor de la continuación ("ticks" o "eventos").
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles, 1 = en serie).
+
+    Retorna: lista de resultados de continuar(), en el orden de las variantes
+    """
+    tareas = [(instantanea, cambios, modo) for cambios in variantes]
+    if num_procesos == 1:
+        return [_continuar_tarea(tarea) for tarea in tareas]
+
+    trabajadores = num_procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return list(ejecutor.map(_continuar_tarea, tareas))
+
+
+if __name__ == "__main__":
+    base = calentar(50, duracion_simulacion=200)
+    guardar_instantanea(base, "calentamiento.npz")
+
+    variantes = [{"lambda_incidentes": lmbda} for lmbda in (0.5, 1.0, 2.0)]
+    for resultado in bifurcar(cargar_instantanea("calentamiento.npz"), variantes):
+        metricas = resultado["metricas"]
+        print(f"{resultado['cambios']}: {metricas['incidentes_exitosos']}/{metricas['incidentes_totales']} exitosos")
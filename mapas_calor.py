@@ -0,0 +1,295 @@
+# ============================================================
+# mapas_calor.py
+# Mapas de calor en línea: incidentes por zona, distancia de
+# respuesta por celda y ocupación de la patrulla (memoria constante)
+# ============================================================
+
+import json
+import os
+
+import numpy as np
+
+from geometria import MAPA_LIMITES
+
+# Zonas de los incidentes del modelo original (las demás se agregan al aparecer)
+ZONAS_ORIGINALES = ("A1", "A2")
+
+# Archivo con la grilla y los nombres de las zonas junto a los .npy exportados
+ARCHIVO_METADATOS = "mapas.json"
+
+
+class MapasCalor:
+    """
+    Histogramas 2-D acumulados sobre una grilla que cubre MAPA_LIMITES:
+
+        incidentes:  incidentes por celda, uno por zona (zonas × filas × columnas).
+        respuestas:  despachos por celda del incidente, con la suma de las
+                     distancias de respuesta (vehículo → incidente), de modo que
+                     distancia_media = suma / respuestas.
+        ocupacion:   tiempo de vehículo en patrulla por celda (vehículos × tiempo),
+                     a partir de muestras de posición a intervalos regulares.
+
+    Los puntos se acumulan en búferes de a lo sumo tam_lote elementos y se vuelcan
+    a las grillas con np.bincount, así que la memoria no depende de la cantidad de
+    incidentes ni de la duración. Los mapas de varias réplicas se suman con
+    combinar() o combinar_exportados() y se guardan como .npy con guardar().
+
+    Parámetros:
+        tam_celda (float): Lado de las celdas (km).
+        zonas (iterable): Nombres de las zonas de incidentes conocidas de antemano.
+        limites (dict): Límites del mapa (x_min, x_max, y_min, y_max).
+        tam_lote (int): Puntos acumulados antes de volcarlos a las grillas.
+    """
+
+    def __init__(self, tam_celda=1.0, zonas=ZONAS_ORIGINALES, limites=MAPA_LIMITES, tam_lote=8192):
+        self.tam_celda = float(tam_celda)
+        self.limites = {clave: float(limites[clave]) for clave in ("x_min", "x_max", "y_min", "y_max")}
+        self.columnas = max(1, int(np.ceil((self.limites["x_max"] - self.limites["x_min"]) / self.tam_celda)))
+        self.filas = max(1, int(np.ceil((self.limites["y_max"] - self.limites["y_min"]) / self.tam_celda)))
+        self.tam_lote = int(tam_lote)
+
+        self.zonas = list(zonas)
+        self._indice_zona = {nombre: k for k, nombre in enumerate(self.zonas)}
+        self._incidentes = np.zeros((len(self.zonas), self.filas * self.columnas), dtype=np.int64)
+        self._respuestas = np.zeros(self.filas * self.columnas, dtype=np.int64)
+        self._distancia = np.zeros(self.filas * self.columnas)
+        self._ocupacion = np.zeros(self.filas * self.columnas)
+        # Tiempo de la próxima muestra de ocupación (ver Simulacion._muestrear_ocupacion)
+        self.proxima_muestra = 0.0
+
+        self._buf_incidentes = []     # (zona, x, y)
+        self._buf_respuestas = []     # (x, y, distancia)
+        self._buf_ocupacion = []      # (xs, ys, peso) en arreglos
+        self._pendientes_ocupacion = 0
+
+    def _celdas(self, xs, ys):
+        """Índice plano de la celda de cada punto (los puntos fuera del mapa van al borde)."""
+        c = np.floor((np.asarray(xs, dtype=np.float64) - self.limites["x_min"]) / self.tam_celda).astype(np.int64)
+        f = np.floor((np.asarray(ys, dtype=np.float64) - self.limites["y_min"]) / self.tam_celda).astype(np.int64)
+        return np.clip(f, 0, self.filas - 1) * self.columnas + np.clip(c, 0, self.columnas - 1)
+
+    # ------------------------------------------------------------------
+    # Acumulación
+    # ------------------------------------------------------------------
+
+    def agregar_incidente(self, zona, x, y):
+        """Registra un incidente de la zona dada en (x, y)."""
+        self._buf_incidentes.append((zona, x, y))
+        if len(self._buf_incidentes) >= self.tam_lote:
+            self._volcar_incidentes()
+
+    def agregar_respuesta(self, x, y, distancia):
+        """Registra la distancia recorrida por el vehículo despachado al incidente en (x, y)."""
+        self._buf_respuestas.append((x, y, distancia))
+        if len(self._buf_respuestas) >= self.tam_lote:
+            self._volcar_respuestas()
+
+    def agregar_ocupacion(self, xs, ys, peso):
+        """Registra posiciones de vehículos en patrulla; cada una aporta 'peso' de tiempo a su celda."""
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        if len(xs) == 0:
+            return
+        self._buf_ocupacion.append((xs, np.asarray(ys, dtype=np.float64).ravel(), float(peso)))
+        self._pendientes_ocupacion += len(xs)
+        if self._pendientes_ocupacion >= self.tam_lote:
+            self._volcar_ocupacion()
+
+    def _volcar_incidentes(self):
+        if not self._buf_incidentes:
+            return
+        zonas, xs, ys = zip(*self._buf_incidentes)
+        self._buf_incidentes = []
+        for nombre in set(zonas) - set(self._indice_zona):
+            self._agregar_zona(nombre)
+        indices = np.fromiter((self._indice_zona[z] for z in zonas), dtype=np.int64, count=len(zonas))
+        tam = self.filas * self.columnas
+        plano = indices * tam + self._celdas(xs, ys)
+        self._incidentes += np.bincount(plano, minlength=len(self.zonas) * tam).reshape(len(self.zonas), tam)
+
+    def _volcar_respuestas(self):
+        if not self._buf_respuestas:
+            return
+        xs, ys, distancias = zip(*self._buf_respuestas)
+        self._buf_respuestas = []
+        celdas = self._celdas(xs, ys)
+        tam = self.filas * self.columnas
+        self._respuestas += np.bincount(celdas, minlength=tam)
+        self._distancia += np.bincount(celdas, weights=distancias, minlength=tam)
+
+    def _volcar_ocupacion(self):
+        if not self._buf_ocupacion:
+            return
+        xs = np.concatenate([b[0] for b in self._buf_ocupacion])
+        ys = np.concatenate([b[1] for b in self._buf_ocupacion])
+        pesos = np.concatenate([np.full(len(b[0]), b[2]) for b in self._buf_ocupacion])
+        self._buf_ocupacion = []
+        self._pendientes_ocupacion = 0
+        self._ocupacion += np.bincount(self._celdas(xs, ys), weights=pesos, minlength=self.filas * self.columnas)
+
+    def _agregar_zona(self, nombre):
+        self._indice_zona[nombre] = len(self.zonas)
+        self.zonas.append(nombre)
+        self._incidentes = np.vstack([self._incidentes, np.zeros((1, self.filas * self.columnas), dtype=np.int64)])
+
+    def vaciar(self):
+        """Vuelca a las grillas todos los puntos pendientes en los búferes."""
+        self._volcar_incidentes()
+        self._volcar_respuestas()
+        self._volcar_ocupacion()
+
+    # ------------------------------------------------------------------
+    # Mapas
+    # ------------------------------------------------------------------
+
+    @property
+    def incidentes(self):
+        """Incidentes por zona y celda: arreglo (zonas, filas, columnas); la fila 0 es y_min."""
+        self._volcar_incidentes()
+        return self._incidentes.reshape(len(self.zonas), self.filas, self.columnas)
+
+    @property
+    def incidentes_totales(self):
+        """Incidentes por celda, sumando todas las zonas."""
+        return self.incidentes.sum(axis=0)
+
+    @property
+    def respuestas(self):
+        """Despachos por celda del incidente."""
+        self._volcar_respuestas()
+        return self._respuestas.reshape(self.filas, self.columnas)
+
+    @property
+    def distancia_media(self):
+        """Distancia de respuesta media por celda (NaN en las celdas sin despachos)."""
+        self._volcar_respuestas()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = self._distancia / self._respuestas
+        return np.where(self._respuestas > 0, media, np.nan).reshape(self.filas, self.columnas)
+
+    @property
+    def ocupacion(self):
+        """Tiempo de vehículo en patrulla por celda."""
+        self._volcar_ocupacion()
+        return self._ocupacion.reshape(self.filas, self.columnas)
+
+    def centro(self, fila, columna):
+        """Coordenadas (x, y) del centro de una celda."""
+        return (self.limites["x_min"] + (columna + 0.5) * self.tam_celda,
+                self.limites["y_min"] + (fila + 0.5) * self.tam_celda)
+
+    def puntos_calientes(self, cantidad=5):
+        """
+        Celdas con más incidentes.
+        Retorna: lista de (x, y, incidentes, distancia media) del centro de cada celda
+        """
+        totales = self.incidentes_totales.ravel()
+        media = self.distancia_media.ravel()
+        orden = np.argsort(totales, kind="stable")[::-1][:cantidad]
+        return [(*self.centro(*divmod(int(k), self.columnas)), int(totales[k]), float(media[k]))
+                for k in orden if totales[k] > 0]
+
+    def brechas_cobertura(self, cantidad=5):
+        """
+        Brechas de cobertura: celdas con incidentes por las que la patrulla no pasó,
+        ordenadas por cantidad de incidentes.
+        Retorna: (celdas con incidentes y sin patrulla, incidentes en ellas,
+                  lista de (x, y, incidentes) de las 'cantidad' mayores)
+        """
+        totales = self.incidentes_totales.ravel()
+        brecha = np.where((totales > 0) & (self.ocupacion.ravel() == 0), totales, 0)
+        orden = np.argsort(brecha, kind="stable")[::-1][:cantidad]
+        mayores = [(*self.centro(*divmod(int(k), self.columnas)), int(brecha[k])) for k in orden if brecha[k] > 0]
+        return int(np.count_nonzero(brecha)), int(brecha.sum()), mayores
+
+    # ------------------------------------------------------------------
+    # Combinación y exportación
+    # ------------------------------------------------------------------
+
+    def _compatible(self, otro):
+        if (self.tam_celda, self.limites) != (otro.tam_celda, otro.limites):
+            raise ValueError("Los mapas de calor tienen grillas distintas (tamaño de celda o límites)")
+
+    def combinar(self, otro):
+        """Suma a este mapa los de 'otro' (misma grilla; las zonas se unen por nombre)."""
+        self._compatible(otro)
+        self.vaciar()
+        otro.vaciar()
+        for k, nombre in enumerate(otro.zonas):
+            if nombre not in self._indice_zona:
+                self._agregar_zona(nombre)
+            self._incidentes[self._indice_zona[nombre]] += otro._incidentes[k]
+        self._respuestas += otro._respuestas
+        self._distancia += otro._distancia
+        self._ocupacion += otro._ocupacion
+
+    def exportar(self):
+        """Estado como datos simples (instantáneas y resultados de réplicas)."""
+        self.vaciar()
+        return {
+            "tam_celda": self.tam_celda,
+            "limites": dict(self.limites),
+            "zonas": list(self.zonas),
+            "incidentes": self._incidentes.tolist(),
+            "respuestas": self._respuestas.tolist(),
+            "distancia": self._distancia.tolist(),
+            "ocupacion": self._ocupacion.tolist(),
+            "proxima_muestra": self.proxima_muestra
+        }
+
+    @classmethod
+    def importar(cls, estado):
+        mapas = cls(estado["tam_celda"], estado["zonas"], estado["limites"])
+        tam = mapas.filas * mapas.columnas
+        mapas._incidentes = np.array(estado["incidentes"], dtype=np.int64).reshape(len(mapas.zonas), tam)
+        mapas._respuestas = np.array(estado["respuestas"], dtype=np.int64)
+        mapas._distancia = np.array(estado["distancia"], dtype=np.float64)
+        mapas._ocupacion = np.array(estado["ocupacion"], dtype=np.float64)
+        mapas.proxima_muestra = estado.get("proxima_muestra", 0.0)
+        return mapas
+
+    @classmethod
+    def combinar_exportados(cls, estados):
+        """Une varios mapas exportados (por ejemplo, uno por réplica)."""
+        total = None
+        for estado in estados:
+            mapas = cls.importar(estado)
+            if total is None:
+                total = mapas
+            else:
+                total.combinar(mapas)
+        return total
+
+    def guardar(self, directorio):
+        """
+        Escribe los mapas en 'directorio' como .npy (filas × columnas, la fila 0 es
+        y_min): incidentes_<zona>.npy, incidentes.npy (todas las zonas), respuestas.npy,
+        distancia_suma.npy, distancia_media.npy y ocupacion.npy, más mapas.json con
+        la grilla y los nombres de las zonas. Las sumas y conteos permiten combinar
+        los archivos de varias ejecuciones (ver cargar).
+        """
+        os.makedirs(directorio, exist_ok=True)
+        incidentes = self.incidentes
+        for k, nombre in enumerate(self.zonas):
+            np.save(os.path.join(directorio, f"incidentes_{nombre}.npy"), incidentes[k])
+        np.save(os.path.join(directorio, "incidentes.npy"), incidentes.sum(axis=0))
+        np.save(os.path.join(directorio, "respuestas.npy"), self.respuestas)
+        np.save(os.path.join(directorio, "distancia_suma.npy"), self._distancia.reshape(self.filas, self.columnas))
+        np.save(os.path.join(directorio, "distancia_media.npy"), self.distancia_media)
+        np.save(os.path.join(directorio, "ocupacion.npy"), self.ocupacion)
+        with open(os.path.join(directorio, ARCHIVO_METADATOS), "w", encoding="utf-8") as f:
+            json.dump({"tam_celda": self.tam_celda, "limites": self.limites, "zonas": self.zonas,
+                       "filas": self.filas, "columnas": self.columnas}, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, directorio):
+        """Lee los mapas escritos con guardar()."""
+        with open(os.path.join(directorio, ARCHIVO_METADATOS), encoding="utf-8") as f:
+            meta = json.load(f)
+        mapas = cls(meta["tam_celda"], meta["zonas"], meta["limites"])
+        mapas._incidentes = np.stack([
+            np.load(os.path.join(directorio, f"incidentes_{nombre}.npy")).ravel() for nombre in mapas.zonas
+        ]) if mapas.zonas else mapas._incidentes
+        mapas._respuestas = np.load(os.path.join(directorio, "respuestas.npy")).ravel()
+        mapas._distancia = np.load(os.path.join(directorio, "distancia_suma.npy")).ravel()
+        mapas._ocupacion = np.load(os.path.join(directorio, "ocupacion.npy")).ravel()
+        return mapas
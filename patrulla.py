@@ -0,0 +1,209 @@
+# ============================================================
+# patrulla.py
+# Patrulla en forma cerrada: posición por longitud de arco sobre
+# cada ruta, evaluada solo cuando un despacho la necesita
+# ============================================================
+
+import numpy as np
+
+from flota import NUM_WAYPOINTS, PATRULLANDO, SIN_RUTA, WAYPOINTS_RUTAS
+from geometria import MAPA_LIMITES
+
+# Velocidad de patrulla (km/tick) y amplitud de la variación por tráfico, como en
+# evento_tick_patrulla_con_rutas
+VELOCIDAD_MINIMA = 3.0
+VELOCIDAD_RANGO = 2.0
+AMPLITUD_VARIACION = 0.5
+
+
+def _tabla_arcos():
+    """
+    Precalcula cada ruta como un recorrido cerrado (del último waypoint se vuelve
+    al primero): origen y vector unitario de cada segmento, longitud acumulada al
+    inicio de cada segmento y longitud total. Las rutas con menos segmentos se
+    rellenan con segmentos de longitud infinita que la búsqueda nunca alcanza.
+    """
+    rutas, max_puntos = WAYPOINTS_RUTAS.shape[:2]
+    origen = np.zeros((rutas, max_puntos, 2))
+    unitario = np.zeros((rutas, max_puntos, 2))
+    acumulado = np.full((rutas, max_puntos + 1), np.inf)
+    total = np.zeros(rutas)
+    for r in range(rutas):
+        n = NUM_WAYPOINTS[r]
+        puntos = WAYPOINTS_RUTAS[r, :n]
+        delta = np.roll(puntos, -1, axis=0) - puntos
+        largo = np.hypot(delta[:, 0], delta[:, 1])
+        origen[r, :n] = puntos
+        unitario[r, :n] = delta / np.where(largo > 0, largo, 1.0)[:, None]
+        acumulado[r, 0] = 0.0
+        acumulado[r, 1:n + 1] = np.cumsum(largo)
+        total[r] = acumulado[r, n]
+    return origen, unitario, acumulado, total
+
+
+ORIGEN_SEGMENTOS, UNITARIOS, LARGO_ACUMULADO, LARGO_RUTA = _tabla_arcos()
+
+
+def posicion_en_ruta(rutas, arco):
+    """
+    Puntos a longitud de arco 'arco' (módulo la longitud de la ruta) sobre cada
+    ruta: una búsqueda binaria en las longitudes acumuladas por punto.
+
+    Parámetros:
+        rutas (ndarray): Índice de ruta de cada punto.
+        arco (ndarray): Longitud de arco recorrida desde el primer waypoint.
+
+    Retorna: (x, y) como arreglos
+    """
+    arco = np.mod(arco, LARGO_RUTA[rutas])
+    segmento = np.empty(len(rutas), dtype=np.int64)
+    for r in np.unique(rutas):
+        de_ruta = rutas == r
+        segmento[de_ruta] = np.searchsorted(LARGO_ACUMULADO[r], arco[de_ruta], side="right") - 1
+    avance = arco - LARGO_ACUMULADO[rutas, segmento]
+    x = ORIGEN_SEGMENTOS[rutas, segmento, 0] + UNITARIOS[rutas, segmento, 0] * avance
+    y = ORIGEN_SEGMENTOS[rutas, segmento, 1] + UNITARIOS[rutas, segmento, 1] * avance
+    return x, y
+
+
+def proyectar_en_ruta(ruta, x, y):
+    """Longitud de arco del punto de la ruta más cercano a (x, y)."""
+    n = NUM_WAYPOINTS[ruta]
+    origen = ORIGEN_SEGMENTOS[ruta, :n]
+    unitario = UNITARIOS[ruta, :n]
+    largo = np.diff(LARGO_ACUMULADO[ruta, :n + 1])
+    avance = np.clip((x - origen[:, 0]) * unitario[:, 0] + (y - origen[:, 1]) * unitario[:, 1], 0.0, largo)
+    distancia = np.hypot(origen[:, 0] + unitario[:, 0] * avance - x, origen[:, 1] + unitario[:, 1] * avance - y)
+    cercano = int(distancia.argmin())
+    return float(LARGO_ACUMULADO[ruta, cercano] + avance[cercano])
+
+
+def _mezclar(z):
+    """Función de mezcla de splitmix64 sobre enteros sin signo de 64 bits."""
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def uniformes_contador(semilla, vehiculos, pasos, componente):
+    """
+    Uniformes en [0, 1) que dependen solo de (semilla, vehículo, paso, componente):
+    se pueden evaluar en cualquier orden y en cualquier instante sin llevar estado.
+    """
+    with np.errstate(over="ignore"):
+        z = np.uint64(semilla) * np.uint64(0xD1B54A32D192ED03)
+        z = _mezclar(z ^ np.asarray(vehiculos, dtype=np.uint64) * np.uint64(0xAEF17502108EF2D9))
+        z = _mezclar(z ^ np.asarray(pasos, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15) ^ np.uint64(componente))
+        return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class PatrullaArco:
+    """
+    Patrulla en forma cerrada sobre las rutas de la flota.
+
+    Cada vehículo con ruta recorre su ruta a velocidad constante (3-5 km/tick,
+    sorteada una vez por vehículo), de modo que su longitud de arco en el tiempo t
+    es arco0 + velocidad · (t − t0) y su posición sale de una búsqueda binaria en
+    las longitudes acumuladas de la ruta. A esa posición se suma una variación por
+    tráfico de ±0.25 km por coordenada que cambia en cada tick y se obtiene de un
+    generador por contador sembrado (no consume el generador de la simulación).
+
+    Las posiciones solo se calculan en actualizar(), cuando un despacho las necesita:
+    el costo de la patrulla depende de la cantidad de incidentes y no de ticks × flota.
+    Al volver de un servicio, el vehículo se reincorpora a su ruta en el punto más
+    cercano. Los vehículos sin ruta permanecen detenidos mientras patrullan.
+
+    Parámetros:
+        flota (Flota): Flota cuyas posiciones se actualizan.
+        semilla (int): Semilla de las velocidades y de la variación por tráfico.
+        intervalo (float): Duración de un tick (las velocidades están en km/tick).
+        tiempo (float): Tiempo de inicio de la patrulla.
+    """
+
+    def __init__(self, flota, semilla, intervalo=1.0, tiempo=0.0):
+        self.flota = flota
+        self.semilla = int(semilla)
+        self.intervalo = float(intervalo)
+        n = flota.n
+        indices = np.arange(n)
+        self.velocidad = (VELOCIDAD_MINIMA + VELOCIDAD_RANGO * uniformes_contador(self.semilla, indices, 0, 2)) / self.intervalo
+        self.arco0 = np.zeros(n)
+        self.t0 = np.full(n, float(tiempo))
+        self._actualizado = None
+        for i in range(n):
+            self.reincorporar(i, tiempo)
+
+    def reincorporar(self, i, tiempo):
+        """El vehículo i vuelve a patrullar desde su posición actual en el tiempo dado."""
+        ruta = int(self.flota.ruta[i])
+        if ruta != SIN_RUTA:
+            self.arco0[i] = proyectar_en_ruta(ruta, self.flota.x[i], self.flota.y[i])
+        self.t0[i] = tiempo
+        self._actualizado = None
+
+    def posiciones(self, indices, tiempos):
+        """
+        Posiciones de patrulla de los vehículos 'indices' (con ruta) en cada uno de
+        los 'tiempos', sin modificar la flota.
+
+        Retorna: (x, y) como arreglos de forma (len(tiempos), len(indices))
+        """
+        indices = np.asarray(indices)
+        tiempos = np.asarray(tiempos, dtype=np.float64).reshape(-1, 1)
+        forma = (len(tiempos), len(indices))
+        rutas = np.broadcast_to(self.flota.ruta[indices], forma).ravel()
+        vehiculos = np.broadcast_to(indices, forma).ravel()
+        arco = (self.arco0[indices] + self.velocidad[indices] * (tiempos - self.t0[indices])).ravel()
+        x, y = posicion_en_ruta(rutas, arco)
+        pasos = np.broadcast_to(np.floor(tiempos / self.intervalo).astype(np.int64), forma).ravel()
+        x += (uniformes_contador(self.semilla, vehiculos, pasos, 0) - 0.5) * AMPLITUD_VARIACION
+        y += (uniformes_contador(self.semilla, vehiculos, pasos, 1) - 0.5) * AMPLITUD_VARIACION
+        x = np.clip(x, MAPA_LIMITES["x_min"], MAPA_LIMITES["x_max"])
+        y = np.clip(y, MAPA_LIMITES["y_min"], MAPA_LIMITES["y_max"])
+        return x.reshape(forma), y.reshape(forma)
+
+    def en_ruta(self):
+        """Índices de los vehículos en patrulla con ruta (los que se mueven)."""
+        flota = self.flota
+        return np.flatnonzero((flota.estado[:flota.n] == PATRULLANDO) & (flota.ruta[:flota.n] != SIN_RUTA))
+
+    def actualizar(self, tiempo):
+        """
+        Lleva a la flota (y a su índice espacial) la posición en 'tiempo' de todos los
+        vehículos en patrulla con ruta. Llamadas repetidas en el mismo tiempo no
+        recalculan nada.
+        """
+        if self._actualizado == tiempo:
+            return
+        flota = self.flota
+        indices = self.en_ruta()
+        if len(indices):
+            x, y = self.posiciones(indices, tiempo)
+            flota.x[indices] = x[0]
+            flota.y[indices] = y[0]
+            flota.sincronizar(indices)
+        self._actualizado = tiempo
+
+    def exportar(self):
+        """Estado como datos simples (para las instantáneas de la simulación)."""
+        return {
+            "semilla": self.semilla,
+            "intervalo": self.intervalo,
+            "velocidad": self.velocidad.tolist(),
+            "arco0": self.arco0.tolist(),
+            "t0": self.t0.tolist()
+        }
+
+    @classmethod
+    def importar(cls, flota, estado):
+        """Reconstruye la patrulla de 'flota' a partir de exportar()."""
+        patrulla = cls.__new__(cls)
+        patrulla.flota = flota
+        patrulla.semilla = estado["semilla"]
+        patrulla.intervalo = estado["intervalo"]
+        patrulla.velocidad = np.array(estado["velocidad"], dtype=np.float64)
+        patrulla.arco0 = np.array(estado["arco0"], dtype=np.float64)
+        patrulla.t0 = np.array(estado["t0"], dtype=np.float64)
+        patrulla._actualizado = None
+        return patrulla
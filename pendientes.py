@@ -0,0 +1,68 @@
+# ============================================================
+# pendientes.py
+# Cola de incidentes pendientes (montículo por antigüedad o severidad)
+# ============================================================
+
+import heapq
+
+# Criterios de prioridad de la cola
+PRIORIDADES = ("antiguedad", "severidad")
+
+
+class ColaPendientes:
+    """
+    Incidentes que llegaron sin vehículos libres, a la espera de ser atendidos.
+
+    Es un montículo binario: agregar y extraer cuestan O(log n) sin importar la
+    profundidad de la cola. Con prioridad "antiguedad" se atiende primero el que
+    llegó antes; con "severidad", el de mayor incidente["severidad"] (0 si no la
+    tiene) y, a igual severidad, el más antiguo.
+
+    Parámetros:
+        prioridad (str): "antiguedad" o "severidad".
+    """
+
+    def __init__(self, prioridad="antiguedad"):
+        if prioridad not in PRIORIDADES:
+            raise ValueError(f"Prioridad desconocida: {prioridad} (opciones: {', '.join(PRIORIDADES)})")
+        self.prioridad = prioridad
+        self._entradas = []
+        self._secuencia = 0
+        self.maximo = 0   # Mayor longitud alcanzada
+
+    def agregar(self, incidente, tiempo):
+        """Encola un incidente que llegó en 'tiempo'."""
+        severidad = -incidente.get("severidad", 0) if self.prioridad == "severidad" else 0
+        heapq.heappush(self._entradas, (severidad, tiempo, self._secuencia, incidente))
+        self._secuencia += 1
+        self.maximo = max(self.maximo, len(self._entradas))
+
+    def extraer(self):
+        """Saca el incidente de mayor prioridad. Retorna: (incidente, tiempo de llegada)"""
+        _, tiempo, _, incidente = heapq.heappop(self._entradas)
+        return incidente, tiempo
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __bool__(self):
+        return bool(self._entradas)
+
+    def exportar(self):
+        """Estado como datos simples (para las instantáneas de la simulación)."""
+        return {
+            "prioridad": self.prioridad,
+            "secuencia": self._secuencia,
+            "maximo": self.maximo,
+            "entradas": [list(e) for e in sorted(self._entradas, key=lambda e: e[:3])]
+        }
+
+    @classmethod
+    def importar(cls, estado):
+        """Reconstruye una cola a partir de exportar()."""
+        cola = cls(estado["prioridad"])
+        cola._entradas = [(e[0], e[1], e[2], dict(e[3])) for e in estado["entradas"]]
+        heapq.heapify(cola._entradas)
+        cola._secuencia = estado["secuencia"]
+        cola.maximo = estado["maximo"]
+        return cola
@@ -0,0 +1,106 @@
+# ============================================================
+# perfilado.py
+# Instrumentación opcional: tiempo por fase y eventos por segundo
+# ============================================================
+
+from time import perf_counter_ns
+
+from registro_eventos import SumideroEventos
+
+# Fases del bucle de simulación, en el orden en que se reportan:
+#   poisson     sorteo de incidentes (Poisson por tick o tiempo entre llegadas)
+#   incidente   generación del incidente (evento_incidente)
+#   despacho    selección del vehículo (seleccionar_vehiculo)
+#   atencion    viaje, contacto, traslado y cola de pendientes
+#   patrulla    movimiento de la patrulla
+#   calendario  extracción del próximo evento (motor por eventos)
+#   mapas       muestreo de la ocupación de la patrulla en los mapas de calor
+#   salida      emisión de eventos al sumidero (ya incluida en las demás fases)
+FASES = ("poisson", "incidente", "despacho", "atencion", "patrulla", "calendario", "mapas", "salida")
+
+
+class Perfilador:
+    """
+    Acumula el tiempo de reloj (perf_counter_ns) y la cantidad de llamadas de cada
+    fase del bucle de simulación.
+
+    Las fases se miden encadenando marcas de tiempo, de modo que cada medición
+    cuesta una sola lectura del reloj:
+
+        t = perf_counter_ns()
+        ...fase A...
+        t = perfilador.registrar("A", t)
+        ...fase B...
+        t = perfilador.registrar("B", t)
+
+    Simulacion solo mide cuando se crea con perfilar=True; desactivado, el costo
+    es una comprobación de None por fase.
+    """
+
+    def __init__(self):
+        self.ns = dict.fromkeys(FASES, 0)
+        self.llamadas = dict.fromkeys(FASES, 0)
+        self.total_ns = 0      # Tiempo de reloj dentro de Simulacion.ejecutar
+        self.eventos = 0       # Incidentes (modo por ticks) o eventos del calendario procesados
+        self.ticks = 0
+
+    def registrar(self, fase, inicio):
+        """Suma a la fase el tiempo transcurrido desde 'inicio' y retorna la marca actual."""
+        ahora = perf_counter_ns()
+        self.ns[fase] += ahora - inicio
+        self.llamadas[fase] += 1
+        return ahora
+
+    def resumen(self):
+        """
+        Retorna: diccionario con el tiempo total en segundos, los eventos y ticks
+                 procesados, los eventos por segundo y, por fase, las llamadas, el
+                 tiempo total (ms), el tiempo medio por llamada (µs) y la fracción
+                 del tiempo total
+        """
+        total = self.total_ns / 1e9
+        return {
+            "total_s": total,
+            "eventos": self.eventos,
+            "ticks": self.ticks,
+            "eventos_por_s": self.eventos / total if total else 0.0,
+            "fases": {
+                fase: {
+                    "llamadas": self.llamadas[fase],
+                    "total_ms": self.ns[fase] / 1e6,
+                    "media_us": self.ns[fase] / self.llamadas[fase] / 1e3 if self.llamadas[fase] else 0.0,
+                    "fraccion": self.ns[fase] / self.total_ns if self.total_ns else 0.0
+                }
+                for fase in FASES if self.llamadas[fase]
+            }
+        }
+
+
+class SumideroMedido(SumideroEventos):
+    """
+    Envuelve otro sumidero y mide el tiempo de sus emisiones en la fase "salida".
+    El tiempo de simulación y el filtro 'activos' son los del sumidero envuelto.
+    """
+
+    def __init__(self, sumidero, perfilador):
+        self.sumidero = sumidero
+        self.perfilador = perfilador
+        self.activos = sumidero.activos
+
+    @property
+    def tiempo(self):
+        return self.sumidero.tiempo
+
+    @tiempo.setter
+    def tiempo(self, valor):
+        self.sumidero.tiempo = valor
+
+    def emitir(self, tipo, *campos):
+        inicio = perf_counter_ns()
+        self.sumidero.emitir(tipo, *campos)
+        self.perfilador.registrar("salida", inicio)
+
+    def cerrar(self):
+        inicio = perf_counter_ns()
+        self.sumidero.cerrar()
+        self.perfilador.registrar("salida", inicio)
@@ -0,0 +1,299 @@
+# ============================================================
+# periodo.py
+# Análisis de periodo de generadores mixtos y búsqueda de parámetros (a, c)
+# ============================================================
+
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from generadores import GeneradorMixto, PARAMETROS_REPORTES, PARAMETROS_VEHICULOS
+
+
+def factores_primos(n):
+    """Factores primos distintos de n, en orden creciente."""
+    factores = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            factores.append(d)
+            while n % d == 0:
+                n //= d
+        d += 1 if d == 2 else 2
+    if n > 1:
+        factores.append(n)
+    return factores
+
+
+def condiciones_hull_dobell(a, c, m):
+    """
+    Evalúa las tres condiciones del teorema de Hull–Dobell, que juntas garantizan
+    periodo completo (m) para cualquier semilla:
+        1. c y m son primos relativos.
+        2. a − 1 es divisible por todos los factores primos de m.
+        3. Si m es divisible por 4, a − 1 también lo es.
+
+    Retorna: diccionario {"c_coprimo", "a_factores", "a_multiplo_4", "periodo_completo"}
+    """
+    condiciones = {
+        "c_coprimo": math.gcd(c, m) == 1,
+        "a_factores": all((a - 1) % p == 0 for p in factores_primos(m)),
+        "a_multiplo_4": m % 4 != 0 or (a - 1) % 4 == 0,
+    }
+    condiciones["periodo_completo"] = all(condiciones.values())
+    return condiciones
+
+
+def cumple_hull_dobell(a, c, m):
+    """True si (a, c, m) tiene periodo completo según Hull–Dobell."""
+    return condiciones_hull_dobell(a, c, m)["periodo_completo"]
+
+
+def potencia(a, m):
+    """
+    Potencia del multiplicador: menor s tal que (a − 1)^s ≡ 0 (mod m), o None si no
+    existe. Con potencia 1 o 2 la secuencia es claramente no aleatoria; se recomienda
+    al menos 5.
+    """
+    b = (a - 1) % m
+    producto = b
+    for s in range(1, m.bit_length() + 1):
+        if producto == 0:
+            return s
+        producto = (producto * b) % m
+    return None
+
+
+def correlacion_serial(a, c, m):
+    """
+    Aproximación de Knuth del coeficiente de correlación serial de desfase 1 de un
+    LCG con periodo completo: (1 − 6·c/m·(1 − c/m)) / a, con error acotado por (a + 6)/m.
+    """
+    return (1 - 6 * (c / m) * (1 - c / m)) / a
+
+
+def figura_espectral(a, m):
+    """
+    Prueba espectral en 2 dimensiones: los pares (U_n, U_n+1) caen en rectas paralelas
+    separadas 1/ν, con ν la norma del vector más corto del retículo
+    {(s1, s2) : s1 + a·s2 ≡ 0 (mod m)}, hallado por reducción de Gauss. Retorna la
+    figura de mérito μ = π·ν²/m (entre 0 y ≈3.63; valores mayores son mejores).
+    """
+    u, v = (m, 0), (-(a % m), 1)
+    norma = lambda w: w[0] * w[0] + w[1] * w[1]
+    if norma(u) < norma(v):
+        u, v = v, u
+    while True:
+        # v es el más corto: se reduce u contra v
+        q = (2 * (u[0] * v[0] + u[1] * v[1]) + norma(v)) // (2 * norma(v))  # redondeo entero
+        u = (u[0] - q * v[0], u[1] - q * v[1])
+        if norma(u) >= norma(v):
+            break
+        u, v = v, u
+    return math.pi * norma(v) / m
+
+
+def detectar_ciclo(a, c, m, x0, limite=None):
+    """
+    Detección de ciclos de Brent sobre x → (a·x + c) mod m, con memoria constante.
+
+    Parámetros:
+        a, c, m, x0 (int): Parámetros y semilla del generador.
+        limite (int): Máximo de pasos a explorar (None = 4·m, que siempre basta).
+
+    Retorna: (cola, periodo): la secuencia entra en el ciclo tras 'cola' pasos y se
+             repite cada 'periodo' pasos. Retorna None si se alcanza el límite.
+    """
+    limite = 4 * m if limite is None else limite
+    paso = lambda x: (a * x + c) % m
+
+    # Fase 1: longitud del ciclo con potencias de dos
+    potencia_actual = periodo = 1
+    tortuga, liebre = x0, paso(x0)
+    pasos = 1
+    while tortuga != liebre:
+        if pasos > limite:
+            return None
+        if potencia_actual == periodo:
+            tortuga = liebre
+            potencia_actual *= 2
+            periodo = 0
+        liebre = paso(liebre)
+        periodo += 1
+        pasos += 1
+
+    # Fase 2: longitud de la cola (la liebre adelanta 'periodo' pasos a la tortuga)
+    tortuga = liebre = x0
+    for _ in range(periodo):
+        liebre = paso(liebre)
+    cola = 0
+    while tortuga != liebre:
+        tortuga, liebre = paso(tortuga), paso(liebre)
+        cola += 1
+
+    return cola, periodo
+
+
+def medir_periodo(a, c, m, x0, tam_bloque=1 << 16):
+    """
+    Mide el periodo real de la secuencia que parte de x0.
+
+    Si a es invertible módulo m la secuencia es puramente periódica (sin cola) y el
+    periodo es el primer k con X_k = x0: se busca de forma vectorizada generando
+    bloques de tam_bloque valores con siguiente_lote, en memoria acotada. En otro
+    caso se usa la detección de ciclos de Brent.
+
+    Retorna: (cola, periodo)
+    """
+    if math.gcd(a, m) != 1:
+        return detectar_ciclo(a, c, m, x0)
+
+    generador = GeneradorMixto(a, c, m, x0)
+    generados = 0
+    while generados < m:
+        bloque = generador.siguiente_lote(min(tam_bloque, m - generados))
+        repeticiones = np.flatnonzero(bloque == x0)
+        if len(repeticiones):
+            return 0, generados + int(repeticiones[0]) + 1
+        generados += len(bloque)
+    # Inalcanzable: un mapa invertible sobre m estados regresa a x0 en a lo sumo m pasos
+    raise RuntimeError(f"No se encontró el periodo de a={a}, c={c}, m={m} en {m} pasos")
+
+
+def incrementos_recomendados(m, cantidad=4):
+    """
+    Valores de c primos relativos con m cercanos a m·(1/2 − √3/6), que según Knuth
+    minimiza la correlación serial de desfase 1.
+    """
+    objetivo = int(m * (0.5 - math.sqrt(3) / 6))
+    incrementos = []
+    for distancia in range(m):
+        for c in (objetivo - distancia, objetivo + distancia):
+            if 0 < c < m and math.gcd(c, m) == 1 and c not in incrementos:
+                incrementos.append(c)
+                if len(incrementos) == cantidad:
+                    return incrementos
+    return incrementos
+
+
+def _paso_multiplicadores(m):
+    """Paso entre multiplicadores válidos: a ≡ 1 módulo el producto de los primos de m (y 4 si 4 | m)."""
+    paso = math.prod(factores_primos(m))
+    if m % 4 == 0 and paso % 4 != 0:
+        paso *= 2
+    return paso
+
+
+def _clave_orden(candidato):
+    return -candidato["espectral"], abs(candidato["correlacion"]), candidato["a"], candidato["c"]
+
+
+def _evaluar_multiplicadores(tarea):
+    """
+    Evalúa un tramo de multiplicadores a = 1 + k·paso con cada incremento dado y
+    retorna solo los 'cantidad' mejores del tramo.
+    """
+    m, paso, k_inicio, k_fin, incrementos, cantidad, potencia_minima, verificar = tarea
+    evaluados = []
+    for k in range(k_inicio, k_fin):
+        a = 1 + k * paso
+        s = potencia(a, m)
+        if s is None or s < potencia_minima:
+            continue
+        espectral = figura_espectral(a, m)
+        for c in incrementos:
+            evaluados.append({
+                "a": a,
+                "c": c,
+                "m": m,
+                "potencia": s,
+                "espectral": espectral,
+                "correlacion": correlacion_serial(a, c, m),
+            })
+
+    mejores = heapq.nsmallest(cantidad, evaluados, key=_clave_orden)
+    if verificar:
+        for candidato in mejores:
+            candidato["periodo"] = medir_periodo(candidato["a"], candidato["c"], m, 0)[1]
+    return mejores
+
+
+def buscar_parametros(m, incrementos=None, cantidad=10, potencia_minima=2, verificar=False, num_procesos=None):
+    """
+    Enumera los pares (a, c) con periodo completo para el módulo m y los ordena de
+    mejor a peor: primero mayor figura espectral en 2 dimensiones, luego menor
+    correlación serial aproximada. Solo se recorren los multiplicadores que cumplen Hull–Dobell
+    (a ≡ 1 módulo el producto de los primos de m), repartidos entre procesos.
+
+    Parámetros:
+        m (int): Módulo del generador.
+        incrementos (list): Valores de c a combinar (por defecto, incrementos_recomendados(m)).
+        cantidad (int): Número de pares a retornar.
+        potencia_minima (int): Descarta multiplicadores con potencia menor.
+        verificar (bool): Mide el periodo real de los mejores pares de cada tramo (costo O(m) por par).
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles).
+
+    Retorna: lista de diccionarios {"a", "c", "m", "potencia", "espectral", "correlacion"[, "periodo"]}
+    """
+    incrementos = incrementos or incrementos_recomendados(m)
+    if not all(math.gcd(c, m) == 1 for c in incrementos):
+        raise ValueError(f"Todos los incrementos deben ser primos relativos con m={m}")
+
+    paso = _paso_multiplicadores(m)
+    total = (m - 2) // paso  # multiplicadores 1 + k·paso en [2, m) con k = 1..total
+    if total <= 0:
+        return []
+
+    trabajadores = num_procesos or os.cpu_count() or 1
+    tam_tramo = max(1, math.ceil(total / (trabajadores * 4)))
+    tareas = [(m, paso, k, min(k + tam_tramo, total + 1), incrementos, cantidad, potencia_minima, verificar)
+              for k in range(1, total + 1, tam_tramo)]
+
+    if trabajadores == 1:
+        tramos = map(_evaluar_multiplicadores, tareas)
+        candidatos = [c for tramo in tramos for c in tramo]
+    else:
+        with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+            candidatos = [c for tramo in ejecutor.map(_evaluar_multiplicadores, tareas) for c in tramo]
+
+    return heapq.nsmallest(cantidad, candidatos, key=_clave_orden)
+
+
+def modulo_para_valores(num_valores):
+    """
+    Menor potencia de dos con al menos num_valores estados: un generador de periodo
+    completo con ese módulo no repite valores durante una corrida que consume
+    num_valores números.
+    """
+    return 1 << max(1, (num_valores - 1).bit_length())
+
+
+def analizar_generador(nombre, a, c, m, x0):
+    """Muestra las condiciones de Hull–Dobell y el periodo medido de un generador."""
+    condiciones = condiciones_hull_dobell(a, c, m)
+    cola, periodo = medir_periodo(a, c, m, x0)
+
+    print(f"\n{nombre}: a={a}, c={c}, m={m}, x0={x0}")
+    print(f"  c primo relativo con m:          {'Sí' if condiciones['c_coprimo'] else 'No'}")
+    print(f"  a−1 divisible por primos de m:   {'Sí' if condiciones['a_factores'] else 'No'}")
+    print(f"  a−1 divisible por 4 (si 4 | m):  {'Sí' if condiciones['a_multiplo_4'] else 'No'}")
+    print(f"  Potencia de a:                   {potencia(a, m)}")
+    print(f"  Figura espectral (2D):           {figura_espectral(a, m):.3f}")
+    print(f"  Periodo medido:                  {periodo} (cola {cola})"
+          f"{' — periodo completo' if periodo == m else ''}")
+    return condiciones, periodo
+
+
+if __name__ == "__main__":
+    analizar_generador("Generador de vehículos", **PARAMETROS_VEHICULOS)
+    analizar_generador("Generador de reportes", **PARAMETROS_REPORTES)
+
+    m = modulo_para_valores(1_000_000)
+    print(f"\nMejores pares (a, c) con periodo completo para m={m}:")
+    for candidato in buscar_parametros(m, cantidad=5, potencia_minima=5):
+        print(f"  a={candidato['a']:<10} c={candidato['c']:<10} potencia={candidato['potencia']:<3} "
+              f"espectral={candidato['espectral']:.3f} "
+              f"correlación≈{candidato['correlacion']:.2e}")
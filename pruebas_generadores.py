@@ -1,17 +1,21 @@
 # Validación estadística de los generadores mixtos
 
-from generadores import GeneradorMixto, prueba_frecuencia, prueba_distancia
+from generadores import GeneradorMixto, pruebas_en_flujo
 from registro_resultados import guardar_resultados
-import matplotlib.pyplot as plt
 
 
-def validar_generador(nombre, a, c, m, x0):
-    """Ejecuta las pruebas estadísticas de un generador y muestra los resultados."""
+def validar_generador(nombre, a, c, m, x0, total=None, num_procesos=1):
+    """
+    Ejecuta las pruebas estadísticas de un generador y muestra los resultados.
+    total: cantidad de valores a probar (por defecto m//2). Los valores se consumen
+           en bloques con memoria constante, por lo que sirve para módulos grandes.
+    """
     generador = GeneradorMixto(a, c, m, x0)
-    valores = [generador.aleatorio() for _ in range(m//2)]
+    total = total or m // 2
 
-    chi_cuadrado, frecuencias_observadas = prueba_frecuencia(valores)
-    promedio, esperado, diferencia = prueba_distancia(valores)
+    frecuencia, distancia = pruebas_en_flujo(generador, total, num_procesos=num_procesos)
+    chi_cuadrado, frecuencias_observadas = frecuencia.resultado()
+    promedio, esperado, diferencia = distancia.resultado()
     estado = "Aprobada" if diferencia < 0.02 else "Posible desviación"
     parametros = {"a": a, "c": c, "m": m, "x0": x0}
 
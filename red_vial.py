@@ -0,0 +1,238 @@
+# ============================================================
+# red_vial.py
+# Modelo de viaje por red vial con tabla precalculada de distancias más cortas
+# ============================================================
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from geometria import A1, A2, A3, CO, EP1, EP2, MAPA_LIMITES, RUTAS
+
+# Versión del formato de la caché en disco (cambiarla invalida las tablas guardadas)
+VERSION_CACHE = 1
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_red_vial")
+
+# Destinos fijos con distancias precalculadas
+DESTINOS = {"EP1": EP1["coordenadas"], "EP2": EP2["coordenadas"], "CAI": CO["coordenadas"]}
+
+# Vecindad de 8 celdas (desplazamiento de columna, desplazamiento de fila)
+_VECINOS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def _distancia_a_segmento(px, py, a, b):
+    """Distancia de los puntos (px, py) al segmento a-b (vectorizada)."""
+    (ax, ay), (bx, by) = a, b
+    dx, dy = bx - ax, by - ay
+    largo2 = dx * dx + dy * dy
+    t = np.zeros_like(px) if largo2 == 0 else np.clip(((px - ax) * dx + (py - ay) * dy) / largo2, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def corredores(rutas=RUTAS, destinos=DESTINOS):
+    """
+    Segmentos transitables: los tramos de cada ruta de patrulla (incluido el regreso
+    del último waypoint al primero, que los vehículos también recorren) y un acceso
+    desde cada destino fijo al waypoint más cercano.
+    """
+    segmentos = []
+    puntos = []
+    for ruta in rutas.values():
+        p = ruta["puntos_clave"]
+        puntos.extend(p)
+        segmentos.extend((p[i], p[(i + 1) % len(p)]) for i in range(len(p)))
+    for destino in destinos.values():
+        cercano = min(puntos, key=lambda q: math.hypot(q[0] - destino[0], q[1] - destino[1]))
+        segmentos.append((destino, cercano))
+    return segmentos
+
+
+class RedVial:
+    """
+    Red vial sobre una rejilla de celdas: son transitables las celdas cuyo centro
+    está dentro de A1, A2 o A3, o a menos de media diagonal de un corredor (ver
+    corredores()). Las celdas transitables vecinas (8 direcciones) se conectan con
+    aristas de longitud igual a la distancia entre sus centros.
+
+    Al construirla se calculan las distancias más cortas entre todos los pares de
+    celdas transitables (Floyd–Warshall vectorizado) y se guardan en una tabla
+    densa. Cada celda del mapa, transitable o no, apunta a la celda transitable más
+    cercana, de modo que una consulta de distancia es O(1):
+
+        max(|p − q|, acceso(p) + D[c_p, c_q] + acceso(q))
+
+    donde acceso es la distancia al centro de c_p solo si p está fuera de la red.
+    Nunca es menor que la distancia en línea recta (sirve de cota para el índice
+    espacial). Los puntos en la misma celda usan la línea recta.
+
+    Parámetros:
+        tam_celda (float): Lado de cada celda en km.
+        limites (dict): Límites del mapa.
+    """
+
+    def __init__(self, tam_celda=2.5, limites=MAPA_LIMITES, _tablas=None):
+        self.tam_celda = float(tam_celda)
+        self.x_min = limites["x_min"]
+        self.y_min = limites["y_min"]
+        self.columnas = max(1, math.ceil((limites["x_max"] - limites["x_min"]) / self.tam_celda))
+        self.filas = max(1, math.ceil((limites["y_max"] - limites["y_min"]) / self.tam_celda))
+
+        tablas = _tablas if _tablas is not None else self._construir()
+        self.transitable = tablas["transitable"]    # (celdas,) bool
+        self.nodo = tablas["nodo"]                  # (celdas,) celda → nodo transitable más cercano
+        self.centro_x = tablas["centro_x"]          # (nodos,) centro de cada nodo
+        self.centro_y = tablas["centro_y"]
+        self.distancias = tablas["distancias"]      # (nodos, nodos) distancias más cortas
+
+    # ---------- Construcción ----------
+
+    def _centros(self):
+        columnas, filas = np.meshgrid(np.arange(self.columnas), np.arange(self.filas))
+        xs = self.x_min + (columnas.ravel() + 0.5) * self.tam_celda
+        ys = self.y_min + (filas.ravel() + 0.5) * self.tam_celda
+        return xs, ys
+
+    def _construir(self):
+        xs, ys = self._centros()
+
+        transitable = A1.contiene_lote(xs, ys) | A2.contiene_lote(xs, ys) | A3.contiene_lote(xs, ys)
+        radio = self.tam_celda * math.sqrt(2) / 2
+        for a, b in corredores():
+            transitable |= _distancia_a_segmento(xs, ys, a, b) <= radio
+        for x, y in DESTINOS.values():
+            transitable[self._celda(x, y)] = True
+
+        celdas = np.flatnonzero(transitable)
+        nodo_de_celda = np.full(len(xs), -1, dtype=np.int64)
+        nodo_de_celda[celdas] = np.arange(len(celdas))
+
+        # Aristas entre celdas transitables vecinas
+        n = len(celdas)
+        distancias = np.full((n, n), np.inf)
+        np.fill_diagonal(distancias, 0.0)
+        columna, fila = celdas % self.columnas, celdas // self.columnas
+        for dc, df in _VECINOS:
+            c2, f2 = columna + dc, fila + df
+            validos = (c2 >= 0) & (c2 < self.columnas) & (f2 >= 0) & (f2 < self.filas)
+            origen = np.flatnonzero(validos)
+            destino = nodo_de_celda[f2[validos] * self.columnas + c2[validos]]
+            conectados = destino >= 0
+            origen, destino = origen[conectados], destino[conectados]
+            largo = self.tam_celda * math.hypot(dc, df)
+            distancias[origen, destino] = largo
+            distancias[destino, origen] = largo
+
+        # Floyd–Warshall: una actualización vectorizada n × n por nodo intermedio
+        for k in range(n):
+            np.minimum(distancias, distancias[:, k, None] + distancias[None, k, :], out=distancias)
+
+        # Cada celda apunta al nodo transitable más cercano (por centro)
+        cx, cy = xs[celdas], ys[celdas]
+        nodo = np.empty(len(xs), dtype=np.int64)
+        for inicio in range(0, len(xs), 1024):
+            bloque = slice(inicio, inicio + 1024)
+            d2 = (xs[bloque, None] - cx[None, :]) ** 2 + (ys[bloque, None] - cy[None, :]) ** 2
+            nodo[bloque] = d2.argmin(axis=1)
+
+        return {"transitable": transitable, "nodo": nodo, "centro_x": cx, "centro_y": cy, "distancias": distancias}
+
+    # ---------- Caché en disco ----------
+
+    @staticmethod
+    def _clave_cache(tam_celda, limites):
+        """Huella de todo lo que define la red: si cambia la geometría, cambia el archivo."""
+        definicion = {
+            "version": VERSION_CACHE,
+            "tam_celda": float(tam_celda),
+            "limites": limites,
+            "areas": [(a.nombre, a.tipo, a.parametros) for a in (A1, A2, A3)],
+            "rutas": {k: v["puntos_clave"] for k, v in RUTAS.items()},
+            "destinos": DESTINOS,
+        }
+        return hashlib.sha1(json.dumps(definicion, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def cargar(cls, tam_celda=2.5, limites=MAPA_LIMITES, directorio=DIRECTORIO_CACHE):
+        """
+        Retorna la red para tam_celda, leyendo la tabla precalculada del disco si
+        existe; si no, la construye y la guarda para las próximas ejecuciones.
+        directorio=None desactiva la caché.
+        """
+        if directorio is None:
+            return cls(tam_celda, limites)
+
+        archivo = os.path.join(directorio, f"red_vial_{cls._clave_cache(tam_celda, limites)}.npz")
+        if os.path.exists(archivo):
+            with np.load(archivo) as datos:
+                return cls(tam_celda, limites, _tablas={clave: datos[clave] for clave in datos.files})
+
+        red = cls(tam_celda, limites)
+        os.makedirs(directorio, exist_ok=True)
+        temporal = f"{archivo}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            np.savez(f, transitable=red.transitable, nodo=red.nodo, centro_x=red.centro_x,
+                     centro_y=red.centro_y, distancias=red.distancias)
+        os.replace(temporal, archivo)  # escritura atómica: varios procesos pueden construirla a la vez
+        return red
+
+    # ---------- Consultas ----------
+
+    def _celda(self, x, y):
+        """Celda (índice lineal) que contiene el punto; los puntos fuera del mapa van al borde."""
+        columna = min(max(int((x - self.x_min) // self.tam_celda), 0), self.columnas - 1)
+        fila = min(max(int((y - self.y_min) // self.tam_celda), 0), self.filas - 1)
+        return fila * self.columnas + columna
+
+    def distancia(self, x0, y0, x1, y1):
+        """Distancia por la red entre dos puntos (O(1): dos celdas y una lectura de la tabla)."""
+        celda_a, celda_b = self._celda(x0, y0), self._celda(x1, y1)
+        a, b = self.nodo[celda_a], self.nodo[celda_b]
+        recta = math.hypot(x1 - x0, y1 - y0)
+        d = float(self.distancias[a, b])
+        if a == b or d == math.inf:
+            return recta
+        if not self.transitable[celda_a]:
+            d += math.hypot(x0 - self.centro_x[a], y0 - self.centro_y[a])
+        if not self.transitable[celda_b]:
+            d += math.hypot(x1 - self.centro_x[b], y1 - self.centro_y[b])
+        return max(recta, d)
+
+    def distancia_a(self, nombre, x, y):
+        """Distancia por la red desde (x, y) hasta un destino fijo ("EP1", "EP2" o "CAI")."""
+        return self.distancia(x, y, *DESTINOS[nombre])
+
+    def eta(self, x0, y0, x1, y1, velocidad):
+        """Tiempo de viaje por la red a la velocidad dada (infinito si la velocidad es 0)."""
+        if velocidad <= 0:
+            return math.inf
+        return self.distancia(x0, y0, x1, y1) / velocidad
+
+    def distancia_lote(self, xs, ys, x, y):
+        """Distancias por la red desde varios puntos (arreglos) hasta (x, y)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        columnas = np.clip(((xs - self.x_min) // self.tam_celda).astype(np.int64), 0, self.columnas - 1)
+        filas = np.clip(((ys - self.y_min) // self.tam_celda).astype(np.int64), 0, self.filas - 1)
+        celdas = filas * self.columnas + columnas
+        celda_b = self._celda(x, y)
+        a, b = self.nodo[celdas], self.nodo[celda_b]
+
+        recta = np.hypot(xs - x, ys - y)
+        d = self.distancias[a, b]
+        red = d + np.where(self.transitable[celdas], 0.0, np.hypot(xs - self.centro_x[a], ys - self.centro_y[a]))
+        if not self.transitable[celda_b]:
+            red = red + math.hypot(x - self.centro_x[b], y - self.centro_y[b])
+        return np.where((a == b) | np.isinf(d), recta, np.maximum(recta, red))
+
+
+if __name__ == "__main__":
+    red = RedVial.cargar()
+    print(f"Rejilla {red.columnas} × {red.filas}, {int(red.transitable.sum())} celdas transitables")
+    for nombre, (x, y) in (("A1", (32.5, 70.0)), ("A2", (32.5, 0.0)), ("A3", (30.0, 40.0))):
+        print(f"{nombre} ({x}, {y}): " + ", ".join(
+            f"{destino} {red.distancia_a(destino, x, y):.1f} km (recta "
+            f"{math.hypot(x - DESTINOS[destino][0], y - DESTINOS[destino][1]):.1f})"
+            for destino in DESTINOS))
@@ -0,0 +1,225 @@
+# ============================================================
+# registro_eventos.py
+# Sumideros de eventos: consola, texto en búfer, traza binaria o nulo
+# ============================================================
+
+import struct
+from abc import ABC, abstractmethod
+
+# Niveles de detalle de los eventos
+DEBUG = 10       # Movimientos de patrulla (uno por vehículo y tick)
+INFO = 20        # Incidentes, llegadas, contactos y traslados
+ALERTA = 30      # Incidentes sin vehículos disponibles
+
+
+def _formato_inicio(duracion, intervalo, lmbda, x_min, x_max, y_min, y_max):
+    return "\n".join([
+        "=" * 70,
+        "INICIO DE SIMULACIÓN - SISTEMA DE SEGURIDAD UBER",
+        "=" * 70,
+        f"Duración: {duracion} unidades de tiempo",
+        f"Intervalo: {intervalo}",
+        f"Tasa de incidentes (λ): {lmbda} por unidad de tiempo",
+        f"Incidentes esperados: ~{int(lmbda * duracion)}",
+        f"Límites del mapa: X ∈ [{x_min}, {x_max}], Y ∈ [{y_min}, {y_max}]",
+        "=" * 70 + "\n"
+    ])
+
+
+def _formato_contacto(vehiculo, exitoso):
+    if exitoso:
+        return "Contacto exitoso. Iniciando traslado al punto de evacuación correspondiente."
+    return "Contacto fallido. Usuario no encontrado. Retornando a ruta de patrulla."
+
+
+# Catálogo de eventos: tipo → (código binario, nivel, campos, formato de texto)
+# Campos: 's' = texto, 'd' = real, 'i' = entero, '?' = booleano
+TIPOS_EVENTO = {
+    "SIM_INICIO": (1, INFO, "ddddddd", _formato_inicio),
+    "SIM_FIN": (2, INFO, "", lambda: "\n" + "=" * 70 + "\nFIN DE SIMULACIÓN\n "),
+    "EV_INCIDENTE": (3, INFO, "sdd", lambda zona, x, y:
+                     f"[EV_INCIDENTE] Generado en {zona:<3} | Coordenadas: ({x:.2f}, {y:.2f})"),
+    "EV_LLEGADA_VEHICULO": (4, INFO, "ss", lambda vehiculo, zona:
+                            f"[EV_LLEGADA_VEHICULO] {vehiculo} llegó al incidente en zona {zona}."),
+    "EV_CONTACTO": (5, INFO, "s?", _formato_contacto),
+    "EV_FIN_TRASLADO_EP": (6, INFO, "ss", lambda vehiculo, estacion:
+                           f"[EV_FIN_TRASLADO_EP] {vehiculo} completó traslado hacia {estacion}."),
+    "EV_TICK_PATRULLA": (7, DEBUG, "sddd", lambda vehiculo, x, y, velocidad:
+                         f"[EV_TICK_PATRULLA] {vehiculo:<12} | Pos: ({x:5.1f}, {y:5.1f}) | "
+                         f"Vel: {velocidad:.1f} km/tick"),
+    "EV_TICK_RUTA": (8, DEBUG, "sddiddd", lambda vehiculo, x, y, waypoint, destino_x, destino_y, distancia:
+                     f"[EV_TICK_PATRULLA] {vehiculo:<12} | Pos: ({x:5.1f}, {y:5.1f}) | "
+                     f"→ Waypoint {waypoint}: ({destino_x}, {destino_y}) | Dist: {distancia:.1f} km"),
+    "EV_WAYPOINT": (9, DEBUG, "si", lambda vehiculo, waypoint:
+                    f"[EV_TICK_PATRULLA] {vehiculo} alcanzó waypoint {waypoint}"),
+    "ALERTA": (10, ALERTA, "s", lambda zona:
+               f"[ALERTA] No hay vehículos disponibles para el incidente en {zona}"),
+}
+
+
+def formatear(tipo, campos):
+    """Convierte un evento en la línea de texto que se muestra en consola."""
+    return TIPOS_EVENTO[tipo][3](*campos)
+
+
+class SumideroEventos(ABC):
+    """
+    Destino de los eventos de la simulación (clase abstracta: cada sumidero
+    implementa emitir).
+
+    Los productores consultan 'activos' antes de emitir, de modo que un evento
+    filtrado no construye sus campos ni formatea texto:
+
+        if "EV_INCIDENTE" in sumidero.activos:
+            sumidero.emitir("EV_INCIDENTE", zona, x, y)
+
+    Parámetros:
+        nivel (int): Nivel mínimo de los eventos que se registran.
+        niveles_tipo (dict): Nivel mínimo por tipo de evento, que reemplaza al general.
+    """
+
+    def __init__(self, nivel=INFO, niveles_tipo=None):
+        self.tiempo = 0.0
+        niveles_tipo = niveles_tipo or {}
+        self.activos = frozenset(
+            tipo for tipo, (_, nivel_tipo, _, _) in TIPOS_EVENTO.items()
+            if nivel_tipo >= niveles_tipo.get(tipo, nivel)
+        )
+
+    @abstractmethod
+    def emitir(self, tipo, *campos):
+        """Registra un evento con sus campos en el orden del catálogo."""
+
+    def cerrar(self):
+        """Vacía los búferes pendientes."""
+
+
+class SumideroNulo(SumideroEventos):
+    """Descarta todos los eventos: 'activos' está vacío y nunca se formatea nada."""
+
+    def __init__(self):
+        self.tiempo = 0.0
+        self.activos = frozenset()
+
+    def emitir(self, tipo, *campos):
+        pass
+
+
+class SumideroConsola(SumideroEventos):
+    """Imprime cada evento en consola (narrativa original de la simulación)."""
+
+    def __init__(self, nivel=DEBUG, niveles_tipo=None):
+        super().__init__(nivel, niveles_tipo)
+
+    def emitir(self, tipo, *campos):
+        print(TIPOS_EVENTO[tipo][3](*campos))
+
+
+class SumideroTexto(SumideroEventos):
+    """
+    Acumula las líneas de texto en memoria y las escribe en 'archivo' por bloques
+    de tam_buffer líneas. Sin archivo, las líneas quedan disponibles en 'lineas'.
+    """
+
+    def __init__(self, archivo=None, nivel=INFO, niveles_tipo=None, tam_buffer=10000):
+        super().__init__(nivel, niveles_tipo)
+        self.archivo = archivo
+        self.tam_buffer = tam_buffer
+        self.lineas = []
+        if archivo:
+            open(archivo, "w", encoding="utf-8").close()
+
+    def emitir(self, tipo, *campos):
+        self.lineas.append(TIPOS_EVENTO[tipo][3](*campos))
+        if self.archivo and len(self.lineas) >= self.tam_buffer:
+            self.cerrar()
+
+    def cerrar(self):
+        if self.archivo and self.lineas:
+            with open(self.archivo, "a", encoding="utf-8") as f:
+                f.write("\n".join(self.lineas) + "\n")
+            self.lineas = []
+
+
+# Registro binario: código (B) + tiempo (d) + campos. El código 0 define un texto
+# nuevo de la tabla de cadenas: identificador (H) + longitud (H) + bytes UTF-8.
+_FORMATO_CAMPO = {"s": "H", "d": "d", "i": "i", "?": "?"}
+_ESTRUCTURAS = {
+    tipo: struct.Struct("<Bd" + "".join(_FORMATO_CAMPO[c] for c in campos))
+    for tipo, (_, _, campos, _) in TIPOS_EVENTO.items()
+}
+_CADENA = struct.Struct("<BHH")
+
+
+class SumideroBinario(SumideroEventos):
+    """
+    Escribe una traza binaria compacta con registros tipados de tamaño fijo.
+    Los textos (nombres de vehículos, zonas, estaciones) se guardan una sola vez
+    en una tabla de cadenas y los registros solo llevan su identificador.
+    La traza se lee con leer_traza.
+    """
+
+    def __init__(self, archivo=None, nivel=DEBUG, niveles_tipo=None, tam_buffer=1 << 20):
+        super().__init__(nivel, niveles_tipo)
+        self.archivo = archivo
+        self.tam_buffer = tam_buffer
+        self.datos = bytearray()
+        self._cadenas = {}
+        if archivo:
+            open(archivo, "wb").close()
+
+    def _id_cadena(self, texto):
+        identificador = self._cadenas.get(texto)
+        if identificador is None:
+            identificador = self._cadenas[texto] = len(self._cadenas)
+            codificado = texto.encode("utf-8")
+            self.datos += _CADENA.pack(0, identificador, len(codificado)) + codificado
+        return identificador
+
+    def emitir(self, tipo, *campos):
+        codigo, _, formato, _ = TIPOS_EVENTO[tipo]
+        valores = [self._id_cadena(v) if f == "s" else v for f, v in zip(formato, campos)]
+        self.datos += _ESTRUCTURAS[tipo].pack(codigo, self.tiempo, *valores)
+        if self.archivo and len(self.datos) >= self.tam_buffer:
+            self.cerrar()
+
+    def cerrar(self):
+        if self.archivo and self.datos:
+            with open(self.archivo, "ab") as f:
+                f.write(self.datos)
+            self.datos = bytearray()
+
+
+def leer_traza(origen):
+    """
+    Decodifica una traza binaria (bytes o ruta de archivo).
+    Retorna: lista de tuplas (tipo, tiempo, campos)
+    """
+    if isinstance(origen, (bytes, bytearray)):
+        datos = bytes(origen)
+    else:
+        with open(origen, "rb") as f:
+            datos = f.read()
+
+    tipos_por_codigo = {codigo: tipo for tipo, (codigo, _, _, _) in TIPOS_EVENTO.items()}
+    cadenas = {}
+    eventos = []
+    posicion = 0
+    while posicion < len(datos):
+        codigo = datos[posicion]
+        if codigo == 0:
+            _, identificador, longitud = _CADENA.unpack_from(datos, posicion)
+            posicion += _CADENA.size
+            cadenas[identificador] = datos[posicion:posicion + longitud].decode("utf-8")
+            posicion += longitud
+            continue
+
+        tipo = tipos_por_codigo[codigo]
+        estructura = _ESTRUCTURAS[tipo]
+        _, tiempo, *valores = estructura.unpack_from(datos, posicion)
+        posicion += estructura.size
+        formato = TIPOS_EVENTO[tipo][2]
+        campos = tuple(cadenas[v] if f == "s" else v for f, v in zip(formato, valores))
+        eventos.append((tipo, tiempo, campos))
+
+    return eventos
@@ -16,7 +16,8 @@ def guardar_resultados(
     esperado,
     diferencia,
     estado,
-    archivo="resultados_generadores.csv"
+    archivo="resultados_generadores.csv",
+    pruebas_adicionales=None
 ):
     """
     Guarda los resultados de una prueba de generador mixto en un archivo CSV.
@@ -31,7 +32,12 @@ def guardar_resultados(
         diferencia (float): Diferencia absoluta entre promedio y esperado.
         estado (str): Resultado de la prueba ('Aprobada' o 'Posible desviación').
         archivo (str): Nombre del archivo CSV donde se almacenarán los resultados.
+        pruebas_adicionales (dict): Columnas extra {nombre: valor} (por ejemplo, los
+            valores p de la batería de pruebas), agregadas al final de la fila.
+
+    Lanza ValueError si el archivo ya existe con otro encabezado.
     """
+    pruebas_adicionales = pruebas_adicionales or {}
 
     encabezados = [
         "Fecha",
@@ -46,7 +52,7 @@ def guardar_resultados(
         "Distancia Esperada",
         "Diferencia",
         "Estado"
-    ]
+    ] + list(pruebas_adicionales)
 
     fila = [
         datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -61,13 +67,22 @@ def guardar_resultados(
         round(esperado, 4),
         round(diferencia, 4),
         estado
-    ]
+    ] + [round(v, 4) if isinstance(v, float) else v for v in pruebas_adicionales.values()]
 
     try:
-        with open(archivo, mode="a", newline="", encoding="utf-8") as f:
+        with open(archivo, mode="a+", newline="", encoding="utf-8") as f:
+            # Un archivo existente debe tener las mismas columnas: si no, la fila
+            # quedaría desalineada con el encabezado (por ejemplo, otras pruebas_adicionales)
+            f.seek(0)
+            existentes = next(csv.reader(f), None)
+            if existentes is not None and existentes != encabezados:
+                raise ValueError(
+                    f"El archivo {archivo} tiene las columnas {existentes} y la prueba produce "
+                    f"{encabezados}; use otro archivo para estas pruebas"
+                )
             writer = csv.writer(f)
-            if f.tell() == 0:
+            if existentes is None:
                 writer.writerow(encabezados)
             writer.writerow(fila)
-    except Exception as e:
+    except OSError as e:
         print(f"Error al guardar los resultados: {e}")
@@ -0,0 +1,248 @@
+# ============================================================
+# replicas.py
+# Ejecución de réplicas independientes de la simulación en paralelo
+# ============================================================
+
+import numbers
+import os
+import warnings
+
+from estadisticas import intervalo_confianza
+from generadores import GeneradorMixto, parametros_subflujos
+from metricas_flujo import PERCENTILES, MetricasFlujo
+from registro_eventos import SumideroNulo
+from simulacion import CONTADORES_VEHICULO, Simulacion
+
+
+# Redes viales y registros de zonas ya cargados en este proceso
+_RECURSOS = {}
+
+
+def cargar_recursos(parametros):
+    """
+    Reemplaza en los argumentos de Simulacion las referencias a recursos pesados por
+    los objetos, cargados una sola vez por proceso: red_vial = True o tamaño de celda
+    (km) y zonas = True o ruta de un archivo de zonas. Así las tareas enviadas a los
+    procesos de trabajo llevan solo la referencia y no el objeto.
+
+    Retorna: copia de los argumentos con los recursos cargados
+    """
+    parametros = dict(parametros)
+    red = parametros.get("red_vial")
+    if red is True or (isinstance(red, numbers.Real) and red is not False):
+        tam_celda = 2.5 if red is True else float(red)
+        if ("red_vial", tam_celda) not in _RECURSOS:
+            from red_vial import RedVial
+            _RECURSOS["red_vial", tam_celda] = RedVial.cargar(tam_celda)
+        parametros["red_vial"] = _RECURSOS["red_vial", tam_celda]
+
+    zonas = parametros.get("zonas")
+    if zonas is True or isinstance(zonas, str):
+        from zonas import ARCHIVO_ZONAS, RegistroZonas
+        ruta = ARCHIVO_ZONAS if zonas is True else zonas
+        if ("zonas", ruta) not in _RECURSOS:
+            _RECURSOS["zonas", ruta] = RegistroZonas.cargar(ruta)
+        parametros["zonas"] = _RECURSOS["zonas", ruta]
+    return parametros
+
+
+def ejecutar_replica(indice, num_replicas, parametros=None, parametros_generadores=None, modo="ticks"):
+    """
+    Ejecuta una réplica de la simulación sin salida en consola.
+
+    Parámetros:
+        indice (int): Número de la réplica (define su subflujo de números aleatorios).
+        num_replicas (int): Total de réplicas en que se reparte el periodo de los generadores.
+        parametros (dict): Argumentos para el constructor de Simulacion (la red vial y
+            las zonas pueden indicarse por referencia, ver cargar_recursos).
+        parametros_generadores (dict): Parámetros opcionales {"vehiculos": {...}, "reportes": {...},
+            "valores_por_replica": n}.
+        modo (str): Motor de la simulación ("ticks" o "eventos").
+
+    Si algún generador consume más valores que la longitud de su subflujo, la réplica
+    invade la siguiente y se emite un RuntimeWarning.
+
+    Retorna: diccionario con el índice, las semillas iniciales de sus subflujos, las
+             métricas globales, las métricas en flujo exportadas, los contadores por
+             vehículo y, si la simulación los lleva, los mapas de calor exportados
+    """
+    parametros = parametros or {}
+    parametros_generadores = parametros_generadores or {}
+    subflujos = parametros_subflujos(
+        num_replicas,
+        parametros_vehiculos=parametros_generadores.get("vehiculos"),
+        parametros_reportes=parametros_generadores.get("reportes"),
+        valores_por_replica=parametros_generadores.get("valores_por_replica")
+    )
+    generadores = {
+        nombre: GeneradorMixto(**raiz).subflujo(indice, longitud)
+        for nombre, (raiz, longitud) in subflujos.items()
+    }
+    semillas = {nombre: generador.x for nombre, generador in generadores.items()}
+    simulacion = Simulacion(generadores=generadores, sumidero=SumideroNulo(), **cargar_recursos(parametros))
+    simulacion.ejecutar(mostrar=False, modo=modo)
+
+    if num_replicas > 1:
+        for nombre, generador in generadores.items():
+            longitud = subflujos[nombre][1]
+            consumidos = generador.distancia_desde(semillas[nombre], limite=longitud)
+            if consumidos is None or consumidos > longitud:
+                warnings.warn(
+                    f"La réplica {indice} consumió más de {longitud} valores del generador de {nombre} "
+                    "e invadió el subflujo de la réplica siguiente; aumente valores_por_replica",
+                    RuntimeWarning
+                )
+
+    resultado = {
+        "replica": indice,
+        "semillas": semillas,
+        "metricas": dict(simulacion.metricas),
+        "flujo": simulacion.flujo.exportar(),
+        "vehiculos": {
+            v.nombre: {campo: getattr(v, campo) for campo in CONTADORES_VEHICULO}
+            for v in simulacion.vehiculos
+        }
+    }
+    if simulacion.mapas is not None:
+        resultado["mapas"] = simulacion.mapas.exportar()
+    return resultado
+
+
+def validar_replicas(num_replicas, parametros_generadores=None):
+    """
+    Verifica, antes de lanzar las réplicas, que num_replicas × (valores por réplica)
+    quepan en el periodo de los generadores. Lanza ValueError si no caben.
+    """
+    parametros_generadores = parametros_generadores or {}
+    parametros_subflujos(
+        num_replicas,
+        parametros_vehiculos=parametros_generadores.get("vehiculos"),
+        parametros_reportes=parametros_generadores.get("reportes"),
+        valores_por_replica=parametros_generadores.get("valores_por_replica")
+    )
+
+
+def _ejecutar_tarea(tarea):
+    """Adaptador de una tupla de argumentos para ProcessPoolExecutor.map."""
+    return ejecutar_replica(*tarea)
+
+
+def ejecutar_replicas_resultados(num_replicas, parametros=None, num_procesos=None, parametros_generadores=None,
+                                 modo="ticks"):
+    """
+    Ejecuta num_replicas réplicas independientes de un escenario y retorna sus
+    resultados sin resumir.
+
+    Cada réplica usa un subflujo disjunto de los generadores, por lo que el resultado
+    es reproducible e independiente del número de procesos. Con varias réplicas los
+    subflujos salen de un generador de módulo 2^k dimensionado para num_replicas ×
+    (valores por réplica); si se indican generadores explícitos y su periodo no
+    alcanza, se lanza ValueError antes de ejecutar ninguna réplica.
+
+    Parámetros:
+        num_replicas (int): Número de réplicas a ejecutar.
+        parametros (dict): Argumentos para el constructor de Simulacion.
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles, 1 = en serie).
+        parametros_generadores (dict): Parámetros opcionales de los generadores.
+        modo (str): Motor de la simulación ("ticks" o "eventos").
+
+    Retorna: lista de resultados de ejecutar_replica, en el orden de las réplicas
+    """
+    validar_replicas(num_replicas, parametros_generadores)
+    tareas = [(i, num_replicas, parametros, parametros_generadores, modo) for i in range(num_replicas)]
+
+    if num_procesos == 1 or num_replicas == 1:
+        return [_ejecutar_tarea(tarea) for tarea in tareas]
+
+    from concurrent.futures import ProcessPoolExecutor
+    trabajadores = num_procesos or os.cpu_count() or 1
+    # Lotes de varias réplicas por envío para amortizar la comunicación entre procesos
+    tam_lote = max(1, num_replicas // (trabajadores * 4))
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return list(ejecutor.map(_ejecutar_tarea, tareas, chunksize=tam_lote))
+
+
+def ejecutar_replicas(num_replicas, parametros=None, num_procesos=None, nivel_confianza=0.95,
+                      parametros_generadores=None, modo="ticks"):
+    """
+    Ejecuta num_replicas réplicas independientes de un escenario (ver
+    ejecutar_replicas_resultados) y resume sus resultados.
+
+    Parámetros:
+        num_replicas (int): Número de réplicas a ejecutar.
+        parametros (dict): Argumentos para el constructor de Simulacion.
+        num_procesos (int): Procesos de trabajo (None = núcleos disponibles, 1 = en serie).
+        nivel_confianza (float): Nivel de los intervalos de confianza t.
+        parametros_generadores (dict): Parámetros opcionales de los generadores.
+        modo (str): Motor de la simulación ("ticks" o "eventos").
+
+    Retorna: resumen producido por resumir_replicas
+    """
+    resultados = ejecutar_replicas_resultados(num_replicas, parametros, num_procesos, parametros_generadores, modo)
+    return resumir_replicas(resultados, nivel_confianza)
+
+
+def resumir_replicas(resultados, nivel_confianza=0.95):
+    """
+    Calcula media, desviación estándar e intervalo de confianza t de cada métrica
+    global y de cada contador por vehículo sobre un conjunto de réplicas. Las
+    métricas en flujo de todas las réplicas se combinan en una sola distribución
+    (percentiles sobre todos los incidentes).
+    """
+    metricas = {
+        clave: intervalo_confianza([r["metricas"][clave] for r in resultados], nivel_confianza)
+        for clave in resultados[0]["metricas"]
+    }
+    vehiculos = {
+        nombre: {
+            campo: intervalo_confianza([r["vehiculos"][nombre][campo] for r in resultados], nivel_confianza)
+            for campo in CONTADORES_VEHICULO
+        }
+        for nombre in resultados[0]["vehiculos"]
+    }
+
+    flujo = None
+    if all("flujo" in r for r in resultados):
+        flujo = MetricasFlujo.combinar_exportadas(r["flujo"] for r in resultados).resumen()
+
+    return {
+        "replicas": len(resultados),
+        "nivel_confianza": nivel_confianza,
+        "metricas": metricas,
+        "flujo": flujo,
+        "vehiculos": vehiculos
+    }
+
+
+def mostrar_resumen(resumen):
+    """Imprime el resumen de réplicas con sus intervalos de confianza."""
+    nivel = resumen["nivel_confianza"] * 100
+
+    print(" ")
+    print(f"RESUMEN DE {resumen['replicas']} RÉPLICAS (IC {nivel:.0f}%)")
+    print(" ")
+    print(f"   {'Métrica':<25} {'Media':>10} {'Desv.':>10} {'IC inferior':>12} {'IC superior':>12}")
+    print(f"   {'-'*72}")
+    for clave, r in resumen["metricas"].items():
+        print(f"   {clave:<25} {r['media']:>10.2f} {r['desviacion']:>10.2f} {r['ic_inferior']:>12.2f} {r['ic_superior']:>12.2f}")
+
+    if resumen.get("flujo"):
+        print(f"\n   {'Por incidente':<25} {'n':>8} {'Media':>10}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES))
+        for nombre, r in resumen["flujo"].items():
+            print(f"   {nombre:<25} {r['n']:>8} {r['media']:>10.2f}" + "".join(f"{r[f'p{p}']:>10.2f}" for p in PERCENTILES))
+
+    for nombre, contadores in resumen["vehiculos"].items():
+        print(f"\n   {nombre}")
+        for campo, r in contadores.items():
+            print(f"   {campo:<25} {r['media']:>10.2f} {r['desviacion']:>10.2f} {r['ic_inferior']:>12.2f} {r['ic_superior']:>12.2f}")
+
+    print(" ")
+
+
+if __name__ == "__main__":
+    resumen = ejecutar_replicas(
+        num_replicas=10,
+        parametros={"duracion_simulacion": 100, "intervalo": 1.0},
+        num_procesos=None
+    )
+    mostrar_resumen(resumen)
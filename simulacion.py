@@ -1,37 +1,126 @@
 # simulacion.py
+import heapq
 import math
 import time
-from eventos import evento_incidente, evento_llegada_vehiculo, evento_tick_patrulla, evento_tick_patrulla_con_rutas
-from generadores import gen_reportes
-from geometria import EP1, EP2, MAPA_LIMITES
+from time import perf_counter_ns
+
+import numpy as np
+
+from calendario import CalendarioEventos, INCIDENTE, LLEGADA, FIN_TRASLADO, WAYPOINT
+from eventos import (evento_incidente, evento_llegada_vehiculo, evento_fin_traslado_ep, evento_tick_patrulla_flota,
+                     estacion_destino)
+from flota import CODIGO_ESTADO, ESTADOS, SIN_RUTA, Flota
+from generadores import GeneradorMixto, crear_generadores
+from indice_espacial import IndiceEspacial, tam_celda_sugerido
+from mapas_calor import ZONAS_ORIGINALES, MapasCalor
+from metricas_flujo import PERCENTILES, MetricasFlujo
+from patrulla import PatrullaArco
+from pendientes import ColaPendientes
+from perfilado import Perfilador, SumideroMedido
+from geometria import MAPA_LIMITES, RUTAS
+from registro_eventos import SumideroConsola
+
+# Posiciones iniciales por defecto: dos vehículos en el suroccidente y uno en el CAI.
+# Si la flota es más grande, las posiciones se repiten cíclicamente.
+POSICIONES_INICIALES = [(5.0, 10.0), (5.0, 10.0), (32.5, 30.0)]
+
+# Formato de las instantáneas de Simulacion.capturar()
+VERSION_INSTANTANEA = 1
+CAMPOS_FLOTA = ("x", "y", "velocidad", "estado", "waypoint", "ruta")
+# Contadores por vehículo (instantáneas, réplicas y almacén de resultados)
+CONTADORES_VEHICULO = ("incidentes_atendidos", "incidentes_fallidos", "distancia_total", "reportes_asignados",
+                       "tiempo_servicio")
 
 
 class Vehiculo:
-    """Representa un vehículo de respuesta o patrulla."""
-    def __init__(self, nombre, x, y, velocidad=2.0):
+    """
+    Representa un vehículo de respuesta o patrulla.
+    Su posición, velocidad, estado, waypoint y ruta viven en los arreglos de una
+    Flota; el objeto es una vista sobre la fila 'indice' de esos arreglos.
+    """
+    def __init__(self, nombre, x, y, velocidad=2.0, flota=None, ruta=SIN_RUTA, red_vial=None):
         """
         velocidad: unidades de distancia por unidad de tiempo del simulador (km/tick)
+        flota: Flota donde se registra el vehículo (si es None, se crea una propia)
+        ruta: índice de la ruta de patrulla en RUTAS, o SIN_RUTA
+        red_vial: RedVial para medir distancias por la red (None = línea recta)
         """
         self.nombre = nombre
-        self.x = float(x)
-        self.y = float(y)
-        self.velocidad = float(velocidad)
-        self.estado = "PATRULLANDO"      # PATRULLANDO, DESPACHADO, TRASLADANDO, DISPONIBLE
+        self.red_vial = red_vial
+        self.flota = flota if flota is not None else Flota(1)
+        self.indice = self.flota.agregar(nombre, float(x), float(y), float(velocidad), ruta)
         self.incidentes_atendidos = 0
         self.incidentes_fallidos = 0
         self.distancia_total = 0.0
         self.reportes_asignados = 0
+        self.tiempo_servicio = 0.0       # Tiempo ocupado en servicio dentro del horizonte (o carga de viaje sin cola)
+
+        # Estado de patrulla del motor por eventos
+        self.tramo = None                # (t_inicio, x0, y0, x_destino, y_destino, t_llegada)
+        self.version_tramo = 0           # Invalida waypoints programados tras un despacho
+
+    @property
+    def x(self):
+        return float(self.flota.x[self.indice])
+
+    @x.setter
+    def x(self, valor):
+        self.flota.fijar_posicion(self.indice, valor, self.flota.y[self.indice])
+
+    @property
+    def y(self):
+        return float(self.flota.y[self.indice])
+
+    @y.setter
+    def y(self, valor):
+        self.flota.fijar_posicion(self.indice, self.flota.x[self.indice], valor)
+
+    @property
+    def velocidad(self):
+        return float(self.flota.velocidad[self.indice])
+
+    @velocidad.setter
+    def velocidad(self, valor):
+        self.flota.velocidad[self.indice] = valor
+
+    @property
+    def estado(self):
+        """PATRULLANDO, DESPACHADO, TRASLADANDO o DISPONIBLE."""
+        return ESTADOS[self.flota.estado[self.indice]]
+
+    @estado.setter
+    def estado(self, valor):
+        self.flota.fijar_estado(self.indice, CODIGO_ESTADO[valor])
+
+    @property
+    def ruta(self):
+        """Índice de la ruta de patrulla asignada."""
+        return int(self.flota.ruta[self.indice])
+
+    @ruta.setter
+    def ruta(self, valor):
+        self.flota.ruta[self.indice] = valor
+
+    @property
+    def waypoint_actual(self):
+        """Índice del waypoint destino dentro de la ruta."""
+        return int(self.flota.waypoint[self.indice])
+
+    @waypoint_actual.setter
+    def waypoint_actual(self, valor):
+        self.flota.waypoint[self.indice] = valor
 
     def mover_a(self, destino_x, destino_y):
         """Mueve el vehículo al punto destino y acumula la distancia recorrida."""
-        distancia = math.hypot(self.x - destino_x, self.y - destino_y)
+        distancia = self.distancia_a(destino_x, destino_y)
         self.distancia_total += distancia
-        self.x = float(destino_x)
-        self.y = float(destino_y)
+        self.flota.fijar_posicion(self.indice, float(destino_x), float(destino_y))
         return distancia
 
     def distancia_a(self, x_objetivo, y_objetivo):
-        """Calcula la distancia euclidiana al punto objetivo."""
+        """Calcula la distancia al punto objetivo: por la red vial si hay una, si no euclidiana."""
+        if self.red_vial is not None:
+            return self.red_vial.distancia(self.x, self.y, x_objetivo, y_objetivo)
         return math.hypot(self.x - x_objetivo, self.y - y_objetivo)
 
     def eta_a(self, x_objetivo, y_objetivo):
@@ -48,7 +137,10 @@ class Vehiculo:
 class Simulacion:
     """Controla la ejecución de la simulación y computa métricas requeridas."""
     
-    def __init__(self, duracion_simulacion=100, intervalo=1.0, lambda_incidentes=0.5, pausa_visual=False):
+    def __init__(self, duracion_simulacion=100, intervalo=1.0, lambda_incidentes=0.5, pausa_visual=False,
+                 generadores=None, num_vehiculos=3, posiciones_iniciales=None, velocidad_vehiculos=2.5,
+                 sumidero=None, red_vial=None, cola_pendientes=None, perfilar=False, patrulla="pasos",
+                 zonas=None, mapas_calor=None):
         """
         Parámetros:
         -----------
@@ -60,25 +152,133 @@ class Simulacion:
             Tasa promedio de incidentes por unidad de tiempo (parámetro λ de Poisson)
         pausa_visual : bool
             Si True, añade pausa para visualización en consola
+        generadores : dict o None
+            Generadores propios de la simulación ({"vehiculos": ..., "reportes": ...}).
+            Si es None se crean nuevos con crear_generadores(), de modo que cada
+            instancia tiene su propio flujo y no comparte estado con otras.
+        num_vehiculos : int
+            Tamaño de la flota (se ignora si se indican posiciones_iniciales)
+        posiciones_iniciales : list o None
+            Lista de posiciones (x, y) iniciales, una por vehículo
+        velocidad_vehiculos : float
+            Velocidad de despacho de cada vehículo (km/tick)
+        sumidero : SumideroEventos o None
+            Destino de los eventos (ver registro_eventos). Por defecto la narrativa
+            completa en consola; SumideroNulo() ejecuta sin ninguna salida.
+        red_vial : RedVial, bool o None
+            Modelo de viaje por red vial (ver red_vial.py). True carga la red por
+            defecto (desde la caché en disco si existe); None usa la línea recta.
+        cola_pendientes : str o None
+            "antiguedad" o "severidad": los vehículos quedan ocupados durante el viaje
+            (distancia / velocidad) y los incidentes sin vehículo libre esperan en
+            una cola con esa prioridad (ver pendientes.py) en lugar de fallar.
+            "severidad" requiere zonas con severidad (ver zonas.py), porque los
+            incidentes de A1 y A2 no la tienen. None conserva el modelo original.
+        perfilar : bool
+            Si True, mide el tiempo de reloj y las llamadas de cada fase del bucle
+            (ver perfilado.py); el resultado queda en el atributo 'perfil'.
+        patrulla : str
+            "pasos" mueve la patrulla paso a paso (cada tick en el modo por ticks, cada
+            tramo entre waypoints en el modo por eventos). "arco" usa la forma cerrada
+            de patrulla.py: la posición se calcula por longitud de arco solo cuando
+            un despacho la necesita, sin eventos de patrulla.
+        zonas : RegistroZonas, str, dict, bool o None
+            Zonas de los incidentes (ver zonas.py): un registro ya compilado, la ruta
+            de un archivo de zonas, su contenido como diccionario o True para
+            zonas.json. Cada incidente cae en una zona sorteada según los pesos y se
+            traslada a la estación de destino de esa zona. None usa A1 y A2.
+        mapas_calor : MapasCalor, float, bool o None
+            Mapas de calor en línea (ver mapas_calor.py): incidentes por zona,
+            distancia de respuesta por celda y ocupación de la patrulla, muestreada
+            una vez por intervalo. True usa celdas de 1 km y un número, ese tamaño
+            de celda. El resultado queda en el atributo 'mapas'.
         """
+        if patrulla not in ("pasos", "arco"):
+            raise ValueError(f"Modelo de patrulla desconocido: {patrulla} (opciones: pasos, arco)")
         self.duracion = float(duracion_simulacion)
         self.intervalo = float(intervalo)
         self.lambda_incidentes = float(lambda_incidentes)
         self.tiempo_actual = 0.0
+        if red_vial is True:
+            from red_vial import RedVial
+            red_vial = RedVial.cargar()
+        self.red_vial = red_vial or None
+        if zonas is True or isinstance(zonas, (str, dict)):
+            from zonas import ARCHIVO_ZONAS, RegistroZonas
+            if isinstance(zonas, dict):
+                zonas = RegistroZonas(zonas)
+            else:
+                zonas = RegistroZonas.cargar(ARCHIVO_ZONAS if zonas is True else zonas)
+        self.zonas = zonas or None
+        if mapas_calor is True or (isinstance(mapas_calor, (int, float)) and not isinstance(mapas_calor, bool)):
+            mapas_calor = MapasCalor(1.0 if mapas_calor is True else mapas_calor,
+                                     zonas=self.zonas.nombres if self.zonas is not None else ZONAS_ORIGINALES)
+        self.mapas = mapas_calor or None
+
+        generadores = generadores or crear_generadores()
+        self.gen_vehiculos = generadores["vehiculos"]
+        self.gen_reportes = generadores["reportes"]
         
-        # Inicializar vehículos en posición suroccidente (según enunciado)
+        # Inicializar vehículos en posición suroccidente (según enunciado) y en el CAI
+        if posiciones_iniciales is None:
+            posiciones_iniciales = [
+                POSICIONES_INICIALES[i % len(POSICIONES_INICIALES)] for i in range(num_vehiculos)
+            ]
+        # Estado de la flota en arreglos; las rutas se asignan cíclicamente si hay
+        # más vehículos que rutas definidas
+        self.flota = Flota(
+            len(posiciones_iniciales),
+            indice=IndiceEspacial(tam_celda_sugerido(len(posiciones_iniciales)))
+        )
         self.vehiculos = [
-            Vehiculo("Vehiculo 1", x=5.0, y=10.0, velocidad=2.5),
-            Vehiculo("Vehiculo 2", x=5.0, y=10.0, velocidad=2.5),
-            Vehiculo("Vehiculo 3", x= 32.5, y= 30.0, velocidad=2.5) #Vehículo en CAI (centro)
+            Vehiculo(f"Vehiculo {i + 1}", x=x, y=y, velocidad=velocidad_vehiculos,
+                     flota=self.flota, ruta=i % len(RUTAS), red_vial=self.red_vial)
+            for i, (x, y) in enumerate(posiciones_iniciales)
         ]
         
+        # Patrulla en forma cerrada (None = patrulla paso a paso)
+        self.patrulla = PatrullaArco(self.flota, self.gen_vehiculos.x, self.intervalo) if patrulla == "arco" else None
+
         self.metricas = {
             "incidentes_totales": 0,
             "incidentes_exitosos": 0,
             "incidentes_fallidos": 0
         }
+        # Tiempos de respuesta y traslado y distancia por incidente (memoria constante)
+        self.flujo = MetricasFlujo()
         self.pausa_visual = pausa_visual
+        self.sumidero = sumidero or SumideroConsola()
+
+        # Instrumentación opcional (None = desactivada, sin costo en el bucle)
+        self.perfilador = Perfilador() if perfilar else None
+        if self.perfilador is not None:
+            self.sumidero = SumideroMedido(self.sumidero, self.perfilador)
+
+        # Cola de incidentes pendientes y liberaciones programadas (tiempo, índice) del modo por ticks
+        self.cola = ColaPendientes(cola_pendientes) if cola_pendientes else None
+        if self.cola is not None and self.cola.prioridad == "severidad" and not any(
+                zona.severidad is not None for zona in (self.zonas.con_incidentes if self.zonas else ())):
+            # Sin severidades la prioridad degeneraría en silencio a la antigüedad
+            raise ValueError('cola_pendientes="severidad" requiere zonas con incidentes que tengan severidad')
+        self._liberaciones = []
+        if self.cola is not None:
+            self.metricas.update({
+                "incidentes_encolados": 0,
+                "atendidos_desde_cola": 0,
+                "espera_total": 0.0,
+                "espera_maxima": 0.0,
+                "pendientes_al_final": 0
+            })
+
+        # Estado para pausar y reanudar: si ya se emitió SIM_INICIO y el calendario
+        # pendiente del motor por eventos
+        self._iniciada = False
+        self._calendario = None
+
+    @property
+    def perfil(self):
+        """Resumen del perfilado (Perfilador.resumen()), o None si no se activó."""
+        return self.perfilador.resumen() if self.perfilador is not None else None
 
     def seleccionar_vehiculo(self, incidente):
         """
@@ -93,99 +293,171 @@ class Simulacion:
         --------
         Vehiculo o None si no hay vehículos disponibles
         """
-        disponibles = [v for v in self.vehiculos if v.estado == "PATRULLANDO"]
-        if not disponibles:
+        candidatos = self.candidatos_despacho(incidente["x"], incidente["y"], k=1)
+        if not candidatos:
             return None
+        vehiculo_seleccionado = candidatos[0]
 
-        candidatos = []
-        for v in disponibles:
-            eta = v.eta_a(incidente["x"], incidente["y"])
-            candidatos.append((eta, v.reportes_asignados, v))
 
-        # Ordenar por ETA, luego por reportes asignados
-        candidatos.sort(key=lambda t: (t[0], t[1]))
-        vehiculo_seleccionado = candidatos[0][2]
-        
         # Cambiar estado y aumentar contador
         vehiculo_seleccionado.estado = "DESPACHADO"
         vehiculo_seleccionado.reportes_asignados += 1
         
         return vehiculo_seleccionado
 
-    def ejecutar(self):
+    def candidatos_despacho(self, x, y, k=1):
+        """
+        Retorna hasta k vehículos en patrulla ordenados por (ETA, reportes asignados),
+        con el mismo desempate que un ordenamiento estable de toda la flota.
+
+        Usa el índice espacial de la flota, que solo contiene vehículos en patrulla:
+        la búsqueda recorre anillos de celdas alrededor del punto y se detiene cuando
+        la distancia mínima de los anillos restantes, a la velocidad máxima de la
+        flota, ya no puede mejorar el ETA del k-ésimo candidato. Con red vial, el ETA
+        usa la distancia de la tabla precalculada (O(1) por candidato), que nunca es
+        menor que la línea recta, así que la misma cota sigue siendo válida.
+        """
+        velocidades = self.flota.velocidad
+        vehiculos = self.vehiculos
+        red = self.red_vial
+        xs, ys = self.flota.x, self.flota.y
+
+        def clave(i, distancia):
+            if red is not None:
+                distancia = red.distancia(xs[i], ys[i], x, y)
+            eta = distancia / velocidades[i] if velocidades[i] > 0 else float("inf")
+            return (eta, vehiculos[i].reportes_asignados, i)
+
+        velocidad_maxima = self.flota.velocidad_maxima()
+        escala = 1.0 / velocidad_maxima if velocidad_maxima > 0 else 0.0
+        return [vehiculos[i] for _, i in self.flota.indice.k_cercanos(x, y, k, clave, escala)]
+
+    def ejecutar(self, mostrar=True, modo="ticks", hasta=None):
         """
         Ejecuta la simulación principal.
         Genera incidentes con distribución de Poisson y procesa eventos.
+        mostrar: si True, imprime las métricas finales al terminar
+        modo: "ticks" avanza el tiempo en saltos fijos de 'intervalo';
+              "eventos" salta directamente al próximo evento del calendario
+        hasta: si se indica, pausa la simulación en ese tiempo (sin llegar al final);
+               una nueva llamada a ejecutar() la reanuda exactamente donde quedó
         """
-        print("=" * 70)
-        print("INICIO DE SIMULACIÓN - SISTEMA DE SEGURIDAD UBER")
-        print("=" * 70)
-        print(f"Duración: {self.duracion} unidades de tiempo")
-        print(f"Intervalo: {self.intervalo}")
-        print(f"Tasa de incidentes (λ): {self.lambda_incidentes} por unidad de tiempo")
-        print(f"Incidentes esperados: ~{int(self.lambda_incidentes * self.duracion)}")
-        print(f"Límites del mapa: X ∈ [{MAPA_LIMITES['x_min']}, {MAPA_LIMITES['x_max']}], "
-              f"Y ∈ [{MAPA_LIMITES['y_min']}, {MAPA_LIMITES['y_max']}]")
-        print("=" * 70 + "\n")
-        
-        while self.tiempo_actual < self.duracion:
+        if modo not in ("ticks", "eventos"):
+            raise ValueError(f"Modo de ejecución desconocido: {modo}")
+        limite = self.duracion if hasta is None else min(float(hasta), self.duracion)
+        inicio = perf_counter_ns()
+
+        sumidero = self.sumidero
+        sumidero.tiempo = self.tiempo_actual
+        if not self._iniciada and "SIM_INICIO" in sumidero.activos:
+            sumidero.emitir(
+                "SIM_INICIO", self.duracion, self.intervalo, self.lambda_incidentes,
+                MAPA_LIMITES["x_min"], MAPA_LIMITES["x_max"], MAPA_LIMITES["y_min"], MAPA_LIMITES["y_max"]
+            )
+        self._iniciada = True
+
+        if modo == "eventos":
+            self._ejecutar_eventos(limite)
+        else:
+            self._ejecutar_ticks(limite)
+
+        if self.tiempo_actual < self.duracion:
+            # En pausa: solo se vacían los búferes del sumidero
+            sumidero.cerrar()
+            if self.perfilador is not None:
+                self.perfilador.total_ns += perf_counter_ns() - inicio
+            return
+
+        if self.cola is not None:
+            self.metricas["pendientes_al_final"] = len(self.cola)
+        if modo == "eventos":
+            # Incidentes despachados cuyo viaje o traslado sigue en curso en el horizonte:
+            # totales = exitosos + fallidos + en curso (+ pendientes en cola)
+            self.metricas["en_curso_al_final"] = sum(
+                1 for _, _, tipo, _ in self._calendario.pendientes() if tipo in (LLEGADA, FIN_TRASLADO)
+            )
+
+        sumidero.tiempo = self.tiempo_actual
+        if "SIM_FIN" in sumidero.activos:
+            sumidero.emitir("SIM_FIN")
+        sumidero.cerrar()
+        if self.perfilador is not None:
+            self.perfilador.total_ns += perf_counter_ns() - inicio
+        if mostrar:
+            self.mostrar_resultados()
+
+    def _ejecutar_ticks(self, limite):
+        """
+        Bucle de tiempo fijo: en cada tick genera incidentes y mueve la patrulla.
+        Con patrulla="arco" la patrulla no se mueve en cada tick: sus posiciones se
+        calculan en forma cerrada solo en los ticks con despachos.
+        """
+        sumidero = self.sumidero
+        perfil = self.perfilador
+        self._calendario = None
+        while self.tiempo_actual < limite:
+            sumidero.tiempo = self.tiempo_actual
+            if perfil:
+                t = perf_counter_ns()
+
+            # Vehículos que terminaron su servicio y pendientes que pueden atender
+            if self.cola is not None:
+                self._liberar_vehiculos()
+                if self.cola and self.patrulla is not None:
+                    self.patrulla.actualizar(self.tiempo_actual)
+                while self.cola and len(self.flota.indice):
+                    incidente, llegada = self.cola.extraer()
+                    espera = self._registrar_espera(llegada)
+                    self._atender_en_tick(self.seleccionar_vehiculo(incidente), incidente, espera)
+                if perfil:
+                    t = perfil.registrar("atencion", t)
+
             # Generar número de incidentes usando distribución de Poisson
-            num_incidentes = gen_reportes.poisson(self.lambda_incidentes * self.intervalo)
+            num_incidentes = self.gen_reportes.poisson(self.lambda_incidentes * self.intervalo)
+            if perfil:
+                t = perfil.registrar("poisson", t)
+                perfil.eventos += num_incidentes
+                perfil.ticks += 1
             
             # Procesar cada incidente generado en este tick
             for _ in range(num_incidentes):
-                incidente = evento_incidente()
+                incidente = evento_incidente(self.gen_reportes, sumidero, self.zonas)
                 self.metricas["incidentes_totales"] += 1
+                if self.mapas is not None:
+                    self.mapas.agregar_incidente(incidente["zona"], incidente["x"], incidente["y"])
+                if perfil:
+                    t = perfil.registrar("incidente", t)
 
                 # Seleccionar vehículo más cercano disponible
+                if self.patrulla is not None:
+                    self.patrulla.actualizar(self.tiempo_actual)
                 vehiculo = self.seleccionar_vehiculo(incidente)
+                if perfil:
+                    t = perfil.registrar("despacho", t)
                 
                 if vehiculo:
-                    # Fase 1: Ir al punto del incidente (acumula distancia)
-                    vehiculo.mover_a(incidente["x"], incidente["y"])
-
-                    # Fase 2: Intentar contacto con usuario (60% éxito)
-                    resultado = evento_llegada_vehiculo(
-                        {"nombre": vehiculo.nombre, "estado": vehiculo.estado},
-                        incidente
-                    )
-
-                    # Fase 3: Si contacto exitoso, trasladar a estación EP
-                    if isinstance(resultado, dict) and resultado.get("resultado") == "EXITO":
-                        # Determinar estación según zona del incidente
-                        ep_obj = EP2 if incidente["zona"] == "A1" else EP1
-                        
-                        # Trasladar a EP (acumula distancia)
-                        vehiculo.mover_a(ep_obj["coordenadas"][0], ep_obj["coordenadas"][1])
-                        
-                        # Actualizar métricas
-                        vehiculo.incidentes_atendidos += 1
-                        self.metricas["incidentes_exitosos"] += 1
-                    else:
-                        # Usuario no encontrado
-                        vehiculo.incidentes_fallidos += 1
-                        self.metricas["incidentes_fallidos"] += 1
-
-                    # Volver a estado de patrulla
-                    vehiculo.estado = "PATRULLANDO"
+                    self._atender_en_tick(vehiculo, incidente)
+                elif self.cola is not None:
+                    self._encolar(incidente)
                 else:
                     # No hay vehículos disponibles (todos ocupados)
                     self.metricas["incidentes_fallidos"] += 1
-                    print(f"[ALERTA] No hay vehículos disponibles para el incidente en {incidente['zona']}")
+                    if "ALERTA" in sumidero.activos:
+                        sumidero.emitir("ALERTA", incidente["zona"])
+                if perfil:
+                    t = perfil.registrar("atencion", t)
 
             # Actualizar posición de vehículos en patrulla (NO acumula distancia)
-            for i, v in enumerate(self.vehiculos):
-                if v.estado == "PATRULLANDO":
-                    retorno = evento_tick_patrulla_con_rutas({
-                        "nombre": v.nombre, 
-                        "x": v.x, 
-                        "y": v.y
-                    }, i)
-                    
-                    if isinstance(retorno, dict):
-                        # Actualizar posición del vehículo
-                        v.x = float(retorno.get("x", v.x))
-                        v.y = float(retorno.get("y", v.y))
+            if self.patrulla is None:
+                evento_tick_patrulla_flota(self.flota, self.gen_vehiculos, sumidero)
+                if perfil:
+                    perfil.registrar("patrulla", t)
+            if self.mapas is not None:
+                if perfil:
+                    t = perf_counter_ns()
+                self._muestrear_ocupacion(self.tiempo_actual + self.intervalo)
+                if perfil:
+                    perfil.registrar("mapas", t)
 
             # Avanzar tiempo
             self.tiempo_actual += self.intervalo
@@ -194,10 +466,486 @@ class Simulacion:
             if self.pausa_visual:
                 time.sleep(0.1)
 
-        print("\n" + "=" * 70)
-        print("FIN DE SIMULACIÓN")
-        print(" ")
-        self.mostrar_resultados()
+    def _atender_en_tick(self, vehiculo, incidente, espera=0.0):
+        """
+        Atiende un incidente con el vehículo ya despachado en el modo por ticks: viaje,
+        contacto y traslado se resuelven en el tick. Sin cola de pendientes el vehículo
+        vuelve a patrullar de inmediato; con cola queda ocupado durante el tiempo de
+        viaje (distancia recorrida / velocidad) y se libera en un tick posterior.
+
+        Los tiempos de respuesta y traslado se registran como distancia / velocidad,
+        más la espera en la cola si el incidente estuvo pendiente.
+        """
+        # Fase 1: Ir al punto del incidente (acumula distancia)
+        distancia = vehiculo.mover_a(incidente["x"], incidente["y"])
+        self.flujo.agregar("respuesta", espera + self._duracion_viaje(vehiculo, distancia))
+        if self.mapas is not None:
+            self.mapas.agregar_respuesta(incidente["x"], incidente["y"], distancia)
+
+        # Fase 2: Intentar contacto con usuario (60% éxito)
+        resultado = evento_llegada_vehiculo(
+            {"nombre": vehiculo.nombre, "estado": vehiculo.estado},
+            incidente,
+            self.gen_vehiculos,
+            sumidero=self.sumidero
+        )
+
+        # Fase 3: Si contacto exitoso, trasladar a estación EP
+        if isinstance(resultado, dict) and resultado.get("resultado") == "EXITO":
+            # Determinar estación según zona del incidente
+            ep_obj = estacion_destino(incidente)
+            
+            # Trasladar a EP (acumula distancia)
+            distancia_traslado = vehiculo.mover_a(ep_obj["coordenadas"][0], ep_obj["coordenadas"][1])
+            self.flujo.agregar("traslado", self._duracion_viaje(vehiculo, distancia_traslado))
+            distancia += distancia_traslado
+            
+            # Actualizar métricas
+            vehiculo.incidentes_atendidos += 1
+            self.metricas["incidentes_exitosos"] += 1
+            if self.cola is not None:
+                vehiculo.estado = "TRASLADANDO"
+        else:
+            # Usuario no encontrado
+            vehiculo.incidentes_fallidos += 1
+            self.metricas["incidentes_fallidos"] += 1
+
+        duracion = self._duracion_viaje(vehiculo, distancia)
+        # Sin cola el vehículo no queda ocupado: se acumula la carga de viaje sin recortar
+        vehiculo.tiempo_servicio += duracion if self.cola is None else self._servicio_en_horizonte(duracion)
+        self.flujo.agregar("distancia", distancia)
+
+        if self.cola is None:
+            # Volver a estado de patrulla
+            self._volver_a_patrullar(vehiculo)
+        else:
+            heapq.heappush(self._liberaciones, (self.tiempo_actual + duracion, vehiculo.indice))
+
+    @staticmethod
+    def _duracion_viaje(vehiculo, distancia):
+        return distancia / vehiculo.velocidad if vehiculo.velocidad > 0 else math.inf
+
+    def _servicio_en_horizonte(self, duracion):
+        """Parte de un servicio que empieza ahora y cae dentro del horizonte simulado."""
+        return max(0.0, min(duracion, self.duracion - self.tiempo_actual))
+
+    def _liberar_vehiculos(self):
+        """Devuelve a patrulla los vehículos cuyo servicio terminó hasta el tiempo actual."""
+        liberaciones = self._liberaciones
+        while liberaciones and liberaciones[0][0] <= self.tiempo_actual:
+            _, indice = heapq.heappop(liberaciones)
+            self._volver_a_patrullar(self.vehiculos[indice])
+
+    def _volver_a_patrullar(self, vehiculo, calendario=None):
+        """
+        El vehículo terminó su servicio y vuelve a patrullar: con patrulla en forma
+        cerrada se reincorpora a su ruta; en el motor por eventos inicia un tramo.
+        """
+        vehiculo.estado = "PATRULLANDO"
+        if self.patrulla is not None:
+            self.patrulla.reincorporar(vehiculo.indice, self.tiempo_actual)
+        elif calendario is not None:
+            self._iniciar_tramo(calendario, vehiculo)
+
+    def _encolar(self, incidente):
+        """Pone en espera un incidente que llegó sin vehículos libres."""
+        self.cola.agregar(incidente, self.tiempo_actual)
+        self.metricas["incidentes_encolados"] += 1
+        if "ALERTA" in self.sumidero.activos:
+            self.sumidero.emitir("ALERTA", incidente["zona"])
+
+    def _registrar_espera(self, llegada):
+        """Acumula la espera en cola de un incidente que empieza a ser atendido y la retorna."""
+        espera = self.tiempo_actual - llegada
+        self.metricas["atendidos_desde_cola"] += 1
+        self.metricas["espera_total"] += espera
+        self.metricas["espera_maxima"] = max(self.metricas["espera_maxima"], espera)
+        return espera
+
+    def _programar_llegada(self, calendario, vehiculo, incidente, espera=0.0):
+        """Motor por eventos: programa la llegada del vehículo despachado y registra la respuesta."""
+        vehiculo.version_tramo += 1
+        eta = vehiculo.eta_a(incidente["x"], incidente["y"])
+        vehiculo.tiempo_servicio += self._servicio_en_horizonte(eta)
+        self.flujo.agregar("respuesta", espera + eta)
+        calendario.programar(self.tiempo_actual + eta, LLEGADA, (vehiculo, incidente))
+
+    def _ejecutar_eventos(self, limite):
+        """
+        Motor de próximo evento: el tiempo salta directamente al evento más cercano
+        del calendario (llegada de incidente, llegada al incidente, fin de traslado
+        o waypoint alcanzado), de modo que los periodos sin actividad no cuestan nada.
+
+        A diferencia del modo por ticks, los vehículos quedan ocupados durante el
+        viaje al incidente y el traslado (distancia / velocidad), y la patrulla avanza
+        en línea recta entre waypoints con una velocidad de 3-5 km/tick por tramo.
+
+        Si la simulación se pausó en modo por eventos, continúa con el calendario pendiente.
+        """
+        sumidero = self.sumidero
+        calendario = self._calendario
+        if calendario is None:
+            calendario = self._calendario = CalendarioEventos()
+            for v in self.vehiculos:
+                if v.estado == "PATRULLANDO" and self.patrulla is None:
+                    self._iniciar_tramo(calendario, v)
+            if self.lambda_incidentes > 0:
+                calendario.programar(self.tiempo_actual + self._tiempo_entre_incidentes(), INCIDENTE)
+
+        perfil = self.perfilador
+        while calendario.proximo_tiempo() <= limite:
+            if perfil:
+                t = perf_counter_ns()
+            self.tiempo_actual, tipo, datos = calendario.siguiente()
+            sumidero.tiempo = self.tiempo_actual
+            if perfil:
+                t = perfil.registrar("calendario", t)
+                perfil.eventos += 1
+            if self.mapas is not None and self.mapas.proxima_muestra < self.tiempo_actual:
+                self._muestrear_ocupacion(self.tiempo_actual)
+                if perfil:
+                    t = perfil.registrar("mapas", t)
+
+            if tipo == INCIDENTE:
+                self._evento_incidente(calendario)
+                if perfil:
+                    t = perf_counter_ns()
+                calendario.programar(self.tiempo_actual + self._tiempo_entre_incidentes(), INCIDENTE)
+                if perfil:
+                    perfil.registrar("poisson", t)
+
+            elif tipo == LLEGADA:
+                vehiculo, incidente = datos
+                distancia = vehiculo.mover_a(incidente["x"], incidente["y"])
+                if self.mapas is not None:
+                    self.mapas.agregar_respuesta(incidente["x"], incidente["y"], distancia)
+                resultado = evento_llegada_vehiculo(
+                    {"nombre": vehiculo.nombre, "estado": vehiculo.estado},
+                    incidente,
+                    self.gen_vehiculos,
+                    trasladar=False,
+                    sumidero=sumidero
+                )
+                if resultado.get("resultado") == "EXITO":
+                    vehiculo.estado = "TRASLADANDO"
+                    ep_x, ep_y = estacion_destino(incidente)["coordenadas"]
+                    distancia += vehiculo.distancia_a(ep_x, ep_y)
+                    eta = vehiculo.eta_a(ep_x, ep_y)
+                    vehiculo.tiempo_servicio += self._servicio_en_horizonte(eta)
+                    self.flujo.agregar("traslado", eta)
+                    self.flujo.agregar("distancia", distancia)
+                    calendario.programar(self.tiempo_actual + eta, FIN_TRASLADO, datos)
+                else:
+                    self.flujo.agregar("distancia", distancia)
+                    vehiculo.incidentes_fallidos += 1
+                    self.metricas["incidentes_fallidos"] += 1
+                    self._vehiculo_libre(calendario, vehiculo)
+
+            elif tipo == FIN_TRASLADO:
+                vehiculo, incidente = datos
+                evento_fin_traslado_ep({"nombre": vehiculo.nombre, "estado": vehiculo.estado}, incidente, sumidero)
+                ep_x, ep_y = estacion_destino(incidente)["coordenadas"]
+                vehiculo.mover_a(ep_x, ep_y)
+                vehiculo.incidentes_atendidos += 1
+                self.metricas["incidentes_exitosos"] += 1
+                self._vehiculo_libre(calendario, vehiculo)
+
+            elif tipo == WAYPOINT:
+                vehiculo, version = datos
+                # Un despacho posterior invalida el waypoint programado
+                if vehiculo.estado != "PATRULLANDO" or version != vehiculo.version_tramo:
+                    continue
+                puntos_ruta = RUTAS[f"vehiculo_{vehiculo.ruta + 1}"]["puntos_clave"]
+                vehiculo.x, vehiculo.y = vehiculo.tramo[3], vehiculo.tramo[4]
+                if "EV_WAYPOINT" in sumidero.activos:
+                    sumidero.emitir("EV_WAYPOINT", vehiculo.nombre, vehiculo.waypoint_actual + 1)
+                vehiculo.waypoint_actual = (vehiculo.waypoint_actual + 1) % len(puntos_ruta)
+                self._iniciar_tramo(calendario, vehiculo)
+
+            # Las fases del evento INCIDENTE se miden dentro de _evento_incidente
+            if perfil and tipo != INCIDENTE:
+                perfil.registrar("patrulla" if tipo == WAYPOINT else "atencion", t)
+
+        if self.mapas is not None:
+            self._muestrear_ocupacion(limite)
+        self.tiempo_actual = limite
+
+    def _vehiculo_libre(self, calendario, vehiculo):
+        """
+        Un vehículo terminó su servicio en el motor por eventos: si hay incidentes en
+        espera, atiende de inmediato el de mayor prioridad; si no, vuelve a patrullar.
+        """
+        if self.cola:
+            incidente, llegada = self.cola.extraer()
+            espera = self._registrar_espera(llegada)
+            vehiculo.estado = "DESPACHADO"
+            vehiculo.reportes_asignados += 1
+            self._programar_llegada(calendario, vehiculo, incidente, espera)
+        else:
+            self._volver_a_patrullar(vehiculo, calendario)
+
+    def _tiempo_entre_incidentes(self):
+        """Tiempo exponencial hasta el próximo incidente (proceso de Poisson de tasa λ)."""
+        return -math.log(1.0 - self.gen_reportes.aleatorio()) / self.lambda_incidentes
+
+    def _iniciar_tramo(self, calendario, vehiculo):
+        """Inicia el tramo de patrulla hacia el waypoint actual y programa su llegada."""
+        puntos_ruta = RUTAS[f"vehiculo_{vehiculo.ruta + 1}"]["puntos_clave"]
+        destino_x, destino_y = puntos_ruta[vehiculo.waypoint_actual]
+        distancia = math.hypot(destino_x - vehiculo.x, destino_y - vehiculo.y)
+        velocidad = (3.0 + 2.0 * self.gen_vehiculos.aleatorio()) / self.intervalo  # 3-5 km/tick
+
+        llegada = self.tiempo_actual + distancia / velocidad
+        vehiculo.tramo = (self.tiempo_actual, vehiculo.x, vehiculo.y, destino_x, destino_y, llegada)
+        vehiculo.version_tramo += 1
+        calendario.programar(llegada, WAYPOINT, (vehiculo, vehiculo.version_tramo))
+
+    def _posicion_en_tramo(self, vehiculo):
+        """Posición interpolada de un vehículo en patrulla en el tiempo actual."""
+        inicio, x0, y0, x1, y1, llegada = vehiculo.tramo
+        if llegada <= inicio:
+            return x1, y1
+        fraccion = min(1.0, (self.tiempo_actual - inicio) / (llegada - inicio))
+        return x0 + (x1 - x0) * fraccion, y0 + (y1 - y0) * fraccion
+
+    def _muestrear_ocupacion(self, hasta):
+        """
+        Registra en los mapas de calor las posiciones de la patrulla en los tiempos
+        de muestra (uno por intervalo) anteriores a 'hasta'; cada muestra aporta un
+        intervalo de tiempo de vehículo a su celda.
+
+        En el modo por ticks la muestra de cada tick es la posición tras el paso de
+        patrulla. En el motor por eventos se llama antes de procesar cada evento: el
+        estado de la flota no cambia entre eventos, así que las posiciones en los
+        tiempos intermedios se interpolan en cada tramo (o se calculan en forma
+        cerrada con patrulla="arco") sin agregar eventos al calendario.
+        """
+        mapas = self.mapas
+        if mapas.proxima_muestra >= hasta:
+            return
+        cantidad = int(math.ceil((hasta - mapas.proxima_muestra) / self.intervalo))
+        tiempos = mapas.proxima_muestra + self.intervalo * np.arange(cantidad)
+        mapas.proxima_muestra = float(tiempos[-1]) + self.intervalo
+
+        en_patrulla = self.flota.en_patrulla()
+        if len(en_patrulla) == 0:
+            return
+        if self.patrulla is not None:
+            en_ruta = self.patrulla.en_ruta()
+            x, y = self.patrulla.posiciones(en_ruta, tiempos)
+            detenidos = np.setdiff1d(en_patrulla, en_ruta)
+            mapas.agregar_ocupacion(x, y, self.intervalo)
+            mapas.agregar_ocupacion(np.repeat(self.flota.x[detenidos], cantidad),
+                                    np.repeat(self.flota.y[detenidos], cantidad), self.intervalo)
+        elif self._calendario is None:
+            # Modo por ticks: la flota ya está en su posición del tick
+            mapas.agregar_ocupacion(np.tile(self.flota.x[en_patrulla], cantidad),
+                                    np.tile(self.flota.y[en_patrulla], cantidad), self.intervalo)
+        else:
+            # Sin tramo (por ejemplo, tras una pausa en el modo por ticks) el vehículo está detenido
+            tramos = np.array([self.vehiculos[i].tramo or (0.0, 0.0, 0.0, self.flota.x[i], self.flota.y[i], 0.0)
+                               for i in en_patrulla], dtype=np.float64)
+            inicio, x0, y0, x1, y1, llegada = tramos.T
+            duracion = llegada - inicio
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fraccion = np.clip((tiempos[:, None] - inicio) / duracion, 0.0, 1.0)
+            fraccion = np.where(duracion > 0, fraccion, 1.0)
+            mapas.agregar_ocupacion(x0 + (x1 - x0) * fraccion, y0 + (y1 - y0) * fraccion, self.intervalo)
+
+    def _evento_incidente(self, calendario):
+        """Llegada de un incidente en el motor por eventos: despacha el vehículo y programa su llegada."""
+        perfil = self.perfilador
+        if perfil:
+            t = perf_counter_ns()
+        incidente = evento_incidente(self.gen_reportes, self.sumidero, self.zonas)
+        self.metricas["incidentes_totales"] += 1
+        if self.mapas is not None:
+            self.mapas.agregar_incidente(incidente["zona"], incidente["x"], incidente["y"])
+        if perfil:
+            t = perfil.registrar("incidente", t)
+
+        # Las posiciones de patrulla solo se calculan cuando un despacho las necesita
+        if self.patrulla is not None:
+            self.patrulla.actualizar(self.tiempo_actual)
+        else:
+            for i in self.flota.en_patrulla():
+                self.flota.fijar_posicion(i, *self._posicion_en_tramo(self.vehiculos[i]))
+
+        vehiculo = self.seleccionar_vehiculo(incidente)
+        if perfil:
+            perfil.registrar("despacho", t)
+        if vehiculo:
+            self._programar_llegada(calendario, vehiculo, incidente)
+        elif self.cola is not None:
+            self._encolar(incidente)
+        else:
+            self.metricas["incidentes_fallidos"] += 1
+            if "ALERTA" in self.sumidero.activos:
+                self.sumidero.emitir("ALERTA", incidente["zona"])
+
+    def capturar(self):
+        """
+        Instantánea del estado completo de la simulación: parámetros, tiempo, métricas,
+        estado de ambos generadores, arreglos de la flota (posición, velocidad, estado,
+        waypoint y ruta), contadores y tramo de patrulla de cada vehículo, y el
+        calendario pendiente del motor por eventos. Contiene solo datos simples
+        (números, cadenas, listas y arreglos de NumPy), sin referencias a objetos.
+
+        Simulacion.restaurar(instantanea) reconstruye una simulación que continúa
+        exactamente igual que esta.
+
+        Retorna: diccionario con la instantánea
+        """
+        n = self.flota.n
+        calendario = None
+        if self._calendario is not None:
+            calendario = {
+                "secuencia": self._calendario._secuencia,
+                "eventos": [
+                    (tiempo, secuencia, tipo, self._datos_a_instantanea(tipo, datos))
+                    for tiempo, secuencia, tipo, datos in self._calendario.pendientes()
+                ]
+            }
+
+        return {
+            "version": VERSION_INSTANTANEA,
+            "parametros": {
+                "duracion_simulacion": self.duracion,
+                "intervalo": self.intervalo,
+                "lambda_incidentes": self.lambda_incidentes,
+                "cola_pendientes": self.cola.prioridad if self.cola is not None else None,
+                "patrulla": "arco" if self.patrulla is not None else "pasos",
+                "zonas": self.zonas.definicion if self.zonas is not None else None
+            },
+            "tiempo_actual": self.tiempo_actual,
+            "iniciada": self._iniciada,
+            "metricas": dict(self.metricas),
+            "flujo": self.flujo.exportar(),
+            "generadores": {
+                "vehiculos": (self.gen_vehiculos.a, self.gen_vehiculos.c, self.gen_vehiculos.m, self.gen_vehiculos.x),
+                "reportes": (self.gen_reportes.a, self.gen_reportes.c, self.gen_reportes.m, self.gen_reportes.x)
+            },
+            "flota": {
+                "nombres": list(self.flota.nombres),
+                **{campo: getattr(self.flota, campo)[:n].copy() for campo in CAMPOS_FLOTA}
+            },
+            "vehiculos": {
+                **{campo: [getattr(v, campo) for v in self.vehiculos] for campo in CONTADORES_VEHICULO},
+                "tramo": [v.tramo for v in self.vehiculos],
+                "version_tramo": [v.version_tramo for v in self.vehiculos]
+            },
+            "calendario": calendario,
+            "cola": self.cola.exportar() if self.cola is not None else None,
+            "liberaciones": [list(e) for e in sorted(self._liberaciones)],
+            "patrulla": self.patrulla.exportar() if self.patrulla is not None else None,
+            "mapas": self.mapas.exportar() if self.mapas is not None else None
+        }
+
+    @classmethod
+    def restaurar(cls, instantanea, sumidero=None, pausa_visual=False, red_vial=None, perfilar=False, **cambios):
+        """
+        Reconstruye una simulación a partir de capturar().
+
+        Parámetros:
+            instantanea (dict): Resultado de capturar() (o de instantaneas.cargar_instantanea).
+            sumidero (SumideroEventos): Destino de los eventos de la continuación.
+            red_vial (RedVial): Modelo de viaje de la continuación (no forma parte de la instantánea).
+            perfilar (bool): Perfilar la continuación (el perfil no forma parte de la instantánea).
+            cambios: Parámetros a modificar en la continuación ("¿qué pasaría si?"):
+                     duracion_simulacion, intervalo, lambda_incidentes o
+                     velocidad_vehiculos (esta última se aplica a toda la flota).
+
+        Retorna: Simulacion lista para continuar con ejecutar()
+        """
+        if instantanea.get("version") != VERSION_INSTANTANEA:
+            raise ValueError(f"Versión de instantánea no soportada: {instantanea.get('version')}")
+        desconocidos = set(cambios) - {"duracion_simulacion", "intervalo", "lambda_incidentes", "velocidad_vehiculos"}
+        if desconocidos:
+            raise ValueError(f"Parámetros no modificables al restaurar: {sorted(desconocidos)}")
+
+        flota = instantanea["flota"]
+        parametros = dict(instantanea["parametros"])
+        parametros.update({k: v for k, v in cambios.items() if k != "velocidad_vehiculos"})
+        generadores = {nombre: GeneradorMixto(*estado) for nombre, estado in instantanea["generadores"].items()}
+
+        simulacion = cls(
+            generadores=generadores,
+            posiciones_iniciales=list(zip(flota["x"].tolist(), flota["y"].tolist())),
+            pausa_visual=pausa_visual,
+            sumidero=sumidero,
+            red_vial=red_vial,
+            perfilar=perfilar,
+            **parametros
+        )
+        simulacion.tiempo_actual = instantanea["tiempo_actual"]
+        simulacion._iniciada = instantanea["iniciada"]
+        simulacion.metricas = dict(instantanea["metricas"])
+        if "flujo" in instantanea:
+            simulacion.flujo = MetricasFlujo.importar(instantanea["flujo"])
+
+        destino = simulacion.flota
+        destino.nombres = list(flota["nombres"])
+        for campo in ("velocidad", "waypoint", "ruta"):
+            getattr(destino, campo)[:destino.n] = flota[campo]
+        if "velocidad_vehiculos" in cambios:
+            destino.velocidad[:destino.n] = cambios["velocidad_vehiculos"]
+
+        vehiculos = instantanea["vehiculos"]
+        for i, v in enumerate(simulacion.vehiculos):
+            v.nombre = destino.nombres[i]
+            # fijar_estado mantiene el índice espacial con solo los vehículos en patrulla
+            destino.fijar_estado(i, int(flota["estado"][i]))
+            for campo in CONTADORES_VEHICULO:
+                if campo in vehiculos:
+                    setattr(v, campo, vehiculos[campo][i])
+            v.tramo = tuple(vehiculos["tramo"][i]) if vehiculos["tramo"][i] is not None else None
+            v.version_tramo = vehiculos["version_tramo"][i]
+
+        if instantanea.get("cola") is not None:
+            simulacion.cola = ColaPendientes.importar(instantanea["cola"])
+        simulacion._liberaciones = [tuple(e) for e in instantanea.get("liberaciones", [])]
+        if instantanea.get("patrulla") is not None:
+            simulacion.patrulla = PatrullaArco.importar(simulacion.flota, instantanea["patrulla"])
+        if instantanea.get("mapas") is not None:
+            simulacion.mapas = MapasCalor.importar(instantanea["mapas"])
+
+        calendario = instantanea["calendario"]
+        if calendario is not None:
+            eventos = calendario["eventos"]
+            cambia_lambda = simulacion.lambda_incidentes != float(instantanea["parametros"]["lambda_incidentes"])
+            if cambia_lambda:
+                # La próxima llegada pendiente se sorteó con la tasa anterior (o no existe
+                # si era 0): se descarta y, por falta de memoria, se sortea con la nueva
+                eventos = [e for e in eventos if e[2] != INCIDENTE]
+            simulacion._calendario = CalendarioEventos.desde_pendientes(
+                [(tiempo, secuencia, tipo, simulacion._datos_desde_instantanea(tipo, datos))
+                 for tiempo, secuencia, tipo, datos in eventos],
+                calendario["secuencia"]
+            )
+            if cambia_lambda and simulacion.lambda_incidentes > 0:
+                simulacion._calendario.programar(
+                    simulacion.tiempo_actual + simulacion._tiempo_entre_incidentes(), INCIDENTE
+                )
+        return simulacion
+
+    @staticmethod
+    def _datos_a_instantanea(tipo, datos):
+        """Reemplaza las referencias a vehículos de un evento del calendario por su índice."""
+        if tipo in (LLEGADA, FIN_TRASLADO):
+            vehiculo, incidente = datos
+            return [vehiculo.indice, dict(incidente)]
+        if tipo == WAYPOINT:
+            vehiculo, version = datos
+            return [vehiculo.indice, version]
+        return datos
+
+    def _datos_desde_instantanea(self, tipo, datos):
+        """Inversa de _datos_a_instantanea."""
+        if tipo in (LLEGADA, FIN_TRASLADO):
+            return self.vehiculos[datos[0]], dict(datos[1])
+        if tipo == WAYPOINT:
+            return self.vehiculos[datos[0]], datos[1]
+        return datos
 
     def mostrar_resultados(self):
         """Muestra las métricas finales de la simulación."""
@@ -214,8 +962,12 @@ class Simulacion:
         print(f"   Tiempo simulado: {self.duracion} unidades")
         print(f"   Tasa λ configurada: {self.lambda_incidentes}")
         print(f"   Incidentes generados: {total_incidentes}")
-        print(f"   Incidentes exitosos: {total_exitosos} ({(total_exitosos/total_incidentes*100):.2f}%)")
-        print(f"   Incidentes fallidos: {total_fallidos} ({(total_fallidos/total_incidentes*100):.2f}%)")
+        pct_exitosos = (total_exitosos / total_incidentes * 100) if total_incidentes else 0.0
+        pct_fallidos = (total_fallidos / total_incidentes * 100) if total_incidentes else 0.0
+        print(f"   Incidentes exitosos: {total_exitosos} ({pct_exitosos:.2f}%)")
+        print(f"   Incidentes fallidos: {total_fallidos} ({pct_fallidos:.2f}%)")
+        if "en_curso_al_final" in self.metricas:
+            print(f"   En curso al final: {self.metricas['en_curso_al_final']}")
 
         # Métrica 2: Porcentaje de reportes atendidos por cada vehículo
         print(f"\n MÉTRICA 2: Porcentaje de reportes atendidos por vehículo")
@@ -256,7 +1008,72 @@ class Simulacion:
         if total_exitosos > 0:
             distancia_por_exito = suma_distancias / total_exitosos
             print(f"   Distancia promedio por incidente exitoso: {distancia_por_exito:.2f} km")
-        
+
+        # Distribución de tiempos y distancias por incidente
+        print(f"\n TIEMPOS POR INCIDENTE")
+        columnas = "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+        print(f"   {'Métrica':<12} {'n':>7} {'Media':>9} {'Desv.':>9}{columnas} {'Máximo':>9}")
+        print(f"   {'-'*(50 + 9 * len(PERCENTILES))}")
+        for nombre, r in self.flujo.resumen().items():
+            if r["n"] == 0:
+                print(f"   {nombre:<12} {0:>7}   (sin datos)")
+                continue
+            valores = "".join(f"{r[f'p{p}']:>9.2f}" for p in PERCENTILES)
+            print(f"   {nombre:<12} {r['n']:>7} {r['media']:>9.2f} {r['desviacion']:>9.2f}{valores} {r['maximo']:>9.2f}")
+
+        # Utilización: tiempo de viaje en servicio sobre el tiempo simulado
+        if self.cola is not None or self._calendario is not None:
+            print(f"\n UTILIZACIÓN POR VEHÍCULO")
+            for v in self.vehiculos:
+                utilizacion = (v.tiempo_servicio / self.tiempo_actual * 100) if self.tiempo_actual else 0.0
+                print(f"   {v.nombre:<15} {v.tiempo_servicio:>10.2f} unidades en servicio ({utilizacion:.1f}%)")
+        else:
+            # En el modo por ticks sin cola el servicio es instantáneo: no hay ocupación
+            # que medir, solo el tiempo de viaje acumulado por los despachos
+            print(f"\n CARGA DE VIAJE POR VEHÍCULO")
+            for v in self.vehiculos:
+                print(f"   {v.nombre:<15} {v.tiempo_servicio:>10.2f} unidades de viaje")
+
+        # Cola de incidentes pendientes
+        if self.cola is not None:
+            atendidos_cola = self.metricas["atendidos_desde_cola"]
+            espera_media = (self.metricas["espera_total"] / atendidos_cola) if atendidos_cola else 0.0
+            print(f"\n COLA DE PENDIENTES (prioridad: {self.cola.prioridad})")
+            print(f"   Incidentes encolados: {self.metricas['incidentes_encolados']}")
+            print(f"   Atendidos desde la cola: {atendidos_cola}")
+            print(f"   Pendientes al final: {self.metricas['pendientes_al_final']}")
+            print(f"   Espera promedio: {espera_media:.2f} unidades (máxima {self.metricas['espera_maxima']:.2f})")
+            print(f"   Longitud máxima de la cola: {self.cola.maximo}")
+            print(f"   Rendimiento: {total_exitosos / self.duracion:.3f} traslados por unidad de tiempo")
+
+        # Mapas de calor: puntos calientes y brechas de cobertura
+        if self.mapas is not None:
+            mapas = self.mapas
+            print(f"\n MAPAS DE CALOR (celdas de {mapas.tam_celda:g} km, {mapas.filas} × {mapas.columnas})")
+            print(f"   {'Celda (x, y)':<18} {'Incidentes':>10} {'Dist. media':>12}")
+            print(f"   {'-'*42}")
+            for x, y, incidentes, media in mapas.puntos_calientes():
+                print(f"   ({x:>6.1f}, {y:>6.1f})   {incidentes:>10} {media:>12.2f}")
+            celdas, incidentes, mayores = mapas.brechas_cobertura()
+            print(f"   Brechas de cobertura (celdas con incidentes sin patrulla): {celdas} celdas, "
+                  f"{incidentes} incidentes")
+            for x, y, n in mayores:
+                print(f"     ({x:.1f}, {y:.1f}): {n} incidentes")
+
+        # Perfilado opcional del bucle de simulación
+        if self.perfilador is not None:
+            perfil = self.perfil
+            print(f"\n PERFIL DE EJECUCIÓN")
+            print(f"   Tiempo de reloj: {perfil['total_s']:.3f} s "
+                  f"({perfil['eventos']} eventos, {perfil['eventos_por_s']:.0f} eventos/s)")
+            print(f"   {'Fase':<12} {'Llamadas':>10} {'Total (ms)':>12} {'Media (µs)':>12} {'% total':>9}")
+            print(f"   {'-'*59}")
+            for fase, r in perfil["fases"].items():
+                print(f"   {fase:<12} {r['llamadas']:>10} {r['total_ms']:>12.2f} {r['media_us']:>12.2f} "
+                      f"{r['fraccion'] * 100:>8.1f}%")
+            if "salida" in perfil["fases"]:
+                print("   (el tiempo de salida al sumidero también está incluido en las demás fases)")
+
         print(" ")
 
 
@@ -0,0 +1,14 @@
+import warnings
+
+import numpy as np
+
+from bateria_pruebas import prueba_huecos
+
+
+def test_huecos_sin_apariciones_falla():
+    """Sin dos apariciones en el intervalo la prueba falla sin producir NaN."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resultado = prueba_huecos(np.full(1000, 0.75))
+    assert not resultado["aprobada"]
+    assert resultado["valor_p"] == 0.0
@@ -0,0 +1,16 @@
+import tracemalloc
+
+from generadores import crear_generadores, pruebas_en_flujo
+
+
+def test_pruebas_en_flujo_memoria_acotada():
+    """Las pruebas en flujo sobre millones de valores usan unos pocos megabytes."""
+    generador = crear_generadores()["reportes"]
+    tracemalloc.start()
+    try:
+        frecuencia, _ = pruebas_en_flujo(generador, 5_000_000)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert sum(frecuencia.frecuencias) == 5_000_000
+    assert pico < 4 * 1024 * 1024
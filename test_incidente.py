@@ -1,11 +1,14 @@
 from eventos import evento_incidente
+from generadores import crear_generadores
+
+gen_reportes = crear_generadores()["reportes"]
 
 # Probar 100 generaciones
 conteo_a1 = 0
 conteo_a2 = 0
 
 for _ in range(100):
-    inc = evento_incidente()
+    inc = evento_incidente(gen_reportes)
     if inc["zona"] == "A1":
         conteo_a1 += 1
     else:
@@ -0,0 +1,16 @@
+from instantaneas import calentar, continuar
+
+
+def test_bifurcacion_eventos_con_nueva_tasa():
+    """Una continuación por eventos que pasa de λ = 0 a λ > 0 debe generar incidentes."""
+    instantanea = calentar(50, modo="eventos", lambda_incidentes=0.0)
+    resultado = continuar(instantanea, {"lambda_incidentes": 2.0}, modo="eventos")
+    assert resultado["metricas"]["incidentes_totales"] > 0
+
+
+def test_bifurcacion_eventos_a_tasa_cero():
+    """Al pasar a λ = 0 se descarta la llegada pendiente sorteada con la tasa anterior."""
+    instantanea = calentar(50, modo="eventos", lambda_incidentes=2.0)
+    antes = instantanea["metricas"]["incidentes_totales"]
+    resultado = continuar(instantanea, {"lambda_incidentes": 0.0}, modo="eventos")
+    assert resultado["metricas"]["incidentes_totales"] == antes
@@ -0,0 +1,615 @@
+# ============================================================
+# zonas.py
+# Registro de zonas (polígonos, círculos y sectores) cargado
+# desde un archivo de datos, con búsqueda punto → zona en O(1)
+# sobre una grilla precompilada
+# ============================================================
+#
+# Formato del archivo (JSON o TOML; ver zonas.json, que describe el mapa original):
+#
+#   {
+#     "estaciones": {"EP1": [0, 90], "EP2": [65, 10]},
+#     "zonas": [
+#       {"nombre": "A1", "forma": "poligono", "vertices": [[28, 50], [37, 50], [32.5, 90]],
+#        "peso": 0.5, "destino": "EP2"},
+#       {"nombre": "A2", "forma": "sector", "centro": [32.5, 10], "radio": 12.5,
+#        "inicio": 180, "fin": 360, "peso": 0.5, "destino": "EP1"}
+#     ]
+#   }
+#
+# Formas: "poligono" (vertices, polígono simple, convexo o no), "rectangulo"
+# (x_min, x_max, y_min, y_max), "circulo" (centro, radio) y "sector" (centro,
+# radio, inicio y fin en grados en sentido antihorario y, opcionalmente,
+# radio_interior para un sector de anillo).
+#
+# Cada zona tiene un peso de incidentes (proporción de los incidentes que ocurren
+# en ella; 0 = ninguno) y la estación de destino de sus traslados, obligatoria si
+# el peso es positivo. Opcionalmente, una severidad que se copia a sus incidentes
+# (la usa la cola de pendientes con prioridad "severidad"). Si las zonas se
+# superponen, un punto pertenece a la primera del archivo que lo contiene.
+
+import bisect
+import json
+import math
+import os
+
+import numpy as np
+
+from geometria import EP1, EP2, CO, MAPA_LIMITES
+
+# Archivo con las zonas del mapa original (A1, A2 y A3)
+ARCHIVO_ZONAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zonas.json")
+
+FORMAS = ("poligono", "rectangulo", "circulo", "sector")
+
+# Estaciones disponibles como destino aunque el archivo no las declare
+ESTACIONES = {"EP1": EP1, "EP2": EP2, "CAI": CO}
+
+# Marca de celda sin zona en la grilla; los valores menores indican una celda de
+# borde cuyos candidatos están en la lista -2 - valor
+SIN_ZONA = -1
+
+DOS_PI = 2.0 * math.pi
+
+
+def _distancia_segmentos(px, py, ax, ay, bx, by):
+    """
+    Distancia de cada punto (px, py) al más cercano de los segmentos (a, b).
+    px, py: arreglos de N puntos; ax, ay, bx, by: arreglos de M segmentos.
+    Retorna: arreglo de N distancias
+    """
+    px = px[:, None]
+    py = py[:, None]
+    dx = bx - ax
+    dy = by - ay
+    largo2 = dx * dx + dy * dy
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / np.where(largo2 > 0, largo2, 1.0), 0.0, 1.0)
+    return np.hypot(ax + t * dx - px, ay + t * dy - py).min(axis=1)
+
+
+def _es_simple(vertices):
+    """Verifica que ningún par de lados no consecutivos del polígono se toque."""
+    def cruz(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    def en_caja(a, b, p):
+        return min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= p[1] <= max(a[1], b[1])
+
+    n = len(vertices)
+    lados = list(zip(vertices, vertices[1:] + vertices[:1]))
+    for i in range(n):
+        a, b = lados[i]
+        for j in range(i + 2, n - (i == 0)):
+            c, d = lados[j]
+            d1, d2, d3, d4 = cruz(c, d, a), cruz(c, d, b), cruz(a, b, c), cruz(a, b, d)
+            if ((d1 > 0) != (d2 > 0) and d1 and d2 and (d3 > 0) != (d4 > 0) and d3 and d4) \
+                    or (d1 == 0 and en_caja(c, d, a)) or (d2 == 0 and en_caja(c, d, b)) \
+                    or (d3 == 0 and en_caja(a, b, c)) or (d4 == 0 and en_caja(a, b, d)):
+                return False
+    return True
+
+
+def _triangular(vertices):
+    """
+    Triangula un polígono simple por recorte de orejas. Un triángulo se retorna con
+    sus vértices en el orden dado (así el muestreo reproduce el de geometria.A1).
+    Retorna: lista de triángulos ((x1, y1), (x2, y2), (x3, y3))
+    """
+    if len(vertices) == 3:
+        return [tuple(vertices)]
+    puntos = list(vertices)
+    area = sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(puntos, puntos[1:] + puntos[:1]))
+    if area < 0:
+        puntos.reverse()
+
+    def cruz(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    triangulos = []
+    restantes = list(range(len(puntos)))
+    while len(restantes) > 3:
+        for k in range(len(restantes)):
+            i, j, l = restantes[k - 1], restantes[k], restantes[(k + 1) % len(restantes)]
+            a, b, c = puntos[i], puntos[j], puntos[l]
+            if cruz(a, b, c) <= 0:
+                continue  # Vértice reflejo (o alineado): no es oreja
+            if any(cruz(a, b, puntos[m]) >= 0 and cruz(b, c, puntos[m]) >= 0 and cruz(c, a, puntos[m]) >= 0
+                   for m in restantes if m not in (i, j, l)):
+                continue  # Otro vértice cae dentro del triángulo
+            triangulos.append((a, b, c))
+            del restantes[k]
+            break
+        else:
+            raise ValueError("No se pudo triangular el polígono (¿vértices repetidos o alineados?)")
+    triangulos.append(tuple(puntos[m] for m in restantes))
+    return triangulos
+
+
+class Zona:
+    """
+    Zona del mapa con su prueba de pertenencia exacta, su distancia al borde (para
+    compilar la grilla del registro) y su muestreo uniforme.
+
+    Parámetros:
+        nombre (str): Nombre de la zona (se copia a los incidentes).
+        forma (str): "poligono", "rectangulo", "circulo" o "sector".
+        parametros (dict): Geometría de la forma (ver el formato al inicio del módulo).
+        peso (float): Peso de la zona en el sorteo de incidentes.
+        destino (dict): Estación de traslado ({"nombre", "coordenadas"}) o None.
+        severidad (float): Severidad de sus incidentes o None.
+    """
+
+    # Tolerancia (km) para considerar dentro los puntos sobre el borde, como geometria.Area
+    TOLERANCIA = 1e-9
+
+    def __init__(self, nombre, forma, parametros, peso=0.0, destino=None, severidad=None):
+        if forma not in FORMAS:
+            raise ValueError(f"Zona '{nombre}': forma desconocida {forma} (opciones: {', '.join(FORMAS)})")
+        if peso < 0:
+            raise ValueError(f"Zona '{nombre}': el peso no puede ser negativo")
+        self.nombre = str(nombre)
+        self.forma = forma
+        self.parametros = parametros
+        self.peso = float(peso)
+        self.destino = destino
+        self.severidad = severidad
+
+        if forma == "rectangulo":
+            p = parametros
+            forma = "poligono"
+            parametros = {"vertices": [(p["x_min"], p["y_min"]), (p["x_max"], p["y_min"]),
+                                       (p["x_max"], p["y_max"]), (p["x_min"], p["y_max"])]}
+        elif forma == "circulo":
+            forma = "sector"
+            parametros = {"centro": parametros["centro"], "radio": parametros["radio"], "inicio": 0, "fin": 360}
+
+        if forma == "poligono":
+            self._precalcular_poligono([tuple(map(float, v)) for v in parametros["vertices"]])
+        else:
+            self._precalcular_sector(parametros)
+
+    def _precalcular_poligono(self, vertices):
+        if len(vertices) < 3:
+            raise ValueError(f"Zona '{self.nombre}': un polígono necesita al menos 3 vértices")
+        if not _es_simple(vertices):
+            raise ValueError(f"Zona '{self.nombre}': el polígono no es simple (sus lados se cruzan)")
+        self.poligonal = True
+        self.vertices = vertices
+        self.lados = list(zip(vertices, vertices[1:] + vertices[:1]))
+        lados = np.array(self.lados)
+        self._ax, self._ay = lados[:, 0, 0], lados[:, 0, 1]
+        self._bx, self._by = lados[:, 1, 0], lados[:, 1, 1]
+        xs, ys = zip(*vertices)
+        self.caja = (min(xs), max(xs), min(ys), max(ys))
+
+        self.triangulos = _triangular(vertices)
+        areas = [abs((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])) / 2 for a, b, c in self.triangulos]
+        self.area = sum(areas)
+        self._triangulos = np.array(self.triangulos)
+        self._areas_acumuladas = (np.cumsum(areas) / self.area).tolist()
+        # Uniformes por punto: dos baricéntricas más una para elegir el triángulo
+        self.valores = 2 if len(self.triangulos) == 1 else 3
+
+    def _precalcular_sector(self, p):
+        self.poligonal = False
+        self.centro = tuple(map(float, p["centro"]))
+        self.radio = float(p["radio"])
+        self.radio_interior = float(p.get("radio_interior", 0.0))
+        if not 0 <= self.radio_interior < self.radio:
+            raise ValueError(f"Zona '{self.nombre}': se requiere 0 <= radio_interior < radio")
+        # Ángulos en medias vueltas (grados / 180) para que π · (inicio + amplitud · u)
+        # reproduzca exactamente el ángulo del semicírculo de geometria.A2
+        self._inicio = float(p["inicio"]) / 180.0
+        self._amplitud = (float(p["fin"]) - float(p["inicio"])) / 180.0
+        if not 0 < self._amplitud <= 2:
+            raise ValueError(f"Zona '{self.nombre}': se requiere inicio < fin <= inicio + 360")
+        self.completo = self._amplitud == 2
+        self.inicio = math.pi * self._inicio
+        self.amplitud = math.pi * self._amplitud
+        self.area = self.amplitud / 2 * (self.radio ** 2 - self.radio_interior ** 2)
+        self.valores = 2
+
+        cx, cy = self.centro
+        r, ri = self.radio, self.radio_interior
+        fin = self.inicio + self.amplitud
+        # Lados radiales del sector (de radio_interior a radio en los ángulos extremos)
+        self.radiales = [] if self.completo else [
+            ((cx + ri * math.cos(a), cy + ri * math.sin(a)), (cx + r * math.cos(a), cy + r * math.sin(a)))
+            for a in (self.inicio, fin)
+        ]
+        # Caja envolvente: extremos de los arcos y puntos cardinales dentro del sector
+        puntos = [p for lado in self.radiales for p in lado]
+        for k in range(4):
+            if self._en_angulo(k * math.pi / 2):
+                puntos.append((cx + r * math.cos(k * math.pi / 2), cy + r * math.sin(k * math.pi / 2)))
+        if self.completo:
+            puntos += [(cx - r, cy - r), (cx + r, cy + r)]
+        xs, ys = zip(*puntos)
+        self.caja = (min(xs), max(xs), min(ys), max(ys))
+
+    def _en_angulo(self, angulo):
+        return self.completo or (angulo - self.inicio) % DOS_PI <= self.amplitud
+
+    # ------------------------------------------------------------------
+    # Pertenencia
+    # ------------------------------------------------------------------
+
+    def contiene(self, x, y):
+        """Verifica si un punto (x, y) está dentro de la zona (borde incluido)."""
+        x_min, x_max, y_min, y_max = self.caja
+        tol = self.TOLERANCIA
+        if not (x_min - tol <= x <= x_max + tol and y_min - tol <= y <= y_max + tol):
+            return False
+
+        if self.poligonal:
+            # Regla par-impar: rayo horizontal hacia la derecha
+            dentro = False
+            for (ax, ay), (bx, by) in self.lados:
+                if (ay > y) != (by > y) and x < ax + (y - ay) * (bx - ax) / (by - ay):
+                    dentro = not dentro
+            if dentro:
+                return True
+            return any(self._cerca_de_segmento(x, y, a, b) for a, b in self.lados)
+
+        cx, cy = self.centro
+        d2 = (x - cx) ** 2 + (y - cy) ** 2
+        if d2 > (self.radio + tol) ** 2 or d2 < max(self.radio_interior - tol, 0.0) ** 2:
+            return False
+        if self.completo or d2 == 0 or self._en_angulo(math.atan2(y - cy, x - cx)):
+            return True
+        return any(self._cerca_de_segmento(x, y, a, b) for a, b in self.radiales)
+
+    def _cerca_de_segmento(self, x, y, a, b):
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        largo2 = dx * dx + dy * dy
+        t = min(1.0, max(0.0, ((x - ax) * dx + (y - ay) * dy) / largo2)) if largo2 else 0.0
+        return math.hypot(ax + t * dx - x, ay + t * dy - y) <= self.TOLERANCIA
+
+    def contiene_lote(self, xs, ys):
+        """
+        Versión vectorizada de contiene para arreglos de coordenadas.
+        Retorna: arreglo booleano de NumPy
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        x_min, x_max, y_min, y_max = self.caja
+        tol = self.TOLERANCIA
+        resultado = np.zeros(xs.shape, dtype=bool)
+        en_caja = np.flatnonzero((xs >= x_min - tol) & (xs <= x_max + tol) & (ys >= y_min - tol) & (ys <= y_max + tol))
+        if len(en_caja) == 0:
+            return resultado
+        px, py = xs[en_caja], ys[en_caja]
+
+        if self.poligonal:
+            ay, by = self._ay, self._by
+            cruza = (ay > py[:, None]) != (by > py[:, None])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corte = self._ax + (py[:, None] - ay) * (self._bx - self._ax) / (by - ay)
+            dentro = (np.count_nonzero(cruza & (px[:, None] < corte), axis=1) % 2) == 1
+            dentro |= _distancia_segmentos(px, py, self._ax, ay, self._bx, by) <= tol
+        else:
+            cx, cy = self.centro
+            d2 = (px - cx) ** 2 + (py - cy) ** 2
+            dentro = (d2 <= (self.radio + tol) ** 2) & (d2 >= max(self.radio_interior - tol, 0.0) ** 2)
+            if not self.completo:
+                angulo = np.mod(np.arctan2(py - cy, px - cx) - self.inicio, DOS_PI)
+                en_angulo = (angulo <= self.amplitud) | (d2 == 0)
+                lados = np.array(self.radiales)
+                en_angulo |= _distancia_segmentos(px, py, lados[:, 0, 0], lados[:, 0, 1],
+                                                  lados[:, 1, 0], lados[:, 1, 1]) <= tol
+                dentro &= en_angulo
+        resultado[en_caja] = dentro
+        return resultado
+
+    def distancia_borde(self, xs, ys):
+        """Distancia de cada punto al borde de la zona (arreglos de NumPy)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if self.poligonal:
+            return _distancia_segmentos(xs, ys, self._ax, self._ay, self._bx, self._by)
+
+        cx, cy = self.centro
+        d = np.hypot(xs - cx, ys - cy)
+        angulo = np.mod(np.arctan2(ys - cy, xs - cx) - self.inicio, DOS_PI)
+        en_angulo = np.ones(xs.shape, dtype=bool) if self.completo else angulo <= self.amplitud
+        distancia = np.full(xs.shape, np.inf)
+        for r in (self.radio, self.radio_interior):
+            if r == 0:
+                continue
+            # Arco de radio r: distancia radial dentro del sector, a sus extremos fuera
+            distancia = np.minimum(distancia, np.where(en_angulo, np.abs(d - r), np.inf))
+            if not self.completo:
+                for a in (self.inicio, self.inicio + self.amplitud):
+                    distancia = np.minimum(distancia, np.hypot(xs - cx - r * math.cos(a), ys - cy - r * math.sin(a)))
+        if self.radiales:
+            lados = np.array(self.radiales)
+            distancia = np.minimum(distancia, _distancia_segmentos(xs, ys, lados[:, 0, 0], lados[:, 0, 1],
+                                                                   lados[:, 1, 0], lados[:, 1, 1]))
+        return distancia
+
+    # ------------------------------------------------------------------
+    # Muestreo
+    # ------------------------------------------------------------------
+
+    def muestrear(self, generador):
+        """
+        Punto uniforme dentro de la zona usando self.valores uniformes del generador.
+        Retorna: (x, y)
+        """
+        if self.poligonal:
+            if self.valores == 3:
+                k = bisect.bisect_right(self._areas_acumuladas, generador.aleatorio())
+                v1, v2, v3 = self.triangulos[min(k, len(self.triangulos) - 1)]
+            else:
+                v1, v2, v3 = self.triangulos[0]
+            # Coordenadas baricéntricas, como eventos._generar_punto_en_triangulo
+            r1 = generador.aleatorio()
+            r2 = generador.aleatorio()
+            sqrt_r1 = math.sqrt(r1)
+            a = 1 - sqrt_r1
+            b = sqrt_r1 * (1 - r2)
+            c = sqrt_r1 * r2
+            return a * v1[0] + b * v2[0] + c * v3[0], a * v1[1] + b * v2[1] + c * v3[1]
+
+        # Radio uniforme en área y ángulo uniforme dentro del sector
+        u = generador.aleatorio()
+        if self.radio_interior:
+            r = math.sqrt(self.radio_interior ** 2 + (self.radio ** 2 - self.radio_interior ** 2) * u)
+        else:
+            r = self.radio * math.sqrt(u)
+        angulo = math.pi * (self._inicio + self._amplitud * generador.aleatorio())
+        return self.centro[0] + r * math.cos(angulo), self.centro[1] + r * math.sin(angulo)
+
+    def transformar_uniformes(self, u):
+        """
+        Versión vectorizada de muestrear: u es un arreglo (n, ≥ self.valores) de
+        uniformes, una fila por punto, en el orden en que muestrear las consume.
+        Retorna: (x, y) como arreglos
+        """
+        if self.poligonal:
+            if self.valores == 3:
+                k = np.minimum(np.searchsorted(self._areas_acumuladas, u[:, 0], side="right"), len(self.triangulos) - 1)
+                r1, r2 = u[:, 1], u[:, 2]
+            else:
+                k = np.zeros(len(u), dtype=np.int64)
+                r1, r2 = u[:, 0], u[:, 1]
+            v = self._triangulos[k]
+            sqrt_r1 = np.sqrt(r1)
+            a = 1 - sqrt_r1
+            b = sqrt_r1 * (1 - r2)
+            c = sqrt_r1 * r2
+            return (a * v[:, 0, 0] + b * v[:, 1, 0] + c * v[:, 2, 0],
+                    a * v[:, 0, 1] + b * v[:, 1, 1] + c * v[:, 2, 1])
+
+        if self.radio_interior:
+            r = np.sqrt(self.radio_interior ** 2 + (self.radio ** 2 - self.radio_interior ** 2) * u[:, 0])
+        else:
+            r = self.radio * np.sqrt(u[:, 0])
+        angulo = np.pi * (self._inicio + self._amplitud * u[:, 1])
+        return self.centro[0] + r * np.cos(angulo), self.centro[1] + r * np.sin(angulo)
+
+
+class RegistroZonas:
+    """
+    Conjunto ordenado de zonas con una grilla precompilada para ubicar puntos.
+
+    Al construirse, el registro rasteriza las zonas sobre una grilla que cubre
+    MAPA_LIMITES (ampliada a las cajas de las zonas). Una celda a la que no llega el
+    borde de ninguna zona queda resuelta de antemano: su zona (la primera que la
+    cubre) o ninguna. Solo las celdas que cruza algún borde guardan la lista corta
+    de zonas candidatas, y solo en ellas zona_de aplica la prueba exacta. Así, ubicar
+    un punto cuesta una lectura de la grilla sin importar cuántas zonas haya.
+
+    Parámetros:
+        definicion (dict): Contenido del archivo de zonas ("zonas" y, opcionalmente,
+                           "estaciones").
+        tam_celda (float): Lado de las celdas de la grilla (km).
+        origen (str): Archivo del que se leyó la definición, si lo hay.
+    """
+
+    def __init__(self, definicion, tam_celda=0.5, origen=None):
+        self.definicion = definicion
+        self.tam_celda = float(tam_celda)
+        self.origen = origen
+
+        estaciones = dict(ESTACIONES)
+        for nombre, coordenadas in definicion.get("estaciones", {}).items():
+            estaciones[nombre] = {"nombre": nombre, "coordenadas": tuple(map(float, coordenadas))}
+        self.estaciones = estaciones
+
+        self.zonas = []
+        for datos in definicion.get("zonas", []):
+            datos = dict(datos)
+            nombre = datos.pop("nombre", f"Z{len(self.zonas) + 1}")
+            forma = datos.pop("forma", None)
+            peso = float(datos.pop("peso", 0.0))
+            destino = datos.pop("destino", None)
+            severidad = datos.pop("severidad", None)
+            if destino is not None:
+                if destino not in estaciones:
+                    raise ValueError(f"Zona '{nombre}': estación de destino desconocida {destino}")
+                destino = estaciones[destino]
+            elif peso > 0:
+                raise ValueError(f"Zona '{nombre}': una zona con incidentes necesita una estación de destino")
+            self.zonas.append(Zona(nombre, forma, datos, peso, destino, severidad))
+        if not self.zonas:
+            raise ValueError("El registro no define zonas")
+        self.nombres = [zona.nombre for zona in self.zonas]
+        if len(set(self.nombres)) != len(self.nombres):
+            raise ValueError("Los nombres de las zonas deben ser únicos")
+
+        # Sorteo de incidentes: solo participan las zonas con peso positivo
+        self.con_incidentes = [zona for zona in self.zonas if zona.peso > 0]
+        if not self.con_incidentes:
+            raise ValueError("Ninguna zona tiene peso de incidentes positivo")
+        pesos = np.array([zona.peso for zona in self.con_incidentes])
+        self._pesos_acumulados = (np.cumsum(pesos) / pesos.sum()).tolist()
+        # Uniformes por incidente además del de la zona (fijo, para que el lote
+        # reproduzca incidente a incidente la versión escalar)
+        self.valores = max(zona.valores for zona in self.con_incidentes)
+
+        self._compilar()
+
+    @classmethod
+    def cargar(cls, ruta=ARCHIVO_ZONAS, tam_celda=0.5):
+        """Lee un archivo de zonas (.json o .toml) y compila su registro."""
+        if ruta.endswith(".toml"):
+            try:
+                import tomllib
+            except ModuleNotFoundError:  # Python < 3.11
+                import tomli as tomllib
+            with open(ruta, "rb") as f:
+                definicion = tomllib.load(f)
+        else:
+            with open(ruta, encoding="utf-8") as f:
+                definicion = json.load(f)
+        return cls(definicion, tam_celda, origen=ruta)
+
+    # ------------------------------------------------------------------
+    # Grilla
+    # ------------------------------------------------------------------
+
+    def _compilar(self):
+        """
+        Clasifica cada celda por zona: si el borde de la zona pasa a menos de media
+        diagonal del centro de la celda, la celda es de borde para esa zona; si no,
+        la celda está entera dentro o entera fuera, según su centro.
+        """
+        cajas = np.array([zona.caja for zona in self.zonas])
+        # Una celda de margen para los puntos sobre el borde de la caja (tolerancia)
+        self.x_min = min(MAPA_LIMITES["x_min"], cajas[:, 0].min()) - self.tam_celda
+        self.y_min = min(MAPA_LIMITES["y_min"], cajas[:, 2].min()) - self.tam_celda
+        x_max = max(MAPA_LIMITES["x_max"], cajas[:, 1].max()) + self.tam_celda
+        y_max = max(MAPA_LIMITES["y_max"], cajas[:, 3].max()) + self.tam_celda
+        self.columnas = int(math.ceil((x_max - self.x_min) / self.tam_celda)) + 1
+        self.filas = int(math.ceil((y_max - self.y_min) / self.tam_celda)) + 1
+
+        columna, fila = np.meshgrid(np.arange(self.columnas), np.arange(self.filas))
+        cx = self.x_min + (columna.ravel() + 0.5) * self.tam_celda
+        cy = self.y_min + (fila.ravel() + 0.5) * self.tam_celda
+        margen = self.tam_celda * math.sqrt(0.5) * (1 + 1e-9) + Zona.TOLERANCIA
+
+        celdas = np.full(len(cx), SIN_ZONA, dtype=np.int32)
+        resuelta = np.zeros(len(cx), dtype=bool)
+        candidatos = {}
+        for k, zona in enumerate(self.zonas):
+            x0, x1, y0, y1 = zona.caja
+            cerca = np.flatnonzero(~resuelta & (cx >= x0 - margen) & (cx <= x1 + margen)
+                                   & (cy >= y0 - margen) & (cy <= y1 + margen))
+            if len(cerca) == 0:
+                continue
+            borde = zona.distancia_borde(cx[cerca], cy[cerca]) <= margen
+            for celda in cerca[borde].tolist():
+                candidatos.setdefault(celda, []).append(k)
+            llenas = cerca[~borde][zona.contiene_lote(cx[cerca[~borde]], cy[cerca[~borde]])]
+            for celda in llenas.tolist():
+                if celda in candidatos:
+                    # Una zona anterior cruza la celda: la prueba exacta decide, y
+                    # si ninguna anterior contiene el punto, es de esta zona
+                    candidatos[celda].append(k)
+                else:
+                    celdas[celda] = k
+            resuelta[llenas] = True
+
+        self._candidatos = []
+        for celda, lista in candidatos.items():
+            celdas[celda] = -2 - len(self._candidatos)
+            self._candidatos.append(tuple(lista))
+        self._celdas = celdas
+        self._lista = celdas.tolist()
+        # Pertenencia (lista de candidatos, zona) para la versión vectorizada
+        self._es_candidato = np.zeros((len(self._candidatos), len(self.zonas)), dtype=bool)
+        for j, lista in enumerate(self._candidatos):
+            self._es_candidato[j, list(lista)] = True
+
+    @property
+    def celdas_borde(self):
+        """Cantidad de celdas de la grilla en las que se aplica la prueba exacta."""
+        return len(self._candidatos)
+
+    def indice_de(self, x, y):
+        """Índice en self.zonas de la zona que contiene (x, y), o -1 si ninguna."""
+        c = int((x - self.x_min) // self.tam_celda)
+        f = int((y - self.y_min) // self.tam_celda)
+        if not (0 <= c < self.columnas and 0 <= f < self.filas):
+            return SIN_ZONA
+        valor = self._lista[f * self.columnas + c]
+        if valor >= SIN_ZONA:
+            return valor
+        for k in self._candidatos[-2 - valor]:
+            if self.zonas[k].contiene(x, y):
+                return k
+        return SIN_ZONA
+
+    def zona_de(self, x, y):
+        """Zona que contiene (x, y) (la primera del registro si se superponen), o None."""
+        k = self.indice_de(x, y)
+        return self.zonas[k] if k != SIN_ZONA else None
+
+    def indices_lote(self, xs, ys):
+        """
+        Versión vectorizada de indice_de.
+        Retorna: arreglo de NumPy con el índice de zona de cada punto (-1 = ninguna)
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        c = np.floor((xs - self.x_min) / self.tam_celda).astype(np.int64)
+        f = np.floor((ys - self.y_min) / self.tam_celda).astype(np.int64)
+        en_grilla = (c >= 0) & (c < self.columnas) & (f >= 0) & (f < self.filas)
+        valores = np.full(xs.shape, SIN_ZONA, dtype=np.int64)
+        valores[en_grilla] = self._celdas[f[en_grilla] * self.columnas + c[en_grilla]]
+
+        borde = np.flatnonzero(valores < SIN_ZONA)
+        if len(borde):
+            listas = -2 - valores[borde]
+            resultado = np.full(len(borde), SIN_ZONA, dtype=np.int64)
+            for k, zona in enumerate(self.zonas):
+                pendientes = np.flatnonzero((resultado == SIN_ZONA) & self._es_candidato[listas, k])
+                if len(pendientes):
+                    dentro = zona.contiene_lote(xs[borde[pendientes]], ys[borde[pendientes]])
+                    resultado[pendientes[dentro]] = k
+            valores[borde] = resultado
+        return valores
+
+    # ------------------------------------------------------------------
+    # Incidentes
+    # ------------------------------------------------------------------
+
+    def _zona_sorteada(self, u):
+        k = bisect.bisect_right(self._pesos_acumulados, u)
+        return self.con_incidentes[min(k, len(self.con_incidentes) - 1)]
+
+    def muestrear(self, generador):
+        """
+        Sortea la zona de un incidente según los pesos (un uniforme) y un punto dentro
+        de ella (self.valores uniformes; las zonas que usan menos descartan el resto).
+        Retorna: (zona, x, y)
+        """
+        zona = self._zona_sorteada(generador.aleatorio())
+        x, y = zona.muestrear(generador)
+        if zona.valores < self.valores:
+            generador.saltar(self.valores - zona.valores)
+        return zona, x, y
+
+    def muestrear_lote(self, u):
+        """
+        Versión vectorizada de muestrear: u es un arreglo (n, 1 + self.valores).
+        Retorna: (índices en self.con_incidentes, x, y) como arreglos
+        """
+        indices = np.minimum(np.searchsorted(self._pesos_acumulados, u[:, 0], side="right"),
+                             len(self.con_incidentes) - 1)
+        x = np.empty(len(u))
+        y = np.empty(len(u))
+        for k, zona in enumerate(self.con_incidentes):
+            filas = indices == k
+            if filas.any():
+                x[filas], y[filas] = zona.transformar_uniformes(u[filas, 1:])
+        return indices, x, y
+
+    def incidente(self, zona, x, y):
+        """Diccionario del incidente en (x, y) de la zona, con su destino y severidad."""
+        incidente = {"zona": zona.nombre, "x": x, "y": y, "destino": zona.destino}
+        if zona.severidad is not None:
+            incidente["severidad"] = zona.severidad
+        return incidente